@@ -14,10 +14,22 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import copy
+import functools
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import scipy.sparse
 from RAI.AISystem.model import Model
 from RAI.certificates import CertificateManager
 from RAI.dataset.dataset import Data, NumpyData, IteratorData, Dataset, MetaDatabase
 from RAI.metrics import MetricManager
+from RAI.metrics.metric_registry import get_group_versions, get_group_names, get_data_only_groups
+from RAI.utils import ResultCache, fingerprint, get_strata, stratified_sample, replicate_intervals
 from RAI.all_types import all_output_requirements, all_task_types, all_metric_types
 
 class AISystem:
@@ -50,12 +62,38 @@ class AISystem:
         self.enable_certificates = enable_certificates
         self.auto_id = 0
         self._last_metric_values = {}
+        self._last_metric_intervals = {}
+        self._last_metrics = None  # Metrics selection of the last compute, which updates keep to
         self._last_certificate_values = None
+        self._last_profiles = {}
+        self._group_status = {}
+        self._partial_results = {}
+        self._last_model_values = {}
+        self._last_model_certificate_values = {}
         self.metric_manager = None
         self.certificate_manager = None
         self.data_summarizer = None
         self.user_config = None
         self.data_dict = {}
+        self._computed_data_dicts = {}
+        self._split_systems = {}
+        self._result_cache = None
+        self._async_lock = threading.Lock()
+        self._cancel_event = None
+        self._group_listener = None
+
+    # The lock, cancel event and group listener of async computes are not pickled, so metric groups holding
+    # the AISystem can still be sent to worker processes. The result cache, split systems and the data dicts kept
+    # for updates are caches, which are left out rather than copied.
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(_async_lock=None, _cancel_event=None, _group_listener=None, _result_cache=None,
+                     _split_systems={}, _computed_data_dicts={})
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._async_lock = threading.Lock()
 
     def initialize(self, user_config: dict = {}, custom_certificate_location: str = None, **kw_args):
         """
@@ -68,7 +106,7 @@ class AISystem:
         self.user_config = user_config
         masks = {"scalar": self.meta_database.scalar_mask, "categorical": self.meta_database.categorical_mask,
                  "image": self.meta_database.image_mask, "text": self.meta_database.text_mask}
-        self.dataset.separate_data(masks)
+        self.dataset.separate_data(masks, user_config.get("precision", "float64"))
         self.meta_database.initialize_requirements(self.dataset, "fairness" in user_config)
         self.metric_manager = MetricManager(self)
         self.certificate_manager = CertificateManager()
@@ -108,6 +146,46 @@ class AISystem:
                         if display_detailed:
                             print(info[group][metric]["display_name"] + " is " + info[group][metric]["explanation"], "\n")
 
+    def get_profile(self) -> dict:
+        """
+        Returns the profile of the last compute of each dataset split, when user_config["profile"] is set.
+        Profiles hold the wall time, CPU time, input rows and optionally peak memory of each metric group.
+
+        :param self: None
+        :return: profiles(dict) in the form [dataset] -> profile
+        """
+        return self._last_profiles
+
+    def get_group_status(self) -> dict:
+        """
+        Returns the status of each metric group of each dataset split computed with a time budget.
+        Groups are "complete", "skipped" when they were not estimated to finish within the budget, or
+        "unfinished" when they were still running once it ran out. The values of incomplete groups are None,
+        and a later compute with a budget on the same data and predictions fills them in.
+
+        :param self: None
+        :return: status(dict) in the form [dataset][metric group] -> status, holding only budgeted splits
+        """
+        return self._group_status
+
+    def get_model_metric_values(self) -> dict:
+        """
+        Returns the metric values of each model of the last compute_models
+
+        :param self: None
+        :return: metric values(dict) in the form [model][dataset] -> values
+        """
+        return self._last_model_values
+
+    def get_model_certificate_values(self) -> dict:
+        """
+        Returns the certificate values of each model of the last compute_models, when certificates are enabled
+
+        :param self: None
+        :return: certificate values(dict) in the form [model] -> values
+        """
+        return self._last_model_certificate_values
+
     def get_certificate_values(self) -> dict:
         """
         Returns the last used certificate information
@@ -174,70 +252,610 @@ class AISystem:
         }
         return summary
     
-    def _single_compute(self, predictions: dict, data_type: str = "test", tag=None) -> None:
+    def _single_compute(self, predictions: dict, data_type: str = "test", tag=None, metrics=None,
+                        deadline: float = None) -> None:
     # Single compute accepts predictions and the name of a dataset, and then calculates metrics for that dataset.
         self.auto_id += 1
         if tag is None:
             tag = f"{self.auto_id}"
-        data_dict = {"data": self.get_data(data_type)}
+        data_dict = self._create_data_dict(predictions, data_type, tag)
+        self.data_dict = data_dict
+        values = self._compute_data_dict(self.metric_manager, data_dict, predictions, data_type, metrics, deadline)
+        if values is not None:
+            self._last_metric_values[data_type if data_type is not None else "No Dataset"] = values
+        if self.enable_certificates:
+            self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
+
+    def _create_data_dict(self, predictions: dict, data_type: str, tag, data: Data = None) -> dict:
+        data_dict = {"data": data if data is not None else self.get_data(data_type)}
         for output_type in all_output_requirements:
             if output_type in predictions:
                 data_dict[output_type] = predictions[output_type]
-            elif output_type in data_dict:
-                data_dict.pop(output_type)
         data_dict["tag"] = tag
-        self.data_dict = data_dict
-        self.metric_manager.initialize(self.user_config)
+        return data_dict
+
+    def _compute_data_dict(self, metric_manager: MetricManager, data_dict: dict, predictions: dict, data_type: str,
+                           metrics=None, deadline: float = None):
+        self._attach_listeners(metric_manager, data_type)
+        if deadline is not None and isinstance(data_dict["data"], NumpyData):
+            return self._compute_within_deadline(metric_manager, data_dict, predictions, data_type, metrics, deadline)
+        self._partial_results.pop(data_type, None)
+        metric_manager.initialize(self.user_config, metrics=metrics)
+        self._computed_data_dicts[data_type] = (data_dict, predictions)
+        self.metric_manager.clear_update_state(data_type)
         if isinstance(data_dict["data"], NumpyData):
-            self._last_metric_values[data_type if data_type is not None else "No Dataset"] = \
-                self.metric_manager.compute(data_dict)
+            values = metric_manager.compute(data_dict)
         elif isinstance(data_dict["data"], IteratorData):
-            self._last_metric_values[data_type if data_type is not None else "No Dataset"] = \
-                self.metric_manager.iterator_compute(data_dict, predictions)
+            values = metric_manager.iterator_compute(data_dict, predictions)
+        else:
+            return None
+        self._last_profiles[data_type] = metric_manager.get_profile()
+        return values
+
+    # Computes a NumpyData split, running metric groups until the deadline. When an earlier compute with a deadline
+    # left groups of the same data, predictions, metrics and config incomplete, only those groups are computed,
+    # and their values are merged with the values computed before.
+    def _compute_within_deadline(self, metric_manager: MetricManager, data_dict: dict, predictions: dict,
+                                 data_type: str, metrics, deadline: float):
+        partial = self._partial_results.get(data_type)
+        config = json.dumps(metric_manager.user_config, sort_keys=True, default=str)
+        if partial is None or not _is_same_compute(partial, data_dict["data"], predictions, metrics, config):
+            partial = {"data": data_dict["data"], "predictions": predictions, "metrics": metrics, "config": config,
+                       "values": {}, "status": {}}
+        pending = metrics
+        if partial["status"]:
+            incomplete = [group for group, status in partial["status"].items() if status != "complete"]
+            pending = incomplete if metrics is None else \
+                [name for name in metrics if name.partition(" > ")[0] in incomplete]
+
+        metric_manager.initialize(self.user_config, metrics=pending)
+        self._computed_data_dicts[data_type] = (data_dict, predictions)
+        self.metric_manager.clear_update_state(data_type)
+        values = metric_manager.compute(data_dict, deadline)
+        self._last_profiles[data_type] = metric_manager.get_profile()
+
+        # Groups completed earlier keep their values when they are skipped as dependencies of a pending group
+        merged, status = dict(partial["values"]), dict(partial["status"])
+        for group, group_status in metric_manager.get_group_status().items():
+            if group_status == "complete" or status.get(group) != "complete":
+                merged[group] = values[group]
+                status[group] = group_status
+        if "metadata" in merged:
+            merged["metadata"] = dict(merged["metadata"], group_status=status)
+        if all(group_status == "complete" for group_status in status.values()):
+            self._partial_results.pop(data_type, None)
+        else:
+            self._partial_results[data_type] = dict(partial, values=merged, status=status)
+        self._group_status[data_type] = status
+        return merged
+
+    # Computes each dataset split, reusing the results of an earlier compute on identical data, predictions and
+    # configuration when user_config["cache"] is set.
+    def _compute_splits(self, predictions: dict, tag=None, metrics=None, deadline: float = None) -> None:
+        cache = self._get_result_cache()
+        key = self._get_result_key(predictions, metrics) if cache is not None else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self._load_cached_results(cached, predictions, tag, metrics)
+                return
+        self._run_splits(predictions, tag=tag, metrics=metrics, deadline=deadline)
+        # Results missing groups which ran out of time are not cached
+        complete = all(group_status == "complete" for split in predictions
+                       for group_status in self._group_status.get(split, {}).values())
+        if key is not None and complete:
+            cache.put(key, copy.deepcopy({"metric_values": {split: self._last_metric_values[split] for split in predictions
+                                                            if split in self._last_metric_values},
+                                          "certificate_values": self._last_certificate_values}))
+
+    # Computes each dataset split, running splits concurrently when user_config["scheduler"]["split_workers"] is
+    # above 1. Concurrent splits each get their own MetricManager and data_dict, so no state is shared between them.
+    def _run_splits(self, predictions: dict, tag=None, metrics=None, deadline: float = None) -> None:
+        workers = int(self._get_config("scheduler").get("split_workers", 1))
+        if workers <= 1 or len(predictions) <= 1:
+            for key in predictions:
+                self._single_compute(predictions[key], key, tag=tag, metrics=metrics, deadline=deadline)
+            return
+
+        splits = {}
+        for key in predictions:
+            self.auto_id += 1
+            if key not in self._split_systems:
+                self._split_systems[key] = _SplitSystem(self)
+            split_system = self._split_systems[key]
+            split_system.data_dict = self._create_data_dict(predictions[key], key,
+                                                            tag if tag is not None else f"{self.auto_id}")
+            split_system.metric_manager.user_config = copy.deepcopy(self.metric_manager.user_config)
+            splits[key] = split_system
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {key: executor.submit(self._compute_data_dict, splits[key].metric_manager, splits[key].data_dict,
+                                            predictions[key], key, metrics, deadline) for key in splits}
+            for key in futures:
+                values = futures[key].result()
+                if values is not None:
+                    self._last_metric_values[key] = values
+        # Matches a serial compute, which leaves the groups and data_dict of the last split in place
+        self.data_dict = splits[key].data_dict
+        self.metric_manager.metric_groups = splits[key].metric_manager.metric_groups
         if self.enable_certificates:
             self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
 
+    # Returns the result cache described by user_config["cache"] = {"max_entries", "directory",
+    # "max_directory_entries"}, or None when unset
+    def _get_result_cache(self):
+        if "cache" not in (self.user_config or {}) and "cache" not in self.metric_manager.user_config:
+            return None
+        config = self._get_config("cache")
+        max_entries = int(config.get("max_entries", 32))
+        directory = config.get("directory")
+        max_directory_entries = int(config.get("max_directory_entries", 1024))
+        if self._result_cache is None or self._result_cache.max_entries != max_entries \
+                or self._result_cache.directory != directory \
+                or self._result_cache.max_directory_entries != max_directory_entries:
+            self._result_cache = ResultCache(max_entries, directory, max_directory_entries)
+        return self._result_cache
+
+    # Fingerprints everything the results of a compute depend on, apart from the tag. Models are identified by their
+    # name, class and agent, along with the predictions. Returns None when a split is not NumpyData.
+    def _get_result_key(self, predictions: dict, metrics=None):
+        splits = {}
+        for key in predictions:
+            data = self.dataset.data_dict.get(key)
+            if not isinstance(data, NumpyData):
+                return None
+            splits[key] = {"X": data.X, "y": data.y, "rawX": data.rawX if data.rawX is not data.X else None,
+                           "predictions": predictions[key]}
+        # The config the MetricManager will hold once initialized with the user config
+        config = dict(self.metric_manager.user_config)
+        config.update(self.user_config or {})
+        description = {"user_config": config,
+                       "metrics": sorted(metrics) if metrics is not None else None, "task": self.task,
+                       "features": [vars(feature) for feature in self.meta_database.features],
+                       "model": [self.model.name, self.model.model_class, repr(self.model.agent)],
+                       "versions": get_group_versions(),
+                       "certificates": {name: certificate.cert_spec for name, certificate in
+                                        self.certificate_manager.certificates.items()}
+                       if self.enable_certificates else None}
+        return fingerprint(splits, json.dumps(description, sort_keys=True, default=str))
+
+    def _load_cached_results(self, cached: dict, predictions: dict, tag=None, metrics=None) -> None:
+        values = copy.deepcopy(cached["metric_values"])
+        for key in predictions:
+            self.auto_id += 1
+            split_tag = tag if tag is not None else f"{self.auto_id}"
+            if "metadata" in values.get(key, {}):
+                values[key]["metadata"]["tag"] = split_tag
+                self._last_profiles[key] = values[key]["metadata"].get("profile")
+            self.data_dict = self._create_data_dict(predictions[key], key, split_tag)
+            self._computed_data_dicts[key] = (self.data_dict, predictions[key])
+            self.metric_manager.clear_update_state(key)
+        self.metric_manager.initialize(self.user_config, metrics=metrics)
+        # Cached results carry the date they were computed on, so it is refreshed to the time of this compute
+        if "metadata" in self.metric_manager.metric_groups:
+            date = self.metric_manager.metric_groups["metadata"]._get_time()
+            for key in predictions:
+                if "date" in values.get(key, {}).get("metadata", {}):
+                    values[key]["metadata"]["date"] = date
+        self._last_metric_values.update(values)
+        self._last_certificate_values = copy.deepcopy(cached["certificate_values"])
+
+    def clear_result_cache(self) -> None:
+        """
+        Removes all cached compute results, from memory and from the cache directory
+
+        :param self: None
+
+        :return: None
+        """
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    # Returns a section of the user config, including changes made directly to the MetricManager's config
+    def _get_config(self, key: str) -> dict:
+        config = dict(self.user_config.get(key, {}) if self.user_config else {})
+        config.update(self.metric_manager.user_config.get(key, {}))
+        return config
+
     # Compute will tell RAI to compute metric values across each dataset which predictions were made on.
-    def compute(self, predictions: dict, tag=None) -> None:
+    def compute(self, predictions: dict, tag=None, metrics=None, time_budget: float = None, sample=None) -> None:
 
         """
         Compute will tell RAI to compute metric values across each dataset which predictions were made on
 
         :param predictions(dict): Prediction value from the classifier 
         :param tag: by default None
+        :param metrics: metric groups or metrics to compute, for example ["metadata", "summary_stats > mean"].
+            By default every compatible metric is computed
+        :param time_budget: seconds the compute may take. Metric groups of NumpyData splits then run from the
+            cheapest estimated cost while they fit in the budget, and the rest are reported by get_group_status.
+            Later computes with a budget on the same data and predictions fill in the incomplete groups
+        :param sample: fraction (float) or number (int) of rows of each NumpyData split to compute on, drawn by
+            stratified sampling on the label and the protected attributes of user_config["fairness"]. Each metric
+            then also gets a confidence interval, see get_metric_intervals, and the metadata group reports the
+            sampled and total row counts. By default every row is computed
         :return: None
         """
+        assert sample is None or time_budget is None, "sample and time_budget cannot be combined"
+        assert sample is None or (isinstance(sample, float) and 0 < sample <= 1) or \
+            (isinstance(sample, int) and not isinstance(sample, bool) and sample >= 1), \
+            "sample must be a fraction in (0, 1] or a number of rows"
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
         self._last_metric_values = {}
+        self._last_metric_intervals = {}
+        self._last_metrics = metrics
+        self._last_profiles = {}
+        self._group_status = {}
         if len(self.dataset.data_dict) == 0:  # Model with no X, y data.
             for key in predictions.keys():
-                self._single_compute(predictions, None, tag=tag)
+                self._single_compute(predictions, None, tag=tag, metrics=metrics)
                 return
         elif not (isinstance(predictions, dict) and all(isinstance(v, dict) for v in predictions.values()) \
                 and all(isinstance(k, str) for k in predictions.keys())):
             raise Exception("Prediction dictionary should be in the form [dataset][output_type] -> nd.array")
-        for key in predictions.keys():
-            if key in self.dataset.data_dict.keys():
-                self._single_compute(predictions[key], key, tag=tag)
+        if sample is not None:
+            self._sampled_compute({key: predictions[key] for key in predictions if key in self.dataset.data_dict},
+                                  sample, tag=tag, metrics=metrics)
+            return
+        self._compute_splits({key: predictions[key] for key in predictions if key in self.dataset.data_dict}, tag=tag,
+                             metrics=metrics, deadline=deadline)
+
+    # Computes each NumpyData split on a stratified sample of its rows. The sample is dealt into
+    # user_config["sample"]["replicates"] replicate subsamples, each computed on its own, and the spread of their
+    # values gives the confidence interval of each metric. This is the random groups method of survey sampling,
+    # which needs no knowledge of the metrics and costs about twice the compute of the sample.
+    def _sampled_compute(self, predictions: dict, sample, tag=None, metrics=None) -> None:
+        config = self._get_config("sample")
+        replicates = int(config.get("replicates", 10))
+        confidence = float(config.get("confidence", 0.95))
+        for key in predictions:
+            data = self.get_data(key)
+            if not isinstance(data, NumpyData):
+                self._single_compute(predictions[key], key, tag=tag, metrics=metrics)
+                continue
+            self.auto_id += 1
+            split_tag = tag if tag is not None else f"{self.auto_id}"
+            total = len(data)
+            size = int(round(sample * total)) if isinstance(sample, float) else sample
+            indices, replicate_of = stratified_sample(self._get_strata(data), size, replicates, config.get("seed"))
+
+            split_system = _SplitSystem(self)
+            values = self._compute_sample(split_system, data, predictions[key], indices, key, split_tag, metrics)
+            # Replicates share one split system, so its metric plan is compiled once and reused by every replicate
+            replicate_system = _SplitSystem(self)
+            replicate_values = [self._compute_sample(replicate_system, data, predictions[key],
+                                                     indices[replicate_of == i], key, split_tag, metrics)
+                                for i in range(replicates)]
+            intervals = {group: replicate_intervals(values[group], [other.get(group) for other in replicate_values],
+                                                    confidence) for group in values if group != "metadata"}
+            if "metadata" in values:
+                values["metadata"] = dict(values["metadata"], total_count=total, confidence_intervals=intervals)
+            self._last_metric_values[key] = values
+            self._last_metric_intervals[key] = intervals
+            self._last_profiles[key] = split_system.metric_manager.get_profile()
+            # Updates add rows to the full split, so they must not build on the state of a sample
+            self._computed_data_dicts.pop(key, None)
+            self._partial_results.pop(key, None)
+            self.metric_manager.clear_update_state(key)
+            self.data_dict = split_system.data_dict
+            self.metric_manager.metric_groups = split_system.metric_manager.metric_groups
+        if self.enable_certificates:
+            self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
+
+    # Computes the rows of data at indices with the MetricManager of split_system, returning the values
+    def _compute_sample(self, split_system, data: NumpyData, predictions: dict, indices, data_type: str, tag,
+                        metrics) -> dict:
+        rows = len(data)
+        subset = NumpyData(_take(data.X, indices, rows), _take(data.y, indices, rows),
+                           _take(data.rawX, indices, rows) if data.rawX is not data.X else None)
+        subset.initialize({"scalar": self.meta_database.scalar_mask,
+                           "categorical": self.meta_database.categorical_mask,
+                           "image": self.meta_database.image_mask, "text": self.meta_database.text_mask},
+                          self.user_config.get("precision", "float64"))
+        preds = {name: _take(value, indices, rows) for name, value in predictions.items()}
+        split_system.data_dict = self._create_data_dict(preds, data_type, tag, subset)
+        split_system.metric_manager.user_config = copy.deepcopy(self.metric_manager.user_config)
+        split_system.metric_manager.initialize(self.user_config, metrics=metrics)
+        return split_system.metric_manager.compute(split_system.data_dict)
+
+    # Strata are the combinations of label and protected attribute values. Labels with many distinct values, as
+    # in regression, are binned into deciles.
+    def _get_strata(self, data: NumpyData):
+        columns = []
+        if data.y is not None:
+            y = np.asarray(data.y).ravel()
+            if len(np.unique(y)) > 50:
+                y = np.digitize(y, np.quantile(y, np.linspace(0.1, 0.9, 9)))
+            columns.append(y)
+        names = [feature.name for feature in self.meta_database.features if feature.categorical]
+        for attr in self._get_config("fairness").get("protected_attributes", []):
+            if data.categorical is not None and attr in names:
+                column = data.categorical[:, names.index(attr)]
+                columns.append(column.toarray().ravel() if scipy.sparse.issparse(column) else column)
+        return get_strata(columns) if columns else np.zeros(len(data), dtype=np.int64)
+
+    def get_metric_intervals(self) -> dict:
+        """
+        Returns the confidence intervals of the last compute with sample, in the form of get_metric_values with
+        each number replaced by a [low, high] interval. Splits computed on every row have no intervals
+
+        :param self: None
+
+        :return: intervals(dict)
+        """
+        return self._last_metric_intervals
 
     # Run Compute automatically generates outputs from the model, and compute metrics based on those outputs
-    def run_compute(self, tag=None) -> None:
+    def run_compute(self, tag=None, metrics=None, time_budget: float = None) -> None:
         """
-        Run Compute automatically generates outputs from the model, and compute metrics based on those outputs
+        Run Compute automatically generates outputs from the model, and compute metrics based on those outputs.
+        Inference runs in chunks of user_config["inference"]["batch_size"] rows, on a pool of
+        user_config["inference"]["workers"] threads. IteratorData is predicted batch by batch, and each batch
+        is computed while the next batches are predicted, so memory stays bounded by the batch size.
 
         :param tag: tag by default None or we can pass model as a string
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :param time_budget: seconds the inference and compute of NumpyData splits may take, see compute.
+            IteratorData splits are computed in full
     
         :return: Data Summary(Dict)
         
         """
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
         self._last_metric_values = {}
+        self._last_metric_intervals = {}
+        self._last_metrics = metrics
+        self._last_profiles = {}
+        self._group_status = {}
+        inference = self._get_config("inference")
+        batch_size = inference.get("batch_size")
+        workers = int(inference.get("workers", 1))
         preds = {}
         for category in self.dataset.data_dict:
-            preds[category] = {}
-            data = self.dataset.data_dict[category].X
-            for function_type in self.model.output_types:
-                preds[category][function_type] = self.model.output_types[function_type](data)
-        for key in preds:
-            self._single_compute(preds[key], key)
+            data = self.dataset.data_dict[category]
+            if isinstance(data, NumpyData):
+                preds[category] = self._predict(data.X, batch_size, workers)
+        self._compute_splits(preds, tag=tag, metrics=metrics, deadline=deadline)
+        for category in self.dataset.data_dict:
+            if isinstance(self.dataset.data_dict[category], IteratorData):
+                self._pipeline_compute(category, workers, tag=tag, metrics=metrics)
+        # NumpyData splits are computed before IteratorData splits, but results are kept in the order of the dataset
+        order = [category for category in self.dataset.data_dict]
+        for name in ["_last_metric_values", "_last_profiles", "_group_status"]:
+            values = getattr(self, name)
+            setattr(self, name, {category: values[category] for category in sorted(
+                values, key=lambda category: order.index(category) if category in order else len(order))})
+
+    def compute_models(self, models: dict, predictions: dict, tag=None, metrics=None) -> dict:
+        """
+        Computes metrics for several candidate models on the same dataset splits. Metric groups which depend only
+        on the data, see get_data_only_groups, are computed once for each split and shared by every model. The
+        other groups are computed for each model, running on user_config["scheduler"]["model_workers"] threads.
+        The last metric values of compute are left unchanged.
+
+        :param models: the candidate Models by name. Each is used in place of the AISystem's model
+        :param predictions: the predictions of each model by name, in the form taken by compute.
+            Splits must be NumpyData
+        :param tag: tag of every compute, by default the name of each model
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :return: metric values(dict) in the form [model][dataset] -> values, see get_model_metric_values
+        """
+        assert set(predictions) == set(models), "predictions must be given for every model"
+        splits = {}  # The outputs of every model, so the output requirements of data only groups are met
+        for name in models:
+            for split in predictions[name]:
+                assert isinstance(self.get_data(split), NumpyData), "compute_models needs NumpyData splits"
+                splits.setdefault(split, {}).update(predictions[name][split])
+        data_only = set(get_data_only_groups())
+
+        def select(shared):
+            if metrics is None:
+                return [group for group in get_group_names() if (group in data_only) == shared]
+            return [metric for metric in metrics if (metric.partition(" > ")[0] in data_only) == shared]
+
+        workers = int(self._get_config("scheduler").get("model_workers", 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shared = {split: executor.submit(self._compute_models_split, _SplitSystem(self), split, splits[split],
+                                             tag, select(True)) for split in splits}
+            futures = {name: {split: executor.submit(self._compute_models_split, _SplitSystem(self, models[name]),
+                                                     split, predictions[name][split],
+                                                     tag if tag is not None else name, select(False))
+                              for split in predictions[name]} for name in models}
+            shared = {split: shared[split].result() for split in shared}
+            order = {group: i for i, group in enumerate(get_group_names())}
+            self._last_model_values = {}
+            self._last_model_certificate_values = {}
+            for name in models:
+                self._last_model_values[name] = {}
+                for split in futures[name]:
+                    values = dict(copy.deepcopy(shared[split]), **futures[name][split].result())
+                    self._last_model_values[name][split] = dict(sorted(values.items(), key=lambda item: order[item[0]]))
+                if self.enable_certificates:
+                    self._last_model_certificate_values[name] = \
+                        self.certificate_manager.compute(self._last_model_values[name])
+        return self._last_model_values
+
+    # Computes the given metrics of a split with the MetricManager of split_system, returning the values
+    def _compute_models_split(self, split_system, data_type: str, predictions: dict, tag, metrics) -> dict:
+        split_system.data_dict = self._create_data_dict(predictions, data_type, tag)
+        split_system.metric_manager.user_config = copy.deepcopy(self.metric_manager.user_config)
+        split_system.metric_manager.initialize(self.user_config, metrics=metrics)
+        return split_system.metric_manager.compute(split_system.data_dict)
+
+    async def compute_async(self, predictions: dict, tag=None, metrics=None, time_budget: float = None,
+                            timeout: float = None, executor=None, publisher=None) -> None:
+        """
+        Runs compute in an executor, without blocking the event loop. When the awaiting task is cancelled or the
+        timeout passes, the compute stops before its next metric group starts, and no values of the unfinished
+        split are stored or cached.
+
+        :param predictions(dict): Prediction value from the classifier
+        :param tag: by default None
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :param time_budget: seconds the compute may take, see compute
+        :param timeout: seconds after which the compute is cancelled and asyncio.TimeoutError is raised
+        :param executor: concurrent.futures.ThreadPoolExecutor to run the compute in, by default the event loop's.
+            Metric groups within the compute are still run as set by user_config["scheduler"]
+        :param publisher: AsyncRaiRedis which each metric group and the final measurement are published to
+        :return: None
+        """
+        async for _ in self.stream_compute(predictions, tag, metrics, time_budget, timeout, executor, publisher):
+            pass
+
+    async def run_compute_async(self, tag=None, metrics=None, time_budget: float = None, timeout: float = None,
+                                executor=None, publisher=None) -> None:
+        """
+        Runs run_compute in an executor, without blocking the event loop, with the cancellation of compute_async
+
+        :param tag: by default None
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :param time_budget: seconds the inference and compute may take, see run_compute
+        :param timeout: seconds after which the compute is cancelled and asyncio.TimeoutError is raised
+        :param executor: concurrent.futures.ThreadPoolExecutor to run the compute in, by default the event loop's
+        :param publisher: AsyncRaiRedis which each metric group and the final measurement are published to
+        :return: None
+        """
+        async for _ in self.stream_run_compute(tag, metrics, time_budget, timeout, executor, publisher):
+            pass
+
+    def stream_compute(self, predictions: dict, tag=None, metrics=None, time_budget: float = None,
+                       timeout: float = None, executor=None, publisher=None):
+        """
+        Runs compute like compute_async, returning an async iterator of (split, metric group, values) tuples.
+        Metric groups of NumpyData splits are yielded as soon as they finish. Groups of IteratorData splits and
+        of cached results are yielded once the compute has finished. Stopping the iteration cancels the compute.
+
+        :param predictions(dict): Prediction value from the classifier
+        :param tag: by default None
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :param time_budget: seconds the compute may take, see compute
+        :param timeout: seconds after which the compute is cancelled and asyncio.TimeoutError is raised
+        :param executor: concurrent.futures.ThreadPoolExecutor to run the compute in, by default the event loop's
+        :param publisher: AsyncRaiRedis which each metric group and the final measurement are published to
+        :return: async iterator of (split, metric group, values)
+        """
+        return self._stream_async(functools.partial(self.compute, predictions, tag, metrics, time_budget),
+                                  timeout, executor, publisher)
+
+    def stream_run_compute(self, tag=None, metrics=None, time_budget: float = None, timeout: float = None,
+                           executor=None, publisher=None):
+        """
+        Runs run_compute like run_compute_async, returning an async iterator of (split, metric group, values)
+        tuples, see stream_compute
+
+        :param tag: by default None
+        :param metrics: metric groups or metrics to compute, by default every compatible metric
+        :param time_budget: seconds the inference and compute may take, see run_compute
+        :param timeout: seconds after which the compute is cancelled and asyncio.TimeoutError is raised
+        :param executor: concurrent.futures.ThreadPoolExecutor to run the compute in, by default the event loop's
+        :param publisher: AsyncRaiRedis which each metric group and the final measurement are published to
+        :return: async iterator of (split, metric group, values)
+        """
+        return self._stream_async(functools.partial(self.run_compute, tag, metrics, time_budget),
+                                  timeout, executor, publisher)
+
+    # Runs function in executor, yielding each metric group as the MetricManagers report it, then the groups of
+    # the final values which were not reported. Async computes of one AISystem run one at a time.
+    async def _stream_async(self, function, timeout: float, executor, publisher):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        cancel_event = threading.Event()
+        finished = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:  # The event loop was closed, after the consumer stopped
+                pass
+
+        def run():
+            with self._async_lock:
+                self._cancel_event = cancel_event
+                self._group_listener = lambda split, group, values: put((split, group, values))
+                try:
+                    function()
+                finally:
+                    self._cancel_event = None
+                    self._group_listener = None
+                    for split_system in [self] + list(self._split_systems.values()):
+                        split_system.metric_manager.cancel_event = None
+                        split_system.metric_manager.on_group_computed = None
+                    put(finished)
+
+        future = loop.run_in_executor(executor, run)
+        end = loop.time() + timeout if timeout is not None else None
+        yielded = set()
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), end - loop.time() if end is not None else None)
+                if item is finished:
+                    break
+                yielded.add(item[:2])
+                if publisher is not None:
+                    await publisher.publish_group(*item)
+                yield item
+            await future
+            values = self._last_metric_values
+            for split in values:
+                for group in values[split]:
+                    if (split, group) not in yielded:
+                        if publisher is not None:
+                            await publisher.publish_group(split, group, values[split][group])
+                        yield split, group, values[split][group]
+            if publisher is not None:
+                await publisher.add_measurement()
+        finally:
+            if not future.done():
+                cancel_event.set()
+                # The compute then raises CancelledError in the executor, which is not awaited
+                future.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    # Passes the cancel event and group listener of a running async compute to the MetricManager of a split
+    def _attach_listeners(self, metric_manager: MetricManager, data_type: str) -> None:
+        listener = self._group_listener
+        split = data_type if data_type is not None else "No Dataset"
+        metric_manager.cancel_event = self._cancel_event
+        metric_manager.on_group_computed = None if listener is None else \
+            lambda group, values: listener(split, group, values)
+
+    # Returns the model outputs for X, predicting batch_size rows at a time when a batch size is given
+    def _predict(self, X, batch_size: int = None, workers: int = 1) -> dict:
+        if batch_size is None:
+            return self._predict_batch(X)
+        chunks = ((None, X[start:start + batch_size]) for start in range(0, len(X), batch_size))
+        outputs = [batch_preds for _, batch_preds in _predict_batches(self._predict_batch, chunks, workers)]
+        return {output_type: _concatenate([output[output_type] for output in outputs])
+                for output_type in self.model.output_types}
+
+    def _predict_batch(self, X) -> dict:
+        return {output_type: _to_numpy(self.model.output_types[output_type](X))
+                for output_type in self.model.output_types}
+
+    # Computes an IteratorData split while its batches are being predicted, without storing all predictions
+    def _pipeline_compute(self, data_type: str, workers: int, tag=None, metrics=None) -> None:
+        self.auto_id += 1
+        data = self.get_data(data_type)
+        data_dict = {"data": data}
+        for output_type in self.model.output_types:
+            data_dict[output_type] = None
+        data_dict["tag"] = tag if tag is not None else f"{self.auto_id}"
+        self.data_dict = data_dict
+        self.metric_manager.initialize(self.user_config, metrics=metrics)
+        self._attach_listeners(self.metric_manager, data_type)
+        # Predictions are not kept, so a later update starts from the updated rows only
+        self._computed_data_dicts.pop(data_type, None)
+        self.metric_manager.clear_update_state(data_type)
+
+        def batches():
+            data.reset()
+            while data.next_batch():
+                yield data.get_batch(), data.rawX
+
+        self._last_metric_values[data_type] = self.metric_manager.pipeline_compute(
+            data_dict, _predict_batches(self._predict_batch, batches(), workers))
+        self._last_profiles[data_type] = self.metric_manager.get_profile()
+        if self.enable_certificates:
+            self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
 
     def get_metric_info(self):
         """
@@ -262,7 +880,162 @@ class AISystem:
         """
         return self.certificate_manager.get_metadata()
 
-    # we have not implemented the incremental update as of now and each call to compute process all the data
-    def update(self, data):
-        raise NotImplemented()
+    # Compute state returns mergeable partial metric states, so shards of a dataset can be computed separately.
+    def compute_state(self, predictions: dict, tag=None) -> dict:
+        """
+        Compute state returns the partial metric state of each dataset split which predictions were made on.
+        States are picklable, and states computed on different shards of the data are combined by merge.
+
+        :param predictions(dict): Prediction value from the classifier in the form [dataset][output_type] -> nd.array
+        :param tag: by default None
+
+        :return: Partial states(dict) in the form [dataset] -> {"output_types": [...], "metric_groups": {...}}
+        """
+        result = {}
+        for data_type in predictions:
+            self.auto_id += 1
+            data_dict = {"data": self.get_data(data_type)}
+            for output_type in all_output_requirements:
+                if output_type in predictions[data_type]:
+                    data_dict[output_type] = predictions[data_type][output_type]
+            data_dict["tag"] = tag if tag is not None else f"{self.auto_id}"
+            self.data_dict = data_dict
+            self.metric_manager.initialize(self.user_config)
+            result[data_type] = {"output_types": [key for key in all_output_requirements if key in data_dict],
+                                 "metric_groups": self.metric_manager.compute_state(data_dict, predictions[data_type])}
+        return result
+
+    def merge(self, states: list) -> None:
+        """
+        Merge combines partial states returned by compute_state, for example from different processes or hosts,
+        and stores the resulting metric values. Only metric groups which support updates are included.
+
+        :param states(list): partial states returned by compute_state
+
+        :return: None
+        """
+        self._last_metric_values = {}
+        self._last_metric_intervals = {}
+        self._last_profiles = {}
+        for data_type in dict.fromkeys(data_type for state in states for data_type in state):
+            split_states = [state[data_type] for state in states if data_type in state]
+            data_dict = {"data": self.get_data(data_type)}
+            for output_type in split_states[0]["output_types"]:
+                data_dict[output_type] = None
+            self.data_dict = data_dict
+            self.metric_manager.initialize(self.user_config)
+            self._last_metric_values[data_type] = \
+                self.metric_manager.merge([state["metric_groups"] for state in split_states])
+        if self.enable_certificates:
+            self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
+
+    # Update folds new rows into the metric values of the last compute, without processing the earlier data again.
+    def update(self, data: dict, predictions: dict = None, tag=None) -> None:
+        """
+        Update folds new rows into the metrics of each dataset split, in time proportional to the new rows.
+        Metric groups that do not support updates keep the values of the last compute, and only the metrics
+        selected by the last compute are updated.
+
+        :param data(dict): new NumpyData per dataset split, for example {'test': NumpyData(X, y)}
+        :param predictions(dict): predictions on the new rows in the form [dataset][output_type] -> nd.array,
+            by default None and the model generates them
+        :param tag: by default None
+
+        :return: None
+        """
+        masks = {"scalar": self.meta_database.scalar_mask, "categorical": self.meta_database.categorical_mask,
+                 "image": self.meta_database.image_mask, "text": self.meta_database.text_mask}
+        for data_type in data:
+            assert isinstance(data[data_type], NumpyData), "Updates must be given as NumpyData"
+            new_data = data[data_type]
+            new_data.initialize(masks, self.user_config.get("precision", "float64"))
+            if predictions is not None:
+                preds = predictions.get(data_type, {})
+            else:
+                preds = self._predict_batch(new_data.X)
+
+            self.auto_id += 1
+            data_dict = {"data": new_data}
+            for output_type in all_output_requirements:
+                if output_type in preds:
+                    data_dict[output_type] = preds[output_type]
+            data_dict["tag"] = tag if tag is not None else f"{self.auto_id}"
+            self.data_dict = data_dict
+            self.metric_manager.initialize(self.user_config, metrics=self._last_metrics)
+
+            base_data_dict, base_preds = self._computed_data_dicts.get(data_type, (None, None))
+            results = self.metric_manager.update(data_dict, data_type, base_data_dict, base_preds)
+            self._last_profiles[data_type] = self.metric_manager.get_profile()
+            values = self._last_metric_values.setdefault(data_type, {})
+            for group in results:
+                values[group] = results[group]
+        if self.enable_certificates:
+            self._last_certificate_values = self.certificate_manager.compute(self._last_metric_values)
+
+
+# Runs predict on the model input of each (data, model input) batch in a pool of workers, yielding (data, predictions)
+# in order. At most workers + 1 batches are held at once, and batches are predicted while earlier ones are consumed.
+def _predict_batches(predict, batches, workers: int = 1):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for data, model_input in batches:
+            pending.append((data, executor.submit(predict, model_input)))
+            if len(pending) > workers:
+                data, future = pending.popleft()
+                yield data, future.result()
+        while pending:
+            data, future = pending.popleft()
+            yield data, future.result()
+
+
+# Checks whether a compute is on the same data, predictions, metrics and config as an earlier partial compute
+def _is_same_compute(partial: dict, data, predictions: dict, metrics, config: str) -> bool:
+    if partial["data"] is not data or partial["metrics"] != metrics or partial["config"] != config \
+            or set(partial["predictions"]) != set(predictions):
+        return False
+    return all(predictions[key] is partial["predictions"][key] or
+               (np.shape(predictions[key]) == np.shape(partial["predictions"][key])
+                and np.array_equal(predictions[key], partial["predictions"][key])) for key in predictions)
+
+
+def _to_numpy(values):
+    if hasattr(values, "detach"):
+        return values.detach().cpu().numpy()
+    return values
+
+
+# Returns the rows at indices of values holding one entry per row, and any other value as it is
+def _take(values, indices, rows: int):
+    if scipy.sparse.issparse(values):
+        return values.tocsr()[indices]
+    if values is None or np.ndim(values) == 0 or len(values) != rows:
+        return values
+    if isinstance(values, list):
+        return [values[i] for i in indices]
+    return _to_numpy(values)[indices]
+
+
+def _concatenate(chunks: list):
+    if all(isinstance(chunk, list) for chunk in chunks):
+        return [value for chunk in chunks for value in chunk]
+    return np.concatenate([np.asarray(chunk) for chunk in chunks])
+
+
+class _SplitSystem:
+    """
+    Gives one dataset split its own data_dict and MetricManager, and optionally its own model, while sharing every
+    other attribute with the AISystem. Metric groups created for the split read the split's data_dict, model and
+    user config through it.
+    """
+
+    def __init__(self, ai_system: AISystem, model: Model = None) -> None:
+        self._ai_system = ai_system
+        self.data_dict = {}
+        if model is not None:
+            self.model = model
+        self.metric_manager = MetricManager(self)
 
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._ai_system, name)
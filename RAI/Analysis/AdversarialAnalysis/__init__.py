@@ -14,7 +14,12 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from .adversarial_tree_analysis import AdversarialTreeAnalysis
-from .clever_untargeted_score import CleverUntargetedScore
-from .clever_targeted_score import CleverTargetedScore
-from .generate_bb_adversarial_image import GenerateBrendelBethgeAdversarialImage
+
+from RAI.utils.registry_manifest import lazy_import
+
+# Analyses and their modules, which are imported on first use
+lazy_classes = {"AdversarialTreeAnalysis": ".adversarial_tree_analysis",
+                "CleverUntargetedScore": ".clever_untargeted_score",
+                "CleverTargetedScore": ".clever_targeted_score",
+                "GenerateBrendelBethgeAdversarialImage": ".generate_bb_adversarial_image"}
+__getattr__ = lazy_import(__name__, lazy_classes)
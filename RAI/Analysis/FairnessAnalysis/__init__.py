@@ -15,4 +15,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .fairness_analysis import FairnessAnalysis
\ No newline at end of file
+from RAI.utils.registry_manifest import lazy_import
+
+# Analyses and their modules, which are imported on first use
+lazy_classes = {"FairnessAnalysis": ".fairness_analysis"}
+__getattr__ = lazy_import(__name__, lazy_classes)
@@ -15,6 +15,10 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .view_inference_analysis import ViewInferenceAnalysis
-from .gradcam_analysis import GradCamAnalysis
-from .data_visualization import DataVisualization
+from RAI.utils.registry_manifest import lazy_import
+
+# Analyses and their modules, which are imported on first use
+lazy_classes = {"ViewInferenceAnalysis": ".view_inference_analysis",
+                "GradCamAnalysis": ".gradcam_analysis",
+                "DataVisualization": ".data_visualization"}
+__getattr__ = lazy_import(__name__, lazy_classes)
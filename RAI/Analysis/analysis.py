@@ -49,27 +49,7 @@ class Analysis(ABC):
 
         Returns the classifier and sklearn object data
         """
-        compatible = cls.config["compatibility"]["task_type"] is None or cls.config["compatibility"]["task_type"] == [] \
-                     or ai_system.task in cls.config["compatibility"]["task_type"] \
-                     or ("classification" in cls.config["compatibility"]["task_type"]
-                         and ai_system.task == "binary_classification")
-        compatible = compatible and (cls.config["compatibility"]["data_type"] is None or cls.config["compatibility"][
-            "data_type"] == [] or all(item in ai_system.meta_database.data_format
-                                      for item in cls.config["compatibility"]["data_type"]))
-        compatible = compatible and (cls.config["compatibility"]["output_requirements"] is None or
-                                     all(item in ai_system.data_dict for item in
-                                         cls.config["compatibility"]["output_requirements"]))
-        compatible = compatible and (cls.config["compatibility"]["dataset_requirements"] is None or
-                                     all(item in ai_system.meta_database.stored_data for item in
-                                         cls.config["compatibility"]["dataset_requirements"]))
-        compatible = compatible and (cls.config["compatibility"]["data_requirements"] == [] or
-                                     all(type(item).__name__ in cls.config["compatibility"]["data_requirements"] for
-                                         item in ai_system.dataset.data_dict.values()))
-        compatible = compatible and compare_runtimes(ai_system.metric_manager.user_config.get("time_complexity"),
-                                                     cls.config["complexity_class"])
-        compatible = compatible and all(group in ai_system.get_metric_values()[dataset]
-                                        for group in cls.config["compatibility"]["required_groups"])
-        return compatible
+        return is_compatible_config(cls.config, ai_system, dataset)
 
     def progress_percent(self, percentage_complete):
         """
@@ -123,3 +103,29 @@ class Analysis(ABC):
     @abstractmethod
     def to_html(self):
         pass
+
+
+# Checks the compatibility section and complexity class of a config. The analysis manifest holds these, so analyses
+# can be checked before their modules are imported. Analyses may add checks by overriding is_compatible.
+def is_compatible_config(config, ai_system, dataset: str):
+    compatible = config["compatibility"]["task_type"] is None or config["compatibility"]["task_type"] == [] \
+                 or ai_system.task in config["compatibility"]["task_type"] \
+                 or ("classification" in config["compatibility"]["task_type"]
+                     and ai_system.task == "binary_classification")
+    compatible = compatible and (config["compatibility"]["data_type"] is None or config["compatibility"][
+        "data_type"] == [] or all(item in ai_system.meta_database.data_format
+                                  for item in config["compatibility"]["data_type"]))
+    compatible = compatible and (config["compatibility"]["output_requirements"] is None or
+                                 all(item in ai_system.data_dict for item in
+                                     config["compatibility"]["output_requirements"]))
+    compatible = compatible and (config["compatibility"]["dataset_requirements"] is None or
+                                 all(item in ai_system.meta_database.stored_data for item in
+                                     config["compatibility"]["dataset_requirements"]))
+    compatible = compatible and (config["compatibility"]["data_requirements"] == [] or
+                                 all(type(item).__name__ in config["compatibility"]["data_requirements"] for
+                                     item in ai_system.dataset.data_dict.values()))
+    compatible = compatible and compare_runtimes(ai_system.metric_manager.user_config.get("time_complexity"),
+                                                 config["complexity_class"])
+    compatible = compatible and all(group in ai_system.get_metric_values()[dataset]
+                                    for group in config["compatibility"]["required_groups"])
+    return compatible
@@ -16,7 +16,8 @@
 
 
 from RAI.AISystem import AISystem
-from .analysis_registry import registry
+from .analysis_registry import get_analysis_names, get_analysis_config, get_analysis_class
+from .analysis import is_compatible_config
 
 
 class AnalysisManager:
@@ -26,9 +27,11 @@ class AnalysisManager:
 
     def _get_available_analysis(self, ai_system: AISystem, dataset: str):
         compatible_groups = {}
-        for group in registry:
-            if registry[group].is_compatible(ai_system, dataset):
-                compatible_groups[group] = registry[group]
+        # Analyses are checked against their manifest config first, so only compatible ones are imported
+        for group in get_analysis_names():
+            if is_compatible_config(get_analysis_config(group), ai_system, dataset) \
+                    and get_analysis_class(group).is_compatible(ai_system, dataset):
+                compatible_groups[group] = get_analysis_class(group)
         return compatible_groups
 
     def get_available_analysis(self, ai_system: AISystem, dataset: str):
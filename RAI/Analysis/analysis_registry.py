@@ -15,7 +15,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-registry = {}
+from RAI.utils.registry_manifest import RegistryManifest
+
+__all__ = ['registry', 'manifest', 'register_class', 'get_analysis_names', 'get_analysis_config',
+           'get_analysis_class']
+
+registry = {}  # Analysis classes which have been imported, by class name
+
+# Packages whose lazy_classes declare the analyses shipped with RAI
+analysis_packages = ["RAI.Analysis.FairnessAnalysis", "RAI.Analysis.AdversarialAnalysis",
+                     "RAI.Analysis.VisualizationAnalysis"]
 
 
 def register_class(class_name, class_object):
@@ -32,3 +41,43 @@ def register_class(class_name, class_object):
         if class_name in registry:
             raise NameError("Class Name: " + class_name + " already exists. Please enter a unique class name.")
         registry[class_name] = class_object
+
+
+# Manifest entries hold the part of the config needed to check compatibility
+def _get_manifest_entry(class_name, config):
+    assert "compatibility" in config and "complexity_class" in config, \
+        class_name + " must contain compatibility details and a complexity class"
+    return class_name, {"config": {"compatibility": config["compatibility"],
+                                   "complexity_class": config["complexity_class"]}}
+
+
+manifest = RegistryManifest("analysis_manifest", analysis_packages, _get_manifest_entry)
+
+
+def get_analysis_names() -> list:
+    """
+    :return: list of the names of every analysis, those in the manifest followed by analyses registered from elsewhere
+    """
+    entries = manifest.entries()
+    return list(entries) + [name for name in registry if name not in entries]
+
+
+def get_analysis_config(name: str) -> dict:
+    """
+    :param name: class name of the analysis
+
+    :return: the config used to check compatibility, without importing the analysis when it is in the manifest
+    """
+    entries = manifest.entries()
+    return entries[name]["config"] if name in entries else registry[name].config
+
+
+def get_analysis_class(name: str):
+    """
+    :param name: class name of the analysis
+
+    :return: the Analysis subclass, importing its module the first time
+    """
+    if name not in registry:
+        manifest.load_class(name)
+    return registry[name]
@@ -16,7 +16,7 @@
 
 
 __all__ = ['all_complexity_classes', 'all_task_types', 'all_data_types',
-           'all_output_requirements', 'all_dataset_requirements', 'all_metric_types']
+           'all_output_requirements', 'all_dataset_requirements', 'all_metric_types', 'all_precision_types']
 
 all_complexity_classes = {"constant", "linear", "multi_linear", "polynomial", "exponential"}
 all_task_types = {"binary_classification", "classification", "clustering", "regression", "generate"}
@@ -24,3 +24,4 @@ all_data_types = {"numeric", "image", "text"}
 all_output_requirements = {"predict", "predict_proba", "generate_text", "generate_image"}
 all_dataset_requirements = {"X", "y", "sensitive_features"}
 all_metric_types = {"numeric", "Dict", "multivalued", "other", "vector", "vector-dict", "Matrix", "boolean", "Boolean"}
+all_precision_types = {"float32", "float64"}
@@ -16,4 +16,6 @@
 
 
 from .dataset import *
+from .file_data import *
+from .stream_data import *
 from .vis import *
\ No newline at end of file
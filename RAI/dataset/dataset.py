@@ -15,8 +15,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
-from RAI.all_types import all_data_types
+import scipy.sparse
+from RAI.all_types import all_data_types, all_precision_types
 from abc import ABC, abstractmethod
 
 __all__ = ['Feature', 'MetaDatabase', 'Data', 'NumpyData', 'IteratorData', 'Dataset']
@@ -48,7 +52,15 @@ class Data(ABC):
 
 
 class IteratorData(Data):
-    def __init__(self, iterator, contains_x=True, contains_y=True):
+    """
+    IteratorData holds a data split as an iterable of batches, such as a torch DataLoader, each holding X and then y
+    as present. X, y and each data type hold the current batch, see next_batch. With prefetch above 0, batches
+    are read on a background thread and converted on prefetch_workers threads while the current batch is
+    computed, keeping up to prefetch batches ready.
+    """
+    def __init__(self, iterator, contains_x=True, contains_y=True, prefetch: int = 0, prefetch_workers: int = 1):
+        assert int(prefetch) >= 0, "prefetch must be at least 0"
+        assert int(prefetch_workers) >= 1, "prefetch_workers must be at least 1"
         self.iterator = iterator
         self.iter = None
         self.contains_x = contains_x
@@ -58,70 +70,177 @@ class IteratorData(Data):
         self.rawX = None
         self.rawY = None
         self.mapping = {}
+        self.precision = "float64"
         self.categorical = None
         self.scalar = None
         self.image = None
+        self.text = None
         self.get_index = False
-
-    def initialize(self, maps):
+        self.prefetch = int(prefetch)
+        self.prefetch_workers = int(prefetch_workers)
+        self._pipeline = None
+
+    # Iterators and prefetch threads are not pickled, so a copy must be reset before it is iterated
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(iter=None, _pipeline=None)
+        return state
+
+    # precision is the float dtype of every data type of a batch, see all_precision_types
+    def initialize(self, maps, precision: str = "float64"):
+        assert precision in all_precision_types, "precision must be one of " + str(all_precision_types)
         self.mapping = maps
+        self.precision = precision
 
     def next_batch(self):
-        val = next(self.iter, False)
-        if not val:
-            return val
-        pos = 0
-        x, y = None, None
-        if self.contains_x:
-            x = val[pos]
-            self.rawX = x
-            pos += 1
-        if self.contains_y:
-            y = val[pos]
-            self.rawY = y
-            self.y = y
-
-        x, y = self._convert_image_data(x, y)
-        self.X = x
-        self.y = y
-        self._separate_data(x)
+        if self._pipeline is not None:
+            batch = self._pipeline.get()
+        else:
+            val = next(self.iter, False)
+            batch = (val, self._prepare_batch(val)) if val else None
+        if batch is None:
+            return False
+        val, attributes = batch
+        for name, value in attributes.items():
+            setattr(self, name, value)
         return val
 
+    def get_batch(self):
+        """
+        Returns the current batch as NumpyData, which stays valid after next_batch moves on to the next batch
+
+        :param self: None
+
+        :return: NumpyData
+        """
+        batch = NumpyData(self.X, self.y, self.rawX)
+        batch.scalar = self.scalar
+        batch.categorical = self.categorical
+        batch.image = self.image
+        batch.text = self.text
+        return batch
+
     def reset(self):
-        self.iter = iter(self.iterator)
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline = None
+        self.iter = self._read_batches()
         self.X = None
         self.y = None
         self.rawX = None
         self.categorical = None
         self.scalar = None
         self.image = None
+        self.text = None
         self.get_index = False
+        if self.prefetch > 0:
+            self._pipeline = _BatchPipeline(self.iter, lambda val: (val, self._prepare_batch(val)), self.prefetch,
+                                            self.prefetch_workers)
+
+    # Returns an iterator over the batches of the split
+    def _read_batches(self):
+        return iter(self.iterator)
+
+    # Returns the attributes of a batch read from the iterator. Only reads self, so batches can be prepared on
+    # prefetch threads.
+    def _prepare_batch(self, val) -> dict:
+        attributes = {}
+        pos = 0
+        x, y = None, None
+        if self.contains_x:
+            x = val[pos]
+            attributes["rawX"] = x
+            pos += 1
+        if self.contains_y:
+            y = val[pos]
+            attributes["rawY"] = y
+
+        x, y = self._convert_image_data(x, y)
+        attributes["X"] = x
+        attributes["y"] = y
+        if x is not None:
+            attributes.update(self._separate(x))
+        return attributes
 
     def _convert_image_data(self, x, y):
         if x is not None:
-            x = x.detach().numpy()
+            x = _to_numpy(x)
             x_shape = list(x.shape)
             x_shape[0] = 1
             x_shape.insert(0, -1)
             x = x.reshape(x_shape)
         if y is not None:
-            y = y.detach().numpy()
+            y = _to_numpy(y)
         return x, y
 
     def _separate_data(self, x):
         if x is not None:
-            self.scalar = None
-            self.categorical = None
-            self.image = None
-            self.text = None
-            if 'scalar' in self.mapping and any(val for val in self.mapping['scalar']):
-                self.scalar = np.array(x[:, self.mapping['scalar']]).astype(np.float64)
-            if 'categorical' in self.mapping and any(val for val in self.mapping['categorical']):
-                self.categorical = np.array(x[:, self.mapping['categorical']]).astype(np.float64)
-            if 'image' in self.mapping and any(val for val in self.mapping['image']):
-                self.image = np.array(x[:, self.mapping['image']]).astype(np.float64)
-            if 'text' in self.mapping and any(val for val in self.mapping['text']):
-                self.text = np.array(x[:, self.mapping['text']]).astype(np.float64)
+            for name, value in self._separate(x).items():
+                setattr(self, name, value)
+
+    # Every modality of a batch is of the precision dtype. Batches are views of x where no copy is needed, see
+    # _select_columns, so float32 batches are not copied with the float32 precision.
+    def _separate(self, x) -> dict:
+        result = {"scalar": None, "categorical": None, "image": None, "text": None}
+        if scipy.sparse.issparse(x):
+            x = x.tocsc()
+        for name in result:
+            if name in self.mapping and any(val for val in self.mapping[name]):
+                result[name] = _select_columns(x, self.mapping[name], self.precision)
+        return result
+
+
+# Reads batches from an iterator on a background thread, and prepares each on a pool of worker threads. Up to depth
+# batches wait to be taken, in the order they were read. A failure to read or prepare a batch is raised by get.
+class _BatchPipeline:
+    def __init__(self, batches, prepare, depth: int, workers: int) -> None:
+        self._queue = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        self._finished = False
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._thread = threading.Thread(target=self._read, args=(batches, prepare), daemon=True)
+        self._thread.start()
+
+    def _read(self, batches, prepare) -> None:
+        try:
+            for val in batches:
+                if not val or not self._put(self._executor.submit(prepare, val)):
+                    break
+        except BaseException as e:
+            failed = Future()
+            failed.set_exception(e)
+            self._put(failed)
+        self._put(None)
+
+    # Waits for room in the queue, returning False once the pipeline is stopped
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    # Returns the next prepared batch, or None once every batch has been taken
+    def get(self):
+        if self._finished:
+            return None
+        future = self._queue.get()
+        if future is None:
+            self._finished = True
+            self.stop()
+            return None
+        try:
+            return future.result()
+        except BaseException:
+            self._finished = True
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._executor.shutdown(wait=False)
 
 
 class NumpyData(Data):
@@ -170,21 +289,57 @@ class NumpyData(Data):
     def getRawItem(self, key):
         return self.rawX[key]
 
-    # Splits up a dataset into its different data types, currently scalar and categorical
-    def initialize(self, masks):
+    # Splits up a dataset into its different data types. Scalar data is of the precision dtype, and the other types
+    # keep the dtype of X. Each type is a view of X where no copy is needed, see _select_columns, so it must not be
+    # modified. A scipy.sparse X gives sparse CSC types, which hold only the nonzeros of the selected columns.
+    def initialize(self, masks, precision: str = "float64"):
+        assert precision in all_precision_types, "precision must be one of " + str(all_precision_types)
         self.scalar = None
         self.categorical = None
         self.image = None
         self.text = None
         if self.X is not None:
+            # Sparse X is converted to CSC once, as each data type selects its columns from it
+            X = self.X.tocsc() if scipy.sparse.issparse(self.X) else self.X
             if "scalar" in masks and any(val for val in masks["scalar"]):
-                self.scalar = np.array(self.X[:, masks["scalar"]]).astype(np.float64)
+                self.scalar = _select_columns(X, masks["scalar"], precision)
             if "categorical" in masks and any(val for val in masks["categorical"]):
-                self.categorical = self.X[:, masks["categorical"]]
+                self.categorical = _select_columns(X, masks["categorical"])
             if "image" in masks and any(val for val in masks["image"]):
-                self.image = self.X[:, masks["image"]]
+                self.image = _select_columns(X, masks["image"])
             if "text" in masks and any(val for val in masks["text"]):
-                self.text = self.X[:, masks["scalar"]]
+                self.text = _select_columns(X, masks["text"])
+
+
+# Converts a batch of any framework to numpy without copying it where possible. Tensors are detached and moved to
+# the cpu, and anything else is converted with np.asarray, which shares the memory of arrays that support it.
+def _to_numpy(value):
+    if hasattr(value, "detach"):
+        return value.detach().cpu().numpy()
+    return np.asarray(value)
+
+
+# Returns the columns of X selected by a boolean mask, as dtype when given. When the columns are consecutive and
+# already of that dtype, the result is a view of X. Otherwise it is filled in a single copy, a run of consecutive
+# columns at a time, converting the dtype on the way rather than after a copy made by boolean indexing.
+# A sparse X is sliced by column in CSC form, so the result stays sparse. Callers selecting several masks convert
+# X to CSC first, so it is converted once.
+def _select_columns(X, mask, dtype=None):
+    columns = np.flatnonzero(mask)
+    if scipy.sparse.issparse(X):
+        X = X.tocsc(copy=False)
+        return X[:, columns].astype(X.dtype if dtype is None else dtype, copy=False)
+    X = np.asarray(X)
+    dtype = X.dtype if dtype is None else np.dtype(dtype)
+    runs = np.split(columns, np.flatnonzero(np.diff(columns) != 1) + 1)
+    if len(runs) == 1 and X.dtype == dtype:
+        return X[:, columns[0]:columns[-1] + 1]
+    result = np.empty((X.shape[0], len(columns)) + X.shape[2:], dtype=dtype)
+    start = 0
+    for run in runs:
+        result[:, start:start + len(run)] = X[:, run[0]:run[-1] + 1]
+        start += len(run)
+    return result
 
 
 class Dataset:
@@ -197,9 +352,9 @@ class Dataset:
     def __init__(self, data_dict) -> None:
         self.data_dict = data_dict
 
-    def separate_data(self, masks):
+    def separate_data(self, masks, precision: str = "float64"):
         for data in self.data_dict:
-            self.data_dict[data].initialize(masks)
+            self.data_dict[data].initialize(masks, precision)
 
 
 class MetaDatabase:
@@ -0,0 +1,142 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import numpy as np
+from RAI.dataset.dataset import IteratorData
+
+__all__ = ['FileData']
+
+
+class FileData(IteratorData):
+    """
+    FileData reads a data split from files as it is iterated, batch_size rows at a time, so splits larger than
+    memory can be computed. X and y may each be a .npy file, which is memory mapped, an Arrow IPC file (.arrow or
+    .feather), which is memory mapped, or a Parquet file (.parquet), which is read one row group at a time.
+    Arrow and Parquet files need pyarrow. Like IteratorData, X, y, scalar and categorical hold the current batch,
+    and only the rows of that batch are read.
+
+    :param x_path: file holding X, or None when there is no X
+    :param y_path: file holding y. By default y is y_column of the X file, when y_column is given
+    :param x_columns: columns of an Arrow or Parquet X file to use, by default every column apart from y_column
+    :param y_column: column of an Arrow or Parquet file holding y
+    :param batch_size: rows in each batch
+    :param prefetch: batches to read ahead on a background thread, see IteratorData
+    :param prefetch_workers: threads converting the batches read ahead
+    """
+
+    def __init__(self, x_path: str = None, y_path: str = None, x_columns: list = None, y_column: str = None,
+                 batch_size: int = 65536, prefetch: int = 0, prefetch_workers: int = 1) -> None:
+        assert int(batch_size) >= 1, "batch_size must be at least 1"
+        y_path = y_path if y_path is not None or y_column is None else x_path
+        super().__init__(None, contains_x=x_path is not None, contains_y=y_path is not None, prefetch=prefetch,
+                         prefetch_workers=prefetch_workers)
+        self.batch_size = int(batch_size)
+        self._x_source = _open_source(x_path, x_columns, exclude=y_column) if x_path is not None else None
+        self._y_source = _open_source(y_path, [y_column] if y_column is not None else None) \
+            if y_path is not None else None
+        sources = [source for source in [self._x_source, self._y_source] if source is not None]
+        assert len(sources) > 0, "FileData needs an X or a y file"
+        assert len(set(source.num_rows for source in sources)) == 1, "X and y must have the same number of rows"
+        self.num_rows = sources[0].num_rows
+
+    def __len__(self):
+        return self.num_rows
+
+    def _read_batches(self):
+        for start in range(0, self.num_rows, self.batch_size):
+            stop = min(start + self.batch_size, self.num_rows)
+            yield tuple(source.read(start, stop) for source in [self._x_source, self._y_source] if source is not None)
+
+    # Batches are numpy arrays already, and y read from a table column is flattened
+    def _convert_image_data(self, x, y):
+        if y is not None and y.ndim == 2 and y.shape[1] == 1:
+            y = y[:, 0]
+        return x, y
+
+
+# Opens a file as a source of rows, chosen by its extension
+def _open_source(path: str, columns: list = None, exclude: str = None):
+    if path.endswith(".npy"):
+        assert columns is None, "columns can only be selected from Arrow and Parquet files"
+        return _NpySource(path)
+    if path.endswith(".parquet"):
+        return _ParquetSource(path, columns, exclude)
+    if path.endswith(".arrow") or path.endswith(".feather"):
+        return _ArrowSource(path, columns, exclude)
+    raise ValueError("FileData files must be .npy, .arrow, .feather or .parquet files, not " + path)
+
+
+# Columns to read from a table with the given column names
+def _select_names(names: list, columns: list = None, exclude: str = None) -> list:
+    if columns is not None:
+        return list(columns)
+    return [name for name in names if name != exclude]
+
+
+# Converts an Arrow table to a rows by columns array, copying it once
+def _table_to_numpy(table):
+    if table.num_columns == 1:
+        return table.column(0).to_numpy()[:, None]
+    return np.column_stack([table.column(i).to_numpy() for i in range(table.num_columns)])
+
+
+class _NpySource:
+    # Rows of a memory mapped array are views, which are only read from disk once they are used
+    def __init__(self, path: str) -> None:
+        self.array = np.load(path, mmap_mode="r")
+        self.num_rows = len(self.array)
+
+    def read(self, start: int, stop: int):
+        return self.array[start:stop]
+
+
+class _ArrowSource:
+    def __init__(self, path: str, columns: list = None, exclude: str = None) -> None:
+        import pyarrow
+        import pyarrow.ipc
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+        self.table = table.select(_select_names(table.column_names, columns, exclude))
+        self.num_rows = self.table.num_rows
+
+    def read(self, start: int, stop: int):
+        return _table_to_numpy(self.table.slice(start, stop - start))
+
+
+class _ParquetSource:
+    # The last row group read is kept, as consecutive batches usually fall within the same row group
+    def __init__(self, path: str, columns: list = None, exclude: str = None) -> None:
+        import pyarrow.parquet
+        self.file = pyarrow.parquet.ParquetFile(path)
+        self.columns = _select_names(self.file.schema_arrow.names, columns, exclude)
+        sizes = [self.file.metadata.row_group(i).num_rows for i in range(self.file.num_row_groups)]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.num_rows = int(self.offsets[-1])
+        self._cached = (None, None)
+
+    def read(self, start: int, stop: int):
+        import pyarrow
+        first = int(np.searchsorted(self.offsets, start, side="right")) - 1
+        last = int(np.searchsorted(self.offsets, stop, side="left")) - 1
+        tables = [self._read_row_group(i) for i in range(first, last + 1)]
+        table = pyarrow.concat_tables(tables) if len(tables) > 1 else tables[0]
+        return _table_to_numpy(table.slice(start - int(self.offsets[first]), stop - start))
+
+    def _read_row_group(self, index: int):
+        if self._cached[0] != index:
+            self._cached = (index, self.file.read_row_group(index, columns=self.columns))
+        return self._cached[1]
@@ -0,0 +1,136 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import numpy as np
+from RAI.dataset.dataset import IteratorData, _to_numpy
+
+__all__ = ['StreamData']
+
+
+class StreamData(IteratorData):
+    """
+    StreamData computes a data split from a stream of batches from any framework, without holding the split in
+    memory. Each item of source is one of:
+
+    - a numpy array or tensor, or a tuple holding X and then y as present
+    - a pandas DataFrame, such as the chunks of pd.read_csv(..., chunksize=n)
+    - an Arrow RecordBatch or Table
+
+    source may also be a pyarrow.parquet.ParquetFile, whose row groups are read one at a time, or a function
+    returning the stream, which is called on each reset so one shot generators can be iterated more than once.
+    Batches are converted to numpy without a copy where the source allows it. For DataFrames and Arrow batches, y
+    is y_column and X is x_columns, by default every other column. Like IteratorData, X, y and each data type hold
+    the current batch.
+
+    :param source: iterable of batches, a ParquetFile, or a function returning either
+    :param contains_x: whether batches hold X
+    :param contains_y: whether batches hold y
+    :param x_columns: columns of DataFrames and Arrow batches holding X
+    :param y_column: column of DataFrames and Arrow batches holding y
+    :param batch_size: rows in each batch. Batches of the source are split and joined to this size, or used as
+                       they are when batch_size is None
+    :param prefetch: batches to read ahead on a background thread, see IteratorData
+    :param prefetch_workers: threads converting the batches read ahead
+    """
+
+    def __init__(self, source, contains_x: bool = True, contains_y: bool = True, x_columns: list = None,
+                 y_column=None, batch_size: int = None, prefetch: int = 0, prefetch_workers: int = 1) -> None:
+        assert batch_size is None or int(batch_size) >= 1, "batch_size must be at least 1"
+        super().__init__(source, contains_x=contains_x, contains_y=contains_y, prefetch=prefetch,
+                         prefetch_workers=prefetch_workers)
+        self.x_columns = list(x_columns) if x_columns is not None else None
+        self.y_column = y_column
+        self.batch_size = int(batch_size) if batch_size is not None else None
+
+    def _read_batches(self):
+        source = self.iterator() if callable(self.iterator) else self.iterator
+        if hasattr(source, "read_row_group") and hasattr(source, "num_row_groups"):
+            source = _row_groups(source, self._parquet_columns())
+        batches = (self._to_arrays(item) for item in source)
+        return batches if self.batch_size is None else _rebatch(batches, self.batch_size)
+
+    # Batches are numpy arrays already. X with more than two dimensions is a batch of images, which is one feature.
+    def _convert_image_data(self, x, y):
+        if x is not None and x.ndim > 2:
+            x = x.reshape((-1, 1) + x.shape[1:])
+        if y is not None and y.ndim == 2 and y.shape[1] == 1:
+            y = y[:, 0]
+        return x, y
+
+    # Returns X and y of an item of the source as numpy arrays, as present
+    def _to_arrays(self, item) -> tuple:
+        if hasattr(item, "iloc") or hasattr(item, "schema"):
+            names = list(item.columns) if hasattr(item, "iloc") else item.schema.names
+            arrays = []
+            if self.contains_x:
+                columns = self.x_columns if self.x_columns is not None else \
+                    [name for name in names if name != self.y_column]
+                arrays.append(_table_columns(item, columns))
+            if self.contains_y:
+                assert self.y_column is not None, "y_column must be given to read y from DataFrames and Arrow batches"
+                arrays.append(_table_columns(item, [self.y_column])[:, 0])
+            return tuple(arrays)
+        if not isinstance(item, (tuple, list)):
+            item = (item,)
+        assert len(item) == int(self.contains_x) + int(self.contains_y), \
+            "each batch must hold X and then y, as given by contains_x and contains_y"
+        return tuple(_to_numpy(value) for value in item)
+
+    def _parquet_columns(self):
+        if self.x_columns is None or not self.contains_x:
+            return [self.y_column] if not self.contains_x else None
+        return self.x_columns + ([self.y_column] if self.contains_y else [])
+
+
+# Returns columns of a DataFrame or Arrow batch as a rows by columns array. A single column, or DataFrame columns
+# sharing a dtype, are returned without a copy. Other columns are copied once.
+def _table_columns(table, columns: list):
+    if hasattr(table, "iloc"):
+        return table[columns].to_numpy()
+    arrays = [np.asarray(table.column(table.schema.get_field_index(name))) for name in columns]
+    if len(arrays) == 1:
+        return arrays[0][:, None]
+    return np.column_stack(arrays)
+
+
+def _row_groups(parquet_file, columns: list = None):
+    for i in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(i, columns=columns)
+
+
+# Splits and joins batches into batches of batch_size rows, the last of which may be smaller. Rows taken from a
+# single batch are views of it, and only batches joined from several are copied.
+def _rebatch(batches, batch_size: int):
+    pending, rows = [], 0
+    for batch in batches:
+        start, num_rows = 0, len(batch[0])
+        while start < num_rows:
+            stop = min(start + batch_size - rows, num_rows)
+            pending.append(tuple(array[start:stop] for array in batch))
+            rows += stop - start
+            start = stop
+            if rows == batch_size:
+                yield _join(pending)
+                pending, rows = [], 0
+    if rows > 0:
+        yield _join(pending)
+
+
+def _join(parts: list) -> tuple:
+    if len(parts) == 1:
+        return parts[0]
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
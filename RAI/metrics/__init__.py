@@ -18,6 +18,9 @@
 from .metric_manager import MetricManager
 from .metric import Metric 
 from .metric_group import MetricGroup
+from .compute_context import ComputeContext
+from .profiler import ComputeProfile
+from .runtime_model import RuntimeModel
 import RAI.metrics.metadata
 import RAI.metrics.performance
 import RAI.metrics.stats
@@ -16,13 +16,13 @@
 
 
 __all__ = ["get_binary_dataset", "get_classification_dataset"]
-from aif360.datasets import BinaryLabelDataset
-from aif360.metrics import BinaryLabelDatasetMetric
-from aif360.metrics import ClassificationMetric
-import pandas as pd
 
 
+# aif360 and pandas are imported when a dataset is built, so importing RAI does not load them.
 def get_binary_dataset(metric_group, data, prot_attr):
+    import pandas as pd
+    from aif360.datasets import BinaryLabelDataset
+    from aif360.metrics import BinaryLabelDatasetMetric
     names = [feature.name for feature in metric_group.ai_system.meta_database.features if feature.categorical]
     df = pd.DataFrame(data.categorical, columns=names)
     df['y'] = data.y
@@ -31,6 +31,9 @@ def get_binary_dataset(metric_group, data, prot_attr):
 
 
 def get_classification_dataset(metric_group, data, preds, prot_attr, priv_group_list, unpriv_group_list):
+    import pandas as pd
+    from aif360.datasets import BinaryLabelDataset
+    from aif360.metrics import ClassificationMetric
     names = [feature.name for feature in metric_group.ai_system.meta_database.features if feature.categorical]
     df1 = pd.DataFrame(data.categorical, columns=names)
     df1['y'] = data.y
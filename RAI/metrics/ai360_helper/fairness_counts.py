@@ -0,0 +1,158 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+__all__ = ["get_fairness_counts", "merge_fairness_counts", "get_dataset_count_metrics",
+           "get_classification_count_metrics"]
+import numpy as np
+import scipy.sparse
+
+
+# Confusion counts are kept per combination of protected attribute values, with columns TP, FP, TN, FN.
+# Every aif360 metric below is a function of these counts, so they can be accumulated across batches of data.
+def get_fairness_counts(metric_group, data, preds, prot_attr):
+    names = [feature.name for feature in metric_group.ai_system.meta_database.features if feature.categorical]
+    columns = [names.index(attr) for attr in prot_attr]
+    if scipy.sparse.issparse(data.categorical):
+        protected = data.categorical[:, columns].toarray().astype(np.float64)
+    else:
+        protected = np.asarray(data.categorical, dtype=np.float64)[:, columns]
+    y_true = np.asarray(data.y).ravel() == 1
+    y_pred = np.asarray(preds).ravel() == 1 if preds is not None else y_true
+    combos, inverse = np.unique(protected, axis=0, return_inverse=True)
+    inverse = np.asarray(inverse).ravel()
+    matrix = np.zeros((len(combos), 4))
+    for column, mask in enumerate([y_true & y_pred, ~y_true & y_pred, ~y_true & ~y_pred, y_true & ~y_pred]):
+        matrix[:, column] = np.bincount(inverse[mask], minlength=len(combos))
+    return {tuple(combo.tolist()): matrix[i] for i, combo in enumerate(combos)}
+
+
+def merge_fairness_counts(a, b):
+    if a is None:
+        return dict(b)
+    result = dict(a)
+    for combo, counts in b.items():
+        result[combo] = result[combo] + counts if combo in result else counts
+    return result
+
+
+def get_dataset_count_metrics(counts):
+    total = _sum_counts(counts.values())
+    positives = total[0] + total[3]
+    negatives = total[1] + total[2]
+    return {"base_rate": positives / (positives + negatives), "num_instances": positives + negatives,
+            "num_negatives": negatives, "num_positives": positives}
+
+
+def get_classification_count_metrics(counts, prot_attr, priv_group_list, unpriv_group_list):
+    combos = list(counts.keys())
+    privileged = [_matches(combo, prot_attr, priv_group_list) for combo in combos]
+    unprivileged = [_matches(combo, prot_attr, unpriv_group_list) for combo in combos]
+    matrices = {None: _sum_counts(counts.values()),
+                True: _sum_counts([counts[c] for c, p in zip(combos, privileged) if p]),
+                False: _sum_counts([counts[c] for c, u in zip(combos, unprivileged) if u])}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = {key: _rates(matrix) for key, matrix in matrices.items()}
+        result = {}
+        for name in ["error_rate", "false_discovery_rate", "false_negative_rate", "negative_predictive_value",
+                     "positive_predictive_value", "true_negative_rate", "true_positive_rate"]:
+            result[name] = rates[None][name]
+        for name in ["error_rate", "false_discovery_rate", "false_negative_rate", "true_positive_rate"]:
+            result[name + "_difference"] = rates[False][name] - rates[True][name]
+        for name in ["error_rate", "false_discovery_rate", "false_negative_rate"]:
+            result[name + "_ratio"] = rates[False][name] / rates[True][name]
+        result["disparate_impact"] = rates[False]["selection_rate"] / rates[True]["selection_rate"]
+        result["statistical_parity_difference"] = rates[False]["selection_rate"] - rates[True]["selection_rate"]
+        result["equal_opportunity_difference"] = result["true_positive_rate_difference"]
+        result["average_odds_difference"] = 0.5 * (rates[False]["false_positive_rate"] - rates[True]["false_positive_rate"]
+                                                   + result["true_positive_rate_difference"])
+
+        tp, fp, tn, fn = matrices[None]
+        for name, value in [("false_negatives", fn), ("false_positives", fp), ("true_negatives", tn),
+                            ("true_positives", tp), ("generalized_false_negatives", fn),
+                            ("generalized_false_positives", fp), ("generalized_true_negatives", tn),
+                            ("generalized_true_positives", tp), ("instances", tp + fp + tn + fn),
+                            ("negatives", fp + tn), ("positives", tp + fn), ("pred_negatives", tn + fn),
+                            ("pred_positives", tp + fp)]:
+            result["num_" + name] = value
+        result["generalized_true_negative_rate"] = rates[None]["true_negative_rate"]
+        result["generalized_true_positive_rate"] = rates[None]["true_positive_rate"]
+
+        # b = 1 + y_pred - y_true is 0 for false negatives, 2 for false positives and 1 otherwise.
+        b_values, b_weights = np.array([0.0, 1.0, 2.0]), np.array([fn, tp + tn, fp])
+        result["generalized_entropy_index"] = _generalized_entropy(b_values, b_weights, 2)
+        result["coefficient_of_variation"] = np.sqrt(2 * result["generalized_entropy_index"])
+
+        # Between group indices replace b by the mean b of the group each row falls in.
+        group_means = np.array([1 + (counts[c][1] - counts[c][3]) / np.sum(counts[c]) for c in combos])
+        group_weights = np.array([np.sum(counts[c]) for c in combos])
+        result["between_all_groups_generalized_entropy_index"] = _generalized_entropy(group_means, group_weights, 2)
+        result["between_all_groups_theil_index"] = _generalized_entropy(group_means, group_weights, 1)
+        result["between_all_groups_coefficient_of_variation"] = \
+            np.sqrt(2 * result["between_all_groups_generalized_entropy_index"])
+
+        b_values, b_weights = [], []
+        for key, members in [(True, privileged), (False, [u and not p for u, p in zip(unprivileged, privileged)])]:
+            if np.sum(matrices[key]) > 0:
+                b_values.append(1 + (matrices[key][1] - matrices[key][3]) / np.sum(matrices[key]))
+                b_weights.append(np.sum([np.sum(counts[c]) for c, m in zip(combos, members) if m]))
+        b_values.append(0.0)
+        b_weights.append(np.sum(matrices[None]) - np.sum(b_weights))
+        b_values, b_weights = np.array(b_values), np.array(b_weights)
+        result["between_group_generalized_entropy_index"] = _generalized_entropy(b_values, b_weights, 2)
+        result["between_group_theil_index"] = _generalized_entropy(b_values, b_weights, 1)
+        result["between_group_coefficient_of_variation"] = np.sqrt(2 * result["between_group_generalized_entropy_index"])
+
+        true_rates = np.array([(counts[c][0] + counts[c][3] + 0.5) / (np.sum(counts[c]) + 1.0) for c in combos])
+        pred_rates = np.array([(counts[c][0] + counts[c][1] + 0.5) / (np.sum(counts[c]) + 1.0) for c in combos])
+        result["smoothed_empirical_differential_fairness"] = _differential_fairness(true_rates)
+        result["differential_fairness_bias_amplification"] = \
+            _differential_fairness(pred_rates) - result["smoothed_empirical_differential_fairness"]
+    return result
+
+
+def _sum_counts(counts):
+    return np.sum(list(counts), axis=0) if len(counts) > 0 else np.zeros(4)
+
+
+# Privileged and unprivileged conditions are an OR over the listed dictionaries, and an AND within each one.
+def _matches(combo, prot_attr, group_list):
+    values = dict(zip(prot_attr, combo))
+    return any(all(values.get(attr) == value for attr, value in group.items()) for group in group_list)
+
+
+def _rates(matrix):
+    tp, fp, tn, fn = matrix
+    return {"error_rate": (fp + fn) / (tp + fp + tn + fn), "false_discovery_rate": fp / (tp + fp),
+            "false_negative_rate": fn / (tp + fn), "false_positive_rate": fp / (fp + tn),
+            "negative_predictive_value": tn / (tn + fn), "positive_predictive_value": tp / (tp + fp),
+            "true_negative_rate": tn / (tn + fp), "true_positive_rate": tp / (tp + fn),
+            "selection_rate": (tp + fp) / (tp + fp + tn + fn)}
+
+
+def _generalized_entropy(b, weights, alpha):
+    mu = np.sum(weights * b) / np.sum(weights)
+    if alpha == 1:
+        terms = np.where(b > 0, b / mu * np.log(np.where(b > 0, b, 1) / mu), 0)
+        return np.sum(weights * terms) / np.sum(weights)
+    return np.sum(weights * ((b / mu) ** alpha - 1)) / np.sum(weights) / (alpha * (alpha - 1))
+
+
+def _differential_fairness(rates):
+    pos_ratio = np.abs(np.log(rates)[:, None] - np.log(rates)[None, :])
+    neg_ratio = np.abs(np.log(1 - rates)[:, None] - np.log(1 - rates)[None, :])
+    return np.max(np.maximum(pos_ratio, neg_ratio))
@@ -0,0 +1,118 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import threading
+import numpy as np
+import scipy.sparse
+import sklearn.metrics
+from RAI.utils.sparse_stats import sparse_moment_state, sparse_extremes
+from RAI.utils.streaming_stats import moment_state
+
+__all__ = ['ComputeContext', 'get_intermediate', 'get_scalar_moments', 'get_confusion_matrix', 'get_accuracy']
+
+
+class ComputeContext:
+    """
+    ComputeContext memoizes named intermediate values shared between MetricGroups during a single compute.
+    MetricManager creates a ComputeContext for each compute and passes it to MetricGroups in data_dict["context"].
+    Each intermediate is built once, even when several MetricGroups request it concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._values = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, function, *args, **kwargs):
+        """
+        Returns the intermediate stored under name, building it with function(*args, **kwargs) on first use
+
+        :param name: name of the intermediate value
+        :param function: function used to build the intermediate value
+
+        :return: the intermediate value
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._values:
+                self._values[name] = function(*args, **kwargs)
+        return self._values[name]
+
+    def clear(self) -> None:
+        """
+        Removes all stored intermediate values
+
+        :return: None
+        """
+        with self._lock:
+            self._values = {}
+            self._locks = {}
+
+    def __contains__(self, name):
+        return name in self._values
+
+    # Locks can not be pickled, which is required when metric groups run in worker processes
+    def __getstate__(self):
+        return {"_values": self._values}
+
+    def __setstate__(self, state):
+        self._values = state["_values"]
+        self._locks = {}
+        self._lock = threading.Lock()
+
+
+# Returns a named intermediate from the data_dict's context, or builds it directly when there is no context
+def get_intermediate(data_dict, name, function, *args, **kwargs):
+    context = data_dict.get("context")
+    if context is None:
+        return function(*args, **kwargs)
+    return context.get(name, function, *args, **kwargs)
+
+
+# Returns the per column mean, standard deviation, minimum and maximum of the scalar data
+def get_scalar_moments(data_dict):
+    return get_intermediate(data_dict, "scalar_moments", _scalar_moments, data_dict["data"].scalar)
+
+
+def get_confusion_matrix(data_dict):
+    return get_intermediate(data_dict, "confusion_matrix", sklearn.metrics.confusion_matrix,
+                            data_dict["data"].y, data_dict["predict"])
+
+
+def get_accuracy(data_dict):
+    return get_intermediate(data_dict, "accuracy", sklearn.metrics.accuracy_score,
+                            data_dict["data"].y, data_dict["predict"])
+
+
+def _scalar_moments(scalar_data):
+    if scipy.sparse.issparse(scalar_data):
+        moments = sparse_moment_state(scalar_data)
+        minimum, maximum = sparse_extremes(scalar_data)
+        return {"mean": moments["mean"], "std": np.sqrt(moments["m2"] / moments["n"]), "min": minimum, "max": maximum}
+    if np.asarray(scalar_data).dtype == np.float32:
+        # float32 data is summed in float64 without a float64 copy, see moment_state
+        moments = moment_state(scalar_data)
+        return {"mean": moments["mean"], "std": np.sqrt(moments["m2"] / moments["n"]),
+                "min": np.min(scalar_data, axis=0).astype(np.float64),
+                "max": np.max(scalar_data, axis=0).astype(np.float64)}
+    return {"mean": np.mean(scalar_data, axis=0),
+            "std": np.std(scalar_data, axis=0),
+            "min": np.min(scalar_data, axis=0),
+            "max": np.max(scalar_data, axis=0)}
@@ -15,4 +15,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .basic_explainablity import BasicExplainablityGroup
\ No newline at end of file
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+lazy_classes = {"BasicExplainablityGroup": ".basic_explainablity"}
+__getattr__ = lazy_import(__name__, lazy_classes)
@@ -18,6 +18,7 @@
 import os
 import numpy as np
 from RAI.metrics.metric_group import MetricGroup
+from RAI.metrics.compute_context import get_scalar_moments
 
 
 class BasicExplainablityGroup(MetricGroup, class_location=os.path.abspath(__file__)):
@@ -35,10 +36,11 @@ class BasicExplainablityGroup(MetricGroup, class_location=os.path.abspath(__file
                 args = self.ai_system.metric_manager.user_config["stats"]["args"]
 
             scalar_data = data_dict["data"].scalar
-            mean_v = np.mean(scalar_data, **args.get("mean", {}), axis=0, keepdims=True)
-            std_v = np.std(scalar_data, **args.get("covariance", {}), axis=0, keepdims=True)
-            max_v = np.max(scalar_data, axis=0, keepdims=True)
-            min_v = np.min(scalar_data, axis=0, keepdims=True)
+            moments = get_scalar_moments(data_dict)
+            mean_v = np.mean(scalar_data, **args["mean"], axis=0) if "mean" in args else moments["mean"]
+            std_v = np.std(scalar_data, **args["covariance"], axis=0) if "covariance" in args else moments["std"]
+            max_v = moments["max"]
+            min_v = moments["min"]
 
             self.metrics["explainable_model"].value = True
 
@@ -14,7 +14,12 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from .group_fairness import GroupFairnessMetricGroup
-from .individual_fairness import IndividualFairnessMetricGroup
-from .general_dataset_fairness import GeneralDatasetFairnessGroup
-from .general_prediction_fairness import GeneralPredictionFairnessGroup
+
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+lazy_classes = {"GroupFairnessMetricGroup": ".group_fairness",
+                "IndividualFairnessMetricGroup": ".individual_fairness",
+                "GeneralDatasetFairnessGroup": ".general_dataset_fairness",
+                "GeneralPredictionFairnessGroup": ".general_prediction_fairness"}
+__getattr__ = lazy_import(__name__, lazy_classes)
@@ -15,12 +15,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from RAI.metrics.ai360_helper import get_binary_dataset
+from RAI.metrics.ai360_helper import get_binary_dataset, get_fairness_counts, merge_fairness_counts, \
+    get_dataset_count_metrics
 from RAI.metrics.metric_group import MetricGroup
+import scipy.sparse
 import os
 
 
 class GeneralDatasetFairnessGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
 
@@ -32,14 +36,27 @@ class GeneralDatasetFairnessGroup(MetricGroup, class_location=os.path.abspath(__
             and "protected_attributes" in ai_system.metric_manager.user_config["fairness"] \
             and len(ai_system.metric_manager.user_config["fairness"]["protected_attributes"]) > 0
 
-    def update(self, data):
-        pass
+    def get_state(self, data_dict):
+        prot_attr = self.ai_system.metric_manager.user_config["fairness"]["protected_attributes"]
+        return {"counts": get_fairness_counts(self, data_dict["data"], None, prot_attr)}
+
+    def merge_state(self, state, other):
+        return {"counts": merge_fairness_counts(state["counts"], other["counts"])}
+
+    def compute_from_state(self):
+        for metric, value in get_dataset_count_metrics(self.persistent_data["counts"]).items():
+            self.metrics[metric].value = value
 
     def getConfig(self):
         return self.config
 
     def compute(self, data_dict):
         data = data_dict["data"]
+        if scipy.sparse.issparse(data.X):
+            # aif360 needs a dense DataFrame, while the counts only need the protected attribute columns
+            self.persistent_data = self.get_state(data_dict)
+            self.compute_from_state()
+            return
         prot_attr = []
         if self.ai_system.metric_manager.user_config is not None and "fairness" in self.ai_system.metric_manager.user_config and "priv_group" in \
                 self.ai_system.metric_manager.user_config["fairness"]:
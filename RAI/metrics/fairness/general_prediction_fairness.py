@@ -16,17 +16,37 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
-import pandas as pd
 from RAI.metrics.ai360_helper import get_classification_dataset
+from RAI.metrics.ai360_helper import get_fairness_counts, merge_fairness_counts, get_classification_count_metrics
+from RAI.metrics.compute_context import get_intermediate
 import os
 
 
 class GeneralPredictionFairnessGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    # Every metric apart from consistency is a function of the confusion counts per protected group.
+    # Consistency needs the nearest neighbors of each row over all data seen, so it is unset when values come from a merged state.
+    def get_state(self, data_dict):
+        prot_attr = self.ai_system.metric_manager.user_config["fairness"]["protected_attributes"]
+        return {"counts": get_fairness_counts(self, data_dict["data"], data_dict["predict"], prot_attr)}
+
+    def merge_state(self, state, other):
+        return {"counts": merge_fairness_counts(state["counts"], other["counts"])}
+
+    def compute_from_state(self):
+        priv_group_list = []
+        unpriv_group_list = []
+        prot_attr = self.ai_system.metric_manager.user_config["fairness"]["protected_attributes"]
+        for group in self.ai_system.metric_manager.user_config["fairness"].get("priv_group", {}):
+            priv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["privileged"]})
+            unpriv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["unprivileged"]})
+        values = get_classification_count_metrics(self.persistent_data["counts"], prot_attr, priv_group_list, unpriv_group_list)
+        for metric in self.metrics:
+            self.metrics[metric].value = values.get(metric)
 
     @classmethod
     def is_compatible(cls, ai_system):
@@ -53,7 +73,8 @@ class GeneralPredictionFairnessGroup(MetricGroup, class_location=os.path.abspath
                 priv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["privileged"]})
                 unpriv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["unprivileged"]})
 
-        cd = get_classification_dataset(self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
+        cd = get_intermediate(data_dict, "classification_metric", get_classification_dataset,
+                              self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
         self.metrics['average_odds_difference'].value = cd.average_odds_difference()
         self.metrics['between_all_groups_coefficient_of_variation'].value = cd.between_all_groups_coefficient_of_variation()
         self.metrics['between_all_groups_generalized_entropy_index'].value = cd.between_all_groups_generalized_entropy_index()
@@ -62,7 +83,8 @@ class GeneralPredictionFairnessGroup(MetricGroup, class_location=os.path.abspath
         self.metrics['between_group_generalized_entropy_index'].value = cd.between_group_generalized_entropy_index()
         self.metrics['between_group_theil_index'].value = cd.between_group_theil_index()
         self.metrics['coefficient_of_variation'].value = cd.coefficient_of_variation()
-        self.metrics['consistency'].value = cd.consistency()[0]
+        if self.is_requested('consistency'):  # Nearest neighbor search over every row
+            self.metrics['consistency'].value = cd.consistency()[0]
         self.metrics['differential_fairness_bias_amplification'].value = cd.differential_fairness_bias_amplification()
         self.metrics['error_rate'].value = cd.error_rate()
         self.metrics['error_rate_difference'].value = cd.error_rate_difference()
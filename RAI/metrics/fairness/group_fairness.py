@@ -16,18 +16,40 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
-import pandas as pd
 import os
 from RAI.metrics.ai360_helper import get_classification_dataset
-from aif360.sklearn.metrics import average_odds_error
+from RAI.metrics.ai360_helper import get_fairness_counts, merge_fairness_counts, get_classification_count_metrics
+from RAI.metrics.compute_context import get_intermediate
 
 
 class GroupFairnessMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    # average_odds_error is computed by aif360's sklearn API over the raw rows, so it is unset when values come from a merged state.
+    def get_state(self, data_dict):
+        prot_attr = self.ai_system.metric_manager.user_config["fairness"]["protected_attributes"]
+        return {"counts": get_fairness_counts(self, data_dict["data"], data_dict["predict"], prot_attr)}
+
+    def merge_state(self, state, other):
+        return {"counts": merge_fairness_counts(state["counts"], other["counts"])}
+
+    def compute_from_state(self):
+        priv_group_list = []
+        unpriv_group_list = []
+        prot_attr = self.ai_system.metric_manager.user_config["fairness"]["protected_attributes"]
+        for group in self.ai_system.metric_manager.user_config["fairness"].get("priv_group", {}):
+            priv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["privileged"]})
+            unpriv_group_list.append({group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["unprivileged"]})
+        values = get_classification_count_metrics(self.persistent_data["counts"], prot_attr, priv_group_list, unpriv_group_list)
+        self.metrics['disparate_impact_ratio'].value = values['disparate_impact']
+        self.metrics['statistical_parity_difference'].value = values['statistical_parity_difference']
+        self.metrics['equal_opportunity_difference'].value = values['equal_opportunity_difference']
+        self.metrics['average_odds_difference'].value = values['average_odds_difference']
+        self.metrics['average_odds_error'].value = None
+        self.metrics['between_group_generalized_entropy_error'].value = values['between_group_generalized_entropy_index']
 
     @classmethod
     def is_compatible(cls, ai_system):
@@ -56,7 +78,8 @@ class GroupFairnessMetricGroup(MetricGroup, class_location=os.path.abspath(__fil
                 unpriv_group_list.append(
                     {group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["unprivileged"]})
 
-        cd = get_classification_dataset(self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
+        cd = get_intermediate(data_dict, "classification_metric", get_classification_dataset,
+                              self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
         self.metrics['disparate_impact_ratio'].value = cd.disparate_impact()
         self.metrics['statistical_parity_difference'].value = cd.statistical_parity_difference()
         self.metrics['equal_opportunity_difference'].value = cd.equal_opportunity_difference()
@@ -65,9 +88,10 @@ class GroupFairnessMetricGroup(MetricGroup, class_location=os.path.abspath(__fil
         self.metrics['between_group_generalized_entropy_error'].value = cd.between_group_generalized_entropy_index()
 
     def _average_odds_error(self, data, preds, prot_attr):
+        import pandas as pd
+        from aif360.sklearn.metrics import average_odds_error
         names = [feature.name for feature in self.ai_system.meta_database.features if feature.categorical]
         df = pd.DataFrame(data.categorical, columns=names)
         df['y'] = data.y
-        gt_series = df['y'].squeeze()
-        gt_series.index = df['race']
+        gt_series = df.set_index(prot_attr)['y']
         return average_odds_error(gt_series, preds, prot_attr=prot_attr)
@@ -18,6 +18,7 @@
 from RAI.metrics.metric_group import MetricGroup
 import os
 from RAI.metrics.ai360_helper import get_classification_dataset
+from RAI.metrics.compute_context import get_intermediate
 
 
 class IndividualFairnessMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
@@ -54,7 +55,8 @@ class IndividualFairnessMetricGroup(MetricGroup, class_location=os.path.abspath(
                 unpriv_group_list.append(
                     {group: self.ai_system.metric_manager.user_config["fairness"]["priv_group"][group]["unprivileged"]})
 
-        cd = get_classification_dataset(self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
+        cd = get_intermediate(data_dict, "classification_metric", get_classification_dataset,
+                              self, data, preds, prot_attr, priv_group_list, unpriv_group_list)
         self.metrics['generalized_entropy_index'].value = cd.generalized_entropy_index()
         self.metrics['theil_index'].value = cd.theil_index()
         self.metrics['coefficient_of_variation'].value = cd.coefficient_of_variation()
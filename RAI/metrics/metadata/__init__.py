@@ -15,5 +15,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .metadata import MetadataGroup
-from .tree_models import TreeModels
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+lazy_classes = {"MetadataGroup": ".metadata",
+                "TreeModels": ".tree_models"}
+__getattr__ = lazy_import(__name__, lazy_classes)
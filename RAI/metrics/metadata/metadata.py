@@ -23,11 +23,26 @@ import os
 
 
 class MetadataGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    def get_state(self, data_dict):
+        self.compute(data_dict)
+        return {"sample_count": self.metrics["sample_count"].value, "tag": data_dict["tag"]}
+
+    def merge_state(self, state, other):
+        return {"sample_count": state["sample_count"] + other["sample_count"], "tag": other["tag"]}
+
+    def compute_from_state(self):
+        self.metrics["date"].value = self._get_time()
+        self.metrics["description"].value = self.ai_system.model.description
+        self.metrics["sample_count"].value = self.persistent_data["sample_count"]
+        self.metrics["total_count"].value = self.persistent_data["sample_count"]
+        self.metrics["task_type"].value = self.ai_system.task
+        self.metrics["model"].value = str(self.ai_system.model.agent) if self.ai_system.model.agent else "None"
+        self.metrics["tag"].value = self.persistent_data["tag"]
 
     def compute(self, data_dict):
         self.metrics["date"].value = self._get_time()
@@ -36,7 +51,7 @@ class MetadataGroup(MetricGroup, class_location=os.path.abspath(__file__)):
         samples = 0
         if "data" in data_dict and data_dict["data"] is not None:
             data = data_dict["data"]
-            if isinstance(data, NumpyData):
+            if isinstance(data, (NumpyData, IteratorData)):
                 if data.X is not None:
                     samples = data.X.shape[0]
                 elif data.y is not None:
@@ -47,6 +62,7 @@ class MetadataGroup(MetricGroup, class_location=os.path.abspath(__file__)):
                     samples = len(data_dict[output_type])
 
         self.metrics["sample_count"].value = samples
+        self.metrics["total_count"].value = samples
         self.metrics["task_type"].value = self.ai_system.task
         if self.ai_system.model.agent:
             self.metrics["model"].value = str(self.ai_system.model.agent)
@@ -60,6 +76,7 @@ class MetadataGroup(MetricGroup, class_location=os.path.abspath(__file__)):
         prev_samples = 0 if prev_samples is None else prev_samples
         self.compute(data_dict)
         self.metrics["sample_count"].value += prev_samples
+        self.metrics["total_count"].value = self.metrics["sample_count"].value
 
     def _get_time(self):
         now = datetime.datetime.now()
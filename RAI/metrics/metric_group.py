@@ -16,13 +16,15 @@
 
 
 from abc import ABC, abstractmethod
+import hashlib
 import json
 import numpy as np
+import scipy.sparse
 from RAI.metrics.metric_registry import register_class
 from RAI.utils import compare_runtimes
 from .metric import Metric
 
-__all__ = ['MetricGroup']
+__all__ = ['MetricGroup', 'is_compatible_config', 'has_sparse_data']
 
 
 class MetricGroup(ABC):
@@ -34,6 +36,8 @@ class MetricGroup(ABC):
 
     name = ""
     config = None
+    version = None  # Digest of the group's source and config, which changes whenever either is edited
+    supports_update = False  # True for groups which keep a mergeable state, see get_state and merge_state
 
     # Checks if the group is compatible with the provided AiSystem
     @classmethod
@@ -51,25 +55,7 @@ class MetricGroup(ABC):
       
         """
         
-        compatible = cls.config["compatibility"]["task_type"] == [] \
-                     or any(i == ai_system.task for i in cls.config["compatibility"]["task_type"]) \
-                     or (any(i == "classification" for i in cls.config["compatibility"]["task_type"])
-                          and ai_system.task == "binary_classification")
-        compatible = compatible and (cls.config["compatibility"]["data_type"] is None or cls.config["compatibility"][
-            "data_type"] == [] or all(item in ai_system.meta_database.data_format
-                                      for item in cls.config["compatibility"]["data_type"]))
-        compatible = compatible and (cls.config["compatibility"]["output_requirements"] == [] or
-                                     all(item in ai_system.data_dict for item in
-                                         cls.config["compatibility"]["output_requirements"]))
-        compatible = compatible and (cls.config["compatibility"]["dataset_requirements"] is None or
-                                     all(item in ai_system.meta_database.stored_data for item in
-                                         cls.config["compatibility"]["dataset_requirements"]))
-        compatible = compatible and (cls.config["compatibility"]["data_requirements"] == [] or
-                                     all(type(item).__name__ in cls.config["compatibility"]["data_requirements"] for
-                                         item in ai_system.dataset.data_dict.values()))
-        compatible = compatible and compare_runtimes(ai_system.metric_manager.user_config.get("time_complexity"),
-                                                     cls.config["complexity_class"])
-        return compatible
+        return is_compatible_config(cls.config, ai_system)
 
     # Registers a subclass
     def __init_subclass__(cls, class_location=None, **kwargs):
@@ -77,6 +63,8 @@ class MetricGroup(ABC):
         config_file = class_location[:-2] + "json"
         cls.config = json.load(open(config_file))
         cls.name = cls.config["name"]
+        with open(class_location, "rb") as f:
+            cls.version = hashlib.sha1(f.read() + json.dumps(cls.config, sort_keys=True).encode("utf-8")).hexdigest()
         register_class(cls.name, cls)
 
     def __init__(self, ai_system) -> None:
@@ -89,6 +77,7 @@ class MetricGroup(ABC):
         self.display_name = self.name
         self.compatiblity = {}
         self.status = "OK"
+        self.requested = None  # Names of the metrics to compute, or None for every metric of the group
         self.reset()
 
         if self.load_config(self.config):
@@ -163,6 +152,29 @@ class MetricGroup(ABC):
             self.metrics[metric_name].unique_name = self.name + " > " + metric_name
             self.metrics[metric_name].tags = self.tags
 
+    def is_requested(self, *metric_names):
+        """
+        Returns True if any of the metrics was requested. Groups check this before computing a metric,
+        or an intermediate value shared by several metrics, so that unrequested work is skipped.
+
+
+        :param: metric_names
+
+        :return: Boolean
+        """
+        return self.requested is None or any(metric_name in self.requested for metric_name in metric_names)
+
+    def get_requested_metrics(self):
+        """
+        Returns the names of the requested metrics, in the order of the group's config
+
+
+        :param: None
+
+        :return: list
+        """
+        return [metric_name for metric_name in self.metrics if self.is_requested(metric_name)]
+
     def get_metric_values(self):
         """
         Returns the metric with the name and its corresponding value
@@ -176,7 +188,7 @@ class MetricGroup(ABC):
       
         """ 
         results = {}
-        for metric_name in self.metrics:
+        for metric_name in self.get_requested_metrics():
             if self.metrics[metric_name].type == 'vector':
                 results[metric_name + "-single"] = self.metrics[metric_name].value[0]
                 val = self.metrics[metric_name].value[1]
@@ -205,7 +217,7 @@ class MetricGroup(ABC):
       
         """ 
         results = {}
-        for metric_name in self.metrics:
+        for metric_name in self.get_requested_metrics():
             if self.metrics[metric_name].type == 'vector':
                 results[metric_name + "-single"] = self.metrics[metric_name].value[0]
                 val = self.metrics[metric_name].value[1]
@@ -223,10 +235,111 @@ class MetricGroup(ABC):
         pass
 
     def compute_batch(self, data):
-        pass
+        """
+        Computes a batch of an IteratorData. Groups which support updates fold the state of the batch into
+        persistent_data, and finalize_batch_compute sets the metric values from the state of every batch.
+
+
+        :param: data
+
+        :return: None
+        """
+        if self.supports_update:
+            state = self.get_state(data)
+            self.persistent_data = self.merge_state(self.persistent_data, state) if self.persistent_data else state
 
     def finalize_batch_compute(self):
-        pass
+        """
+        Sets the metric values once every batch of an IteratorData has been passed to compute_batch
+
+
+        :param: None
+
+        :return: None
+        """
+        if self.supports_update and self.persistent_data:
+            self.compute_from_state()
 
     def update(self, data):
+        """
+        Incrementally folds the rows of a data_dict into persistent_data and refreshes the metric values,
+        so that values cover every row seen since the last reset. Groups which support this set supports_update.
+
+
+        :param: data
+
+        :return: None
+        """
+        if self.supports_update:
+            state = self.get_state(data)
+            self.persistent_data = self.merge_state(self.persistent_data, state) if self.persistent_data else state
+            self.compute_from_state()
+
+    def get_state(self, data):
+        """
+        Returns the partial state of the rows in a data_dict. States are picklable collections of counts,
+        sums, sketches and confusion matrices, which merge_state combines without needing the rows again.
+
+
+        :param: data
+
+        :return: dict
+        """
+        pass
+
+    def merge_state(self, state, other):
+        """
+        Returns the state covering the rows of both states, leaving both arguments unchanged.
+
+
+        :param: state
+        :param: other
+
+        :return: dict
+        """
         pass
+
+    def compute_from_state(self):
+        """
+        Sets the metric values from the state held in persistent_data
+
+
+        :param: None
+
+        :return: None
+        """
+        pass
+
+
+# Checks the compatibility section and complexity class of a config against an AISystem. The manifest holds these,
+# so groups can be checked before their modules are imported. Groups may add checks by overriding is_compatible.
+def is_compatible_config(config, ai_system):
+    compatible = config["compatibility"]["task_type"] == [] \
+                 or any(i == ai_system.task for i in config["compatibility"]["task_type"]) \
+                 or (any(i == "classification" for i in config["compatibility"]["task_type"])
+                      and ai_system.task == "binary_classification")
+    compatible = compatible and (config["compatibility"]["data_type"] is None or config["compatibility"][
+        "data_type"] == [] or all(item in ai_system.meta_database.data_format
+                                  for item in config["compatibility"]["data_type"]))
+    compatible = compatible and (config["compatibility"]["output_requirements"] == [] or
+                                 all(item in ai_system.data_dict for item in
+                                     config["compatibility"]["output_requirements"]))
+    compatible = compatible and (config["compatibility"]["dataset_requirements"] is None or
+                                 all(item in ai_system.meta_database.stored_data for item in
+                                     config["compatibility"]["dataset_requirements"]))
+    compatible = compatible and (config["compatibility"]["data_requirements"] == [] or
+                                 all(any(data_class.__name__ in config["compatibility"]["data_requirements"]
+                                         for data_class in type(item).__mro__)
+                                     for item in ai_system.dataset.data_dict.values()))
+    # Groups which use X must declare that they handle scipy.sparse X without making it dense
+    compatible = compatible and ("X" not in config["compatibility"]["dataset_requirements"]
+                                 or config["compatibility"].get("sparse_data", False)
+                                 or not has_sparse_data(ai_system))
+    compatible = compatible and compare_runtimes(ai_system.metric_manager.user_config.get("time_complexity"),
+                                                 config["complexity_class"])
+    return compatible
+
+
+# True when any split of the AISystem's dataset holds a scipy.sparse X
+def has_sparse_data(ai_system):
+    return any(scipy.sparse.issparse(getattr(item, "X", None)) for item in ai_system.dataset.data_dict.values())
@@ -15,18 +15,39 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+import hashlib
+import json
 import os.path
 import site
+import heapq
+import multiprocessing
+import threading
+import time
+from collections import deque, OrderedDict
+from contextlib import ExitStack
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED, CancelledError
 from typing import List
+import numpy as np
 from RAI import utils
-from RAI.all_types import all_output_requirements, all_complexity_classes, all_dataset_requirements, \
-    all_data_types, all_task_types
-from RAI.metrics.metric_registry import registry
+from RAI.all_types import all_output_requirements, all_precision_types
+from RAI.metrics.metric_registry import manifest, validate_config, get_group_names, get_group_config, \
+    get_group_class
+from RAI.metrics.metric_group import is_compatible_config, has_sparse_data
+from RAI.metrics.compute_context import ComputeContext
+from RAI.metrics.profiler import ComputeProfile, profile_call
+from RAI.metrics.runtime_model import runtime_model
+from RAI.dataset import IteratorData
 import logging
 logger = logging.getLogger(__name__)
 
 __all__ = ['MetricManager']
 
+# Names of metric groups whose configs have already passed _validate_config
+_validated_groups = set()
+all_executor_types = {"thread", "process"}
+max_plans = 8  # Compiled plans kept by each MetricManager, the least recently used being dropped past this
+
 # choose the first site packages folder
 # site_pkgs_path = site.getsitepackages()[0]
 # rai_pkg_path = os.path.join(site_pkgs_path, "RAI")
@@ -50,9 +71,24 @@ class MetricManager(object):
         self._last_certificate_values = None
         self.ai_system = ai_system
         self.metric_groups = {}
+        self._plans = OrderedDict()
+        self._update_states = {}
+        self._profile = None
+        self._last_profile = None
+        self._group_status = None
+        self.runtime_model = runtime_model
+        self.cancel_event = None  # threading.Event which stops a compute before its next metric group once set
+        self.on_group_computed = None  # Called with the name and values of each metric group once it is computed
         self.user_config = {"fairness": {"priv_group": {}, "protected_attributes": [], "positive_label": 1},
                             "time_complexity": "exponential"}
 
+    # The cancel event and group listener of an async compute are not pickled, so metric groups holding the
+    # MetricManager can still be sent to worker processes
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(cancel_event=None, on_group_computed=None)
+        return state
+
     def standardize_user_config(self, user_config: dict):
         """
         Accepts user config values and make in standard group
@@ -69,14 +105,46 @@ class MetricManager(object):
                     assert "unprivileged" in user_config["fairness"]["priv_group"][attr]
                 assert "positive_label" in user_config["fairness"]
                 user_config["fairness"]["protected_attributes"] = protected_classes
-
-    def initialize(self, user_config: dict = None, metric_groups: List[str] = None, max_complexity: str = "linear"):
+        if "inference" in user_config:
+            assert int(user_config["inference"].get("batch_size", 1)) >= 1, "inference batch_size must be at least 1"
+            assert int(user_config["inference"].get("workers", 1)) >= 1, "inference workers must be at least 1"
+        if "profile" in user_config:
+            assert isinstance(user_config["profile"], dict), "profile must be a dict, for example {'memory': True}"
+        if "cache" in user_config:
+            assert int(user_config["cache"].get("max_entries", 1)) >= 1, "cache max_entries must be at least 1"
+            assert int(user_config["cache"].get("max_directory_entries", 1)) >= 1, \
+                "cache max_directory_entries must be at least 1"
+        if "sample" in user_config:
+            assert int(user_config["sample"].get("replicates", 10)) >= 2, "sample replicates must be at least 2"
+            assert 0 < float(user_config["sample"].get("confidence", 0.95)) < 1, \
+                "sample confidence must be between 0 and 1"
+        if "precision" in user_config:
+            assert user_config["precision"] in all_precision_types, \
+                "precision must be one of " + str(all_precision_types)
+        if "scheduler" in user_config:
+            assert user_config["scheduler"].get("executor", "thread") in all_executor_types, \
+                "scheduler executor must be one of " + str(all_executor_types)
+            assert int(user_config["scheduler"].get("workers", 1)) >= 1, "scheduler workers must be at least 1"
+            assert float(user_config["scheduler"].get("process_min_seconds", 0)) >= 0, \
+                "scheduler process_min_seconds must not be negative"
+            assert user_config["scheduler"].get("start_method") in [None] + multiprocessing.get_all_start_methods(), \
+                "scheduler start_method must be one of " + str(multiprocessing.get_all_start_methods())
+            assert int(user_config["scheduler"].get("split_workers", 1)) >= 1, \
+                "scheduler split_workers must be at least 1"
+            assert int(user_config["scheduler"].get("model_workers", 1)) >= 1, \
+                "scheduler model_workers must be at least 1"
+
+    def initialize(self, user_config: dict = None, metric_groups: List[str] = None, max_complexity: str = "linear",
+                   metrics: List[str] = None):
         """
-        Find all compatible metric groups and Remove metrics with missing dependencies and Check for circular dependencies
+        Find all compatible metric groups and Remove metrics with missing dependencies and Check for circular dependencies.
+        The resulting execution plan is cached, and later calls with the same configuration reuse it.
 
         :param user_config(dict): user config data
         :param metric_groups: metric groups data as a list
         :param max_complexity: default linear
+        :param metrics: metric groups or metrics, for example ["metadata", "summary_stats > mean"], to compute.
+            Groups only compute the requested metrics, along with the groups they depend on. By default everything.
     
         :return: None 
         """
@@ -86,56 +154,136 @@ class MetricManager(object):
             for key in user_config:
                 self.user_config[key] = user_config[key]
 
-        self.metric_groups = {}
-        compatible_metrics = []  # Stores compatible metrics
-        dependencies = {}  # Stores a metrics dependencies
-        dependent = {}  # Maps metrics to metrics dependent on it
+        plan_key = self._get_plan_key(metric_groups, metrics)
+        if plan_key in self._plans:
+            self._plans.move_to_end(plan_key)
+            self.metric_groups = self._plans[plan_key]
+            for metric_group_name in self.metric_groups:
+                self.metric_groups[metric_group_name].reset()
+            return
 
-        whitelist = user_config.get("whitelist", registry)
-        blacklist = user_config.get("blacklist", [])
+        self.metric_groups = self._compile_plan(metric_groups, metrics)
+        self._plans[plan_key] = self.metric_groups
+        while len(self._plans) > max_plans:
+            self._plans.popitem(last=False)
 
-        # Find all compatible metric groups
-        for metric_group_name in registry:
+    def clear_plan_cache(self) -> None:
+        """
+        Removes all cached execution plans, forcing the next initialize to rebuild the metric groups
+
+        :param self: None
+
+        :return: None
+        """
+        self._plans = OrderedDict()
+
+    def _get_plan_key(self, metric_groups, metrics=None):
+        # Everything that MetricGroup.is_compatible looks at must be part of the key
+        ai_system = self.ai_system
+        data = ai_system.data_dict.get("data")
+        data_shape = None
+        if data is not None and data.X is not None:
+            data_shape = list(np.shape(data.X)[1:])
+        key = {"user_config": self.user_config,
+               "metric_groups": metric_groups,
+               "metrics": sorted(metrics) if metrics is not None else None,
+               "task": ai_system.task,
+               "output_types": sorted(x for x in all_output_requirements if x in ai_system.data_dict),
+               "data_format": sorted(ai_system.meta_database.data_format),
+               "stored_data": sorted(ai_system.meta_database.stored_data),
+               "data_types": sorted(type(x).__name__ for x in ai_system.dataset.data_dict.values()),
+               "data_shape": data_shape,
+               "sparse_data": has_sparse_data(ai_system),
+               "agent": type(ai_system.model.agent).__module__,
+               "registry": sorted(get_group_names())}
+        return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _compile_plan(self, metric_groups, metrics=None):
+        result = {}
+        compatible_metrics = {}  # Maps compatible metrics to their planning configs
+        dependent = {}  # Maps metrics to metrics dependent on it
+        selected = {}  # Maps metrics to the names of their metrics which are computed, None meaning all of them
+        group_names = get_group_names()
+
+        # Whitelists and blacklists hold metric group names, or "group > metric" names for single metrics
+        whitelist = _parse_selection(self.user_config.get("whitelist", group_names))
+        blacklist = _parse_selection(self.user_config.get("blacklist", []))
+        required = None
+        if metrics is not None:
+            required = _get_required(_parse_selection(metrics), group_names)
+
+        # Find all compatible metric groups. Groups are checked against their manifest config first, so the
+        # modules of groups which are not selected or not compatible are never imported.
+        for metric_group_name in group_names:
             if metric_groups is not None and metric_group_name not in metric_groups:
                 continue
-            metric_class = registry[metric_group_name]
-            self._validate_config(metric_class.config)
-            if metric_class.is_compatible(
-                    self.ai_system) and metric_group_name in whitelist and metric_group_name not in blacklist:
-                compatible_metrics.append(metric_class)
-                dependencies[metric_class.config["name"]] = metric_class.config["dependency_list"]
-                for dependency in metric_class.config["dependency_list"]:
-                    if dependent.get(dependency) is None:
-                        dependent[dependency] = []
-                    dependent[dependency].append(metric_class.config["name"])
-
-        # Remove metrics with missing dependencies
-        removed = True
-        while removed:
-            removed = False
-            for metric in compatible_metrics:
-                for metric_dependency in dependencies[metric.config["name"]]:
-                    if metric_dependency not in dependencies:
-                        compatible_metrics.remove(metric)
-                        dependencies.pop(metric.config["name"])
-                        print("Missing dependency ", metric_dependency, " for ", metric.config["name"])
-                        removed = True
-                        break
-
-        # Check for circular dependencies
-        while len(compatible_metrics) != 0:
-            removed = False
-            for metric in compatible_metrics:
-                metric_name = metric.config["name"]
-                if len(dependencies[metric_name]) == 0:
-                    for dependent_metric in dependent.get(metric_name, []):
-                        dependencies[dependent_metric].remove(metric_name)
-                    self.metric_groups[metric_name] = metric(self.ai_system)
-                    logger.info(f"metric group: {metric_name} was loaded")
-                    compatible_metrics.remove(metric)
-                    removed = True
-            if not removed:
-                raise AttributeError("Circular dependency detected in ", [val.name for val in compatible_metrics])
+            if required is not None and metric_group_name not in required:
+                continue
+            config = get_group_config(metric_group_name)
+            if metric_group_name not in manifest.entries() and metric_group_name not in _validated_groups:
+                self._validate_config(config)
+                _validated_groups.add(metric_group_name)
+            selection = _select_metrics(metric_group_name, config.get("metrics", {}), whitelist, blacklist)
+            if selection != set() and is_compatible_config(config, self.ai_system) \
+                    and get_group_class(metric_group_name).is_compatible(self.ai_system):
+                compatible_metrics[config["name"]] = config
+                selected[config["name"]] = selection
+                for dependency in config["dependency_list"]:
+                    dependent.setdefault(dependency, []).append(config["name"])
+
+        # Remove metrics with missing dependencies, along with everything depending on them
+        missing = deque()
+        for metric_name, metric in compatible_metrics.items():
+            for metric_dependency in metric["dependency_list"]:
+                if metric_dependency not in compatible_metrics:
+                    print("Missing dependency ", metric_dependency, " for ", metric_name)
+                    missing.append(metric_name)
+                    break
+        while missing:
+            metric_name = missing.popleft()
+            if compatible_metrics.pop(metric_name, None) is None:
+                continue
+            for dependent_metric in dependent.get(metric_name, []):
+                if dependent_metric in compatible_metrics:
+                    print("Missing dependency ", metric_name, " for ", dependent_metric)
+                    missing.append(dependent_metric)
+
+        # Keep only the requested metrics, and every group they depend on
+        if metrics is not None:
+            requested = _parse_selection(metrics)
+            needed = deque(name for name in requested if name in compatible_metrics)
+            required = set()
+            while needed:
+                metric_name = needed.popleft()
+                if metric_name not in required:
+                    required.add(metric_name)
+                    needed.extend(compatible_metrics[metric_name]["dependency_list"])
+            for metric_name in list(compatible_metrics):
+                if metric_name not in required:
+                    compatible_metrics.pop(metric_name)
+                elif metric_name in requested:
+                    selected[metric_name] = _select_metrics(
+                        metric_name, compatible_metrics[metric_name].get("metrics", {}), requested, {},
+                        selected[metric_name])
+            dependent = {name: [d for d in dependents if d in compatible_metrics] for name, dependents in dependent.items()}
+
+        # Order the metrics so dependencies are created first, and check for circular dependencies
+        in_degree = {name: len(set(metric["dependency_list"])) for name, metric in compatible_metrics.items()}
+        ready = deque(name for name in compatible_metrics if in_degree[name] == 0)
+        while ready:
+            metric_name = ready.popleft()
+            result[metric_name] = get_group_class(metric_name)(self.ai_system)
+            result[metric_name].requested = selected[metric_name]
+            logger.info(f"metric group: {metric_name} was loaded")
+            for dependent_metric in set(dependent.get(metric_name, [])):
+                if dependent_metric in in_degree:
+                    in_degree[dependent_metric] -= 1
+                    if in_degree[dependent_metric] == 0:
+                        ready.append(dependent_metric)
+        if len(result) != len(compatible_metrics):
+            raise AttributeError("Circular dependency detected in ",
+                                 [name for name in compatible_metrics if name not in result])
+        return result
 
     def reset_measurements(self) -> None:
         """
@@ -152,6 +300,7 @@ class MetricManager(object):
 
         self._last_certificate_values = None
         self._last_metric_values = None
+        self._update_states = {}
         self._sample_count = 0
         self._time_stamp = None
 
@@ -174,7 +323,7 @@ class MetricManager(object):
                 "compatiblity": self.metric_groups[group].compatiblity,
                 "display_name": self.metric_groups[group].display_name
             }
-            for metric in self.metric_groups[group].metrics:
+            for metric in self.metric_groups[group].get_requested_metrics():
                 result[group][metric] = self.metric_groups[group].metrics[metric].config
         return result
 
@@ -189,29 +338,39 @@ class MetricManager(object):
         result = {}
         for group in self.metric_groups:
 
-            for metric in self.metric_groups[group].metrics:
+            for metric in self.metric_groups[group].get_requested_metrics():
                 metric_obj = self.metric_groups[group].metrics[metric]
                 result[metric_obj.unique_name] = metric_obj.config
                 metric_obj.config["tags"] = self.metric_groups[group].tags  # Change this up after
         return result
 
-    def compute(self, data_dict) -> dict:
+    def compute(self, data_dict, deadline: float = None) -> dict:
         """
-        Perform computation on metric objects and returns the value as a metric group in dict format
+        Perform computation on metric objects and returns the value as a metric group in dict format.
+        Independent metric groups run concurrently when user_config["scheduler"]["workers"] is above 1. With the
+        "process" executor, groups estimated to take at least scheduler["process_min_seconds"], 0.5 by default,
+        run in worker processes, and the others run in threads.
+        With a deadline, groups instead run one at a time from the cheapest estimated cost, and groups which
+        are not estimated to finish in time are skipped. A group still running at the deadline is abandoned.
+        The values of skipped and unfinished groups are None, see get_group_status.
 
         :param data_dict: Accepts the data dict metric object
-        
+        :param deadline: time.perf_counter() value by which the compute must return, or None for no limit
+
         :return: returns the value as a metric group
         """
-        for metric_group_name in self.metric_groups:
-            self.metric_groups[metric_group_name].compute(data_dict)
-        result = {}
-        for group in self.metric_groups:
-            result[group] = {}
-            for metric in self.metric_groups[group].metrics:
-                metric_obj = self.metric_groups[group].metrics[metric]
-                result[group][metric] = utils.jsonify(metric_obj.value)
-        return result
+        self._begin_profile()
+        self._group_status = None
+        data_dict["context"] = ComputeContext()
+        try:
+            if deadline is None:
+                self._run_metric_groups("compute", data_dict)
+            else:
+                self._run_within_deadline(data_dict, deadline)
+        finally:
+            data_dict.pop("context")
+            self._finish_profile()
+        return self._get_results()
 
     def iterator_compute(self, data_dict, preds: dict) -> dict:
         """
@@ -221,41 +380,347 @@ class MetricManager(object):
         :param  preds: prediction value from the detection
         :return: returns the metric objects from a batch of metric group
         """
-        data = data_dict["data"]
-        data.reset()
-        cur_idx = 0
         # Need to reset metric group values
         for group in self.metric_groups:
             self.metric_groups[group].reset()
 
-        while data.next_batch():
-            data_len = 0
-            if data.X is not None:
-                data_len = len(data.X)
-            elif data.y is not None:
-                data_len = len(data.y)
+        self._begin_profile()
+        try:
+            for _ in _iterate_batches(data_dict, preds):
+                data_dict["context"] = ComputeContext()
+                try:
+                    self._run_metric_groups("compute_batch", data_dict)
+                finally:
+                    data_dict.pop("context")
+
+            self._run_metric_groups("finalize_batch_compute")
+        finally:
+            self._finish_profile()
+        return self._get_results()
+
+    def pipeline_compute(self, data_dict, batches) -> dict:
+        """
+        Computes metric groups batch by batch, over (data, predictions) pairs which may still be produced while
+        earlier batches are being computed. Only one batch has to be held in data_dict at a time.
+
+        :param data_dict: Accepts the data dict metric object, holding the tag and the output types computed
+        :param batches: iterable of (data, predictions) pairs, where predictions maps output types to values
 
-            for output_type in all_output_requirements:
-                if output_type in data_dict:
-                    data_dict[output_type] = preds[output_type][cur_idx: cur_idx + data_len]
-                elif output_type in data_dict:
-                    data_dict.pop(output_type)
-            cur_idx += data_len
+        :return: returns the value as a metric group
+        """
+        for group in self.metric_groups:
+            self.metric_groups[group].reset()
 
-            for metric_group_name in self.metric_groups:
-                self.metric_groups[metric_group_name].compute_batch(data_dict)
+        self._begin_profile()
+        try:
+            for data, preds in batches:
+                data_dict["data"] = data
+                for output_type in preds:
+                    data_dict[output_type] = preds[output_type]
+                data_dict["context"] = ComputeContext()
+                try:
+                    self._run_metric_groups("compute_batch", data_dict)
+                finally:
+                    data_dict.pop("context")
+
+            self._run_metric_groups("finalize_batch_compute")
+        finally:
+            self._finish_profile()
+        return self._get_results()
+
+    def update(self, data_dict, state_key: str, base_data_dict: dict = None, base_preds: dict = None) -> dict:
+        """
+        Folds the rows of data_dict into the persistent state kept for state_key, and returns the refreshed
+        values of the metric groups that support updates. The first update of a state_key primes the state
+        with base_data_dict, the data that was last computed on, so that values cover both.
+
+        :param data_dict: Accepts the data dict metric object holding the new rows
+        :param state_key: name of the state to update, usually the dataset split
+        :param base_data_dict: data dict of the last full compute, used to prime a new state
+        :param base_preds: predictions for base_data_dict, required when its data is IteratorData
+
+        :return: returns the value as a metric group, for groups that support updates
+        """
+        states = self._update_states.get(state_key)
+        for metric_group_name in self.metric_groups:
+            self.metric_groups[metric_group_name].reset()
+            if states is not None and metric_group_name in states:
+                self.metric_groups[metric_group_name].persistent_data = states[metric_group_name]
+
+        self._begin_profile()
+        try:
+            if states is None and base_data_dict is not None:
+                if isinstance(base_data_dict["data"], IteratorData):
+                    for _ in _iterate_batches(base_data_dict, base_preds):
+                        self._run_update(base_data_dict)
+                else:
+                    self._run_update(base_data_dict)
+            self._run_update(data_dict)
+        finally:
+            self._finish_profile()
+
+        self._update_states[state_key] = {name: self.metric_groups[name].persistent_data
+                                          for name in self.metric_groups
+                                          if self.metric_groups[name].supports_update}
+        results = self._get_results()
+        return {name: results[name] for name in self._update_states[state_key]}
+
+    def compute_state(self, data_dict, preds: dict = None) -> dict:
+        """
+        Returns the partial state of every metric group which supports updates, for the rows in data_dict.
+        States are picklable, so shards of a dataset can be computed in separate processes or hosts and
+        combined by merge.
+
+        :param data_dict: Accepts the data dict metric object
+        :param preds: predictions for the data, required when the data is IteratorData
+
+        :return: returns the partial state of each metric group in dict format
+        """
+        batches = _iterate_batches(data_dict, preds) if isinstance(data_dict["data"], IteratorData) else [data_dict]
+        states = {}
+        for batch in batches:
+            batch["context"] = ComputeContext()
+            try:
+                for metric_group_name in self.metric_groups:
+                    group = self.metric_groups[metric_group_name]
+                    if group.supports_update:
+                        state = group.get_state(batch)
+                        if metric_group_name in states:
+                            state = group.merge_state(states[metric_group_name], state)
+                        states[metric_group_name] = state
+            finally:
+                batch.pop("context")
+        return states
+
+    def merge(self, states: list) -> dict:
+        """
+        Combines the partial states returned by compute_state into final metric values
+
+        :param states: list of partial states, one per shard of the data
 
+        :return: returns the value as a metric group, for the groups found in the states
+        """
+        merged = []
         for metric_group_name in self.metric_groups:
-            self.metric_groups[metric_group_name].finalize_batch_compute()
+            group = self.metric_groups[metric_group_name]
+            group.reset()
+            group_states = [state[metric_group_name] for state in states if metric_group_name in state]
+            if not group.supports_update or len(group_states) == 0:
+                continue
+            group.persistent_data = group_states[0]
+            for state in group_states[1:]:
+                group.persistent_data = group.merge_state(group.persistent_data, state)
+            group.compute_from_state()
+            merged.append(metric_group_name)
+        results = self._get_results()
+        return {name: results[name] for name in merged}
+
+    def clear_update_state(self, state_key: str = None) -> None:
+        """
+        Removes the persistent state kept by update for state_key, or for every key when state_key is None
+
+        :param state_key: name of the state to remove
+
+        :return: None
+        """
+        if state_key is None:
+            self._update_states = {}
+        else:
+            self._update_states.pop(state_key, None)
+
+    def _run_update(self, data_dict) -> None:
+        data_dict["context"] = ComputeContext()
+        try:
+            self._run_metric_groups("update", data_dict)
+        finally:
+            data_dict.pop("context")
+
+    def get_group_status(self) -> dict:
+        """
+        Returns the status of each metric group in the last compute with a deadline: "complete", "skipped" when
+        it was not started, as it was not estimated to finish in time, or "unfinished" when it was still running
+        at the deadline.
+
+        :param self: None
+
+        :return: dict mapping metric group names to statuses, or None when the last compute had no deadline
+        """
+        return self._group_status
+
+    # Runs the compute of each metric group while it is estimated to finish before the deadline, cheapest first.
+    # Groups run on a daemon thread, so one still running at the deadline can be abandoned. Its instance is then
+    # replaced, so the abandoned thread cannot change the values of later computes.
+    def _run_within_deadline(self, data_dict, deadline: float) -> None:
+        rows = _count_rows([data_dict])
+        status = {name: "skipped" for name in self.metric_groups}
+        costs = {name: self.runtime_model.estimate(name, rows, self.metric_groups[name].config["complexity_class"])
+                 for name in self.metric_groups}
+        waiting_on = {}
+        dependent = {}
+        for name in self.metric_groups:
+            dependencies = set(self.metric_groups[name].dependency_list) & set(self.metric_groups)
+            waiting_on[name] = len(dependencies)
+            for dependency in dependencies:
+                dependent.setdefault(dependency, []).append(name)
+
+        ready = [(costs[name], name) for name in self.metric_groups if waiting_on[name] == 0]
+        heapq.heapify(ready)
+        while ready:
+            cost, name = heapq.heappop(ready)
+            remaining = deadline - time.perf_counter()
+            if cost > remaining:
+                continue
+            if not _run_with_timeout(self._call_metric_group, remaining, name, "compute", data_dict):
+                status[name] = "unfinished"
+                abandoned = self.metric_groups[name]
+                self.metric_groups[name] = type(abandoned)(self.ai_system)
+                self.metric_groups[name].requested = abandoned.requested
+                break
+            status[name] = "complete"
+            self._notify_group(name, "compute")
+            for dependent_group in dependent.get(name, []):
+                waiting_on[dependent_group] -= 1
+                if waiting_on[dependent_group] == 0:
+                    heapq.heappush(ready, (costs[dependent_group], dependent_group))
+        self._group_status = status
+
+    def get_profile(self) -> dict:
+        """
+        Returns the profile of the last compute, batch compute or update, when user_config["profile"] is set.
+        For each metric group and method it holds the calls, wall_time and cpu_time in seconds, the rows
+        given as input, and peak_memory in bytes when user_config["profile"]["memory"] is True.
+
+        :param self: None
+
+        :return: dict, or None when profiling is off
+        """
+        return self._last_profile
+
+    def _begin_profile(self) -> None:
+        config = self.user_config.get("profile")
+        self._profile = ComputeProfile(bool(config.get("memory", False))) if config is not None else None
+
+    # Stores the finished profile, and attaches it to the metadata group's values
+    def _finish_profile(self) -> None:
+        if self._profile is None:
+            self._last_profile = None
+            return
+        self._profile.finish()
+        self._last_profile = self._profile.to_dict()
+        self._profile = None
+        if "metadata" in self.metric_groups and "profile" in self.metric_groups["metadata"].metrics:
+            self.metric_groups["metadata"].metrics["profile"].value = self._last_profile
+
+    # Calls method on a metric group, recording it in the current profile
+    def _call_metric_group(self, metric_group_name: str, method: str, *args, track_memory: bool = True):
+        self._check_cancelled()
+        metric_group = self.metric_groups[metric_group_name]
+        profile = self._profile
+        if profile is None:
+            start = time.perf_counter()
+            result = getattr(metric_group, method)(*args)
+            if method == "compute":
+                self.runtime_model.observe(metric_group_name, _count_rows(args), time.perf_counter() - start)
+            return result
+        result, record = profile_call(getattr(metric_group, method), *args,
+                                      track_memory=track_memory and profile.track_memory)
+        profile.add(metric_group_name, method, record, _count_rows(args))
+        if method == "compute":
+            self.runtime_model.observe(metric_group_name, _count_rows(args), record["wall_time"])
+        return result
+
+    def _check_cancelled(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CancelledError("compute was cancelled")
+
+    # Passes the values of a metric group to on_group_computed once its compute has finished
+    def _notify_group(self, metric_group_name: str, method: str) -> None:
+        if method == "compute" and self.on_group_computed is not None:
+            self.on_group_computed(metric_group_name, self._get_group_results(metric_group_name))
 
+    def _get_group_results(self, group: str) -> dict:
         result = {}
-        for group in self.metric_groups:
-            result[group] = {}
-            for metric in self.metric_groups[group].metrics:
-                metric_obj = self.metric_groups[group].metrics[metric]
-                result[group][metric] = utils.jsonify(metric_obj.value)
+        for metric in self.metric_groups[group].get_requested_metrics():
+            metric_obj = self.metric_groups[group].metrics[metric]
+            result[metric] = utils.jsonify(metric_obj.value)
         return result
 
+    def _get_results(self) -> dict:
+        return {group: self._get_group_results(group) for group in self.metric_groups}
+
+    def _run_metric_groups(self, method: str, *args) -> None:
+        # Runs method on every metric group, starting a group once all groups it depends on have finished
+        scheduler = self.user_config.get("scheduler", {})
+        workers = int(scheduler.get("workers", 1))
+        use_processes = scheduler.get("executor", "thread") == "process" and method == "compute"
+        if workers <= 1 or len(self.metric_groups) <= 1:
+            for metric_group_name in self.metric_groups:
+                self._call_metric_group(metric_group_name, method, *args)
+                self._notify_group(metric_group_name, method)
+            return
+
+        waiting_on = {}
+        dependent = {}
+        dependencies = {}
+        for metric_group_name in self.metric_groups:
+            dependencies[metric_group_name] = set(self.metric_groups[metric_group_name].dependency_list) \
+                & set(self.metric_groups)
+            waiting_on[metric_group_name] = len(dependencies[metric_group_name])
+            for dependency in dependencies[metric_group_name]:
+                dependent.setdefault(dependency, []).append(metric_group_name)
+
+        # Only groups estimated to take at least process_min_seconds are worth sending to a worker process
+        process_groups = set()
+        if use_processes:
+            rows = _count_rows(args)
+            min_seconds = float(scheduler.get("process_min_seconds", 0.5))
+            process_groups = {name for name in self.metric_groups if self.runtime_model.estimate(
+                name, rows, self.metric_groups[name].config["complexity_class"]) >= min_seconds}
+
+        with ExitStack() as stack:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+            process_executor = None
+            if process_groups:
+                # Each worker process receives the parts of the AISystem that groups read and the compute data once,
+                # when it starts, rather than with every group. Its processes are started before the threads of
+                # this compute.
+                payload = (_WorkerSystem(self.ai_system, self.user_config, args[0]),
+                           {name: self.metric_groups[name].requested for name in self.metric_groups}, args)
+                process_executor = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=min(workers, len(process_groups)),
+                    mp_context=_get_process_context(scheduler.get("start_method")),
+                    initializer=_init_process_worker, initargs=payload))
+                process_executor.submit(int).result()
+
+            # Peak memory is not measured for concurrent groups, as allocations of other groups would be counted
+            def submit(name):
+                self._check_cancelled()
+                if name in process_groups:
+                    dependency_values = {dependency: {metric: metric_obj.value for metric, metric_obj
+                                                      in self.metric_groups[dependency].metrics.items()}
+                                         for dependency in dependencies[name]}
+                    return process_executor.submit(_compute_in_process, name, dependency_values)
+                return executor.submit(self._call_metric_group, name, method, *args, track_memory=False)
+
+            running = {submit(name): name for name in self.metric_groups if waiting_on[name] == 0}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    metric_group_name = running.pop(future)
+                    values = future.result()
+                    if metric_group_name in process_groups:
+                        values, record = values
+                        if self._profile is not None:
+                            self._profile.add(metric_group_name, method, record, _count_rows(args))
+                        self.runtime_model.observe(metric_group_name, _count_rows(args), record["wall_time"])
+                        for metric in values:
+                            self.metric_groups[metric_group_name].metrics[metric].value = values[metric]
+                    self._notify_group(metric_group_name, method)
+                    for dependent_group in dependent.get(metric_group_name, []):
+                        waiting_on[dependent_group] -= 1
+                        if waiting_on[dependent_group] == 0:
+                            running[submit(dependent_group)] = dependent_group
+
     # batched_compute
     # if data instance of IteratorData, iterate through batches,
 
@@ -285,62 +750,153 @@ class MetricManager(object):
         return results
 
     def _validate_config(self, config):
-        assert "name" in config and isinstance(config["name"], str), \
-            "All configs must contain names"
-
-        assert "display_name" in config and isinstance(config["display_name"], str), \
-            config["name"] + " must contain a valid display name"
-
-        assert "compatibility" in config, \
-            config["name"] + " must contain compatibility details"
-
-        assert "task_type" in config["compatibility"] and (config["compatibility"]["task_type"] == [] or
-                all(i in all_task_types for i in config["compatibility"]["task_type"])),\
-            config["name"] + "['compatibility']['task_type'] must be empty or one of " + str(all_task_types)
+        validate_config(config)
 
-        assert "data_type" in config["compatibility"] and all(x in all_data_types for x in config["compatibility"]["data_type"]), \
-            config["name"] + "['compatibility']['data_type'] must be one of " + str(all_data_types)
 
-        assert "output_requirements" in config["compatibility"] and \
-               all(x in all_output_requirements for x in config["compatibility"]["output_requirements"]), \
-            config["name"] + "['compatibility']['output_requirements'] must be one of " + str(all_output_requirements)
-
-        assert "dataset_requirements" in config["compatibility"] and \
-               all(x in all_dataset_requirements for x in config["compatibility"]["dataset_requirements"]), \
-            config["name"] + "['compatibility']['dataset_requirements'] must be one of " + str(all_dataset_requirements)
-
-        assert "dependency_list" in config and isinstance(config["dependency_list"], list) and \
-               all(isinstance(x, str) for x in config["dependency_list"]), \
-            config["name"] + " must contain a dependency list"
-
-        assert "tags" in config and isinstance(config["tags"], list) and \
-               all(isinstance(x, str) for x in config["tags"]), \
-            config["name"] + " must contain a list of 0 or more string tags"
-
-        assert "complexity_class" in config and config["complexity_class"] in all_complexity_classes, \
-            config["name"] + " must have a complexity class belong to " + str(all_complexity_classes)
-
-        assert "metrics" in config, \
-            config["name"] + " must contain metrics."
-
-        for metric in config["metrics"]:
-            assert "display_name" in config["metrics"][metric] and \
-                   isinstance(config["metrics"][metric]["display_name"], str), \
-                metric + " must have a valid display name."
-
-            assert "type" in config["metrics"][metric] and isinstance(config["metrics"][metric]["type"], str), \
-                metric + " must contain a valid type."
-
-            assert "has_range" in config["metrics"][metric] and \
-                   isinstance(config["metrics"][metric]["has_range"], bool), \
-                metric + " must contain a boolean for has_range."
-
-            assert "range" in config["metrics"][metric] and (config["metrics"][metric]["range"] is None or
-                   (isinstance(config["metrics"][metric]["range"], list) and
-                   len(config["metrics"][metric]["range"]) == 2 and (x in {None, False, True} for x in
-                   config["metrics"][metric]["range"]))), \
-                metric + " must contain a valid list of length 2 consisting of null, false or true."
+class _WorkerSystem:
+    """
+    Holds the parts of an AISystem which metric groups read while computing, so worker processes receive the
+    model, meta database, data_dict and user config rather than the AISystem with its dataset and caches.
+    """
 
-            assert "explanation" in config["metrics"][metric] and \
-                   isinstance(config["metrics"][metric]["explanation"], str), \
-                metric + " must contain a valid explanation."
+    def __init__(self, ai_system, user_config: dict, data_dict: dict) -> None:
+        self.task = ai_system.task
+        self.model = ai_system.model
+        self.meta_database = ai_system.meta_database
+        self.data_dict = data_dict
+        self.metric_manager = SimpleNamespace(user_config=user_config)
+
+
+# The system, requested metrics and compute arguments of a worker process, set once by _init_process_worker,
+# along with the metric groups it created
+_worker_state = {}
+
+
+def _init_process_worker(system, requested, args):
+    _worker_state.update(system=system, requested=requested, args=args, metric_groups={})
+
+
+# Returns the metric group of a worker process, creating it on first use
+def _get_worker_group(metric_group_name):
+    metric_groups = _worker_state["metric_groups"]
+    if metric_group_name not in metric_groups:
+        metric_groups[metric_group_name] = get_group_class(metric_group_name)(_worker_state["system"])
+        metric_groups[metric_group_name].requested = _worker_state["requested"][metric_group_name]
+    return metric_groups[metric_group_name]
+
+
+# Computes a metric group inside a worker process, returning the metric values to the parent process.
+# The values of the groups it depends on are computed after the worker started, so they are passed along.
+def _compute_in_process(metric_group_name, dependency_values):
+    for dependency in dependency_values:
+        for metric in dependency_values[dependency]:
+            _get_worker_group(dependency).metrics[metric].value = dependency_values[dependency][metric]
+    metric_group = _get_worker_group(metric_group_name)
+    metric_group.reset()
+    _, record = profile_call(metric_group.compute, *_worker_state["args"])
+    return {metric: metric_group.metrics[metric].value for metric in metric_group.metrics}, record
+
+
+# Returns the multiprocessing context for worker processes, by default that of the platform. Forking copies the
+# locks held by other threads in their current state, so while other threads run, as with split_workers or
+# compute_async, processes are started from a forkserver or spawned instead.
+def _get_process_context(start_method=None):
+    if start_method is None:
+        start_method = multiprocessing.get_start_method()
+        if start_method == "fork" and threading.active_count() > 1:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(start_method)
+
+
+# Calls function on a daemon thread, returning False when it is still running after timeout seconds.
+# Exceptions raised by function are raised again in the calling thread.
+def _run_with_timeout(function, timeout: float, *args) -> bool:
+    outcome = {}
+
+    def run():
+        try:
+            function(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(max(timeout, 0))
+    if thread.is_alive():
+        return False
+    if "error" in outcome:
+        raise outcome["error"]
+    return True
+
+
+# Returns the number of input rows in the data_dict of a metric group call, or None for calls without data
+def _count_rows(args):
+    if len(args) == 0 or not isinstance(args[0], dict) or args[0].get("data") is None:
+        return None
+    data = args[0]["data"]
+    if getattr(data, "X", None) is not None:
+        return np.shape(data.X)[0]
+    if getattr(data, "y", None) is not None:
+        return len(data.y)
+    return None
+
+
+# Maps each metric group named in a list of group names and "group > metric" names to the set of its named metrics,
+# or to None when the whole group is named
+def _parse_selection(names) -> dict:
+    selection = {}
+    for name in names:
+        group, _, metric = name.partition(" > ")
+        if not metric:
+            selection[group] = None
+        elif selection.get(group, set()) is not None:
+            selection.setdefault(group, set()).add(metric)
+    return selection
+
+
+# Returns the requested groups along with every group they depend on, from the planning configs
+def _get_required(requested, group_names):
+    needed = deque(name for name in requested if name in group_names)
+    required = set()
+    while needed:
+        name = needed.popleft()
+        if name not in required:
+            required.add(name)
+            needed.extend(dependency for dependency in get_group_config(name)["dependency_list"]
+                          if dependency in group_names)
+    return required
+
+
+# Returns the metrics of a group which pass the whitelist and blacklist, starting from the metrics in selected.
+# None selects every metric of the group, and an empty set leaves the group out.
+def _select_metrics(group: str, metric_names, whitelist: dict, blacklist: dict, selected: set = None):
+    if group not in whitelist or (group in blacklist and blacklist[group] is None):
+        return set()
+    if whitelist[group] is not None:
+        selected = set(whitelist[group]) if selected is None else selected & whitelist[group]
+    if group in blacklist:
+        selected = (set(metric_names) if selected is None else selected) - blacklist[group]
+    if selected is not None:
+        selected = selected & set(metric_names)
+    return selected
+
+
+# Steps through the batches of an IteratorData, slicing the matching predictions into data_dict for each batch
+def _iterate_batches(data_dict, preds):
+    data = data_dict["data"]
+    data.reset()
+    cur_idx = 0
+    while data.next_batch():
+        data_len = 0
+        if data.X is not None:
+            data_len = np.shape(data.X)[0]
+        elif data.y is not None:
+            data_len = len(data.y)
+
+        for output_type in all_output_requirements:
+            if output_type in preds:
+                data_dict[output_type] = preds[output_type][cur_idx: cur_idx + data_len]
+            elif output_type in data_dict:
+                data_dict.pop(output_type)
+        cur_idx += data_len
+        yield data_dict
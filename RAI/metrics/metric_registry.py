@@ -17,9 +17,23 @@
 
 """
 Registers Metric Classes on creation. All valid metric groups can then be found in the registry dictionary.
+Metric groups shipped with RAI are also listed in a manifest, which holds the compatibility, complexity,
+dependency and metric names of each group. Plans are made from the manifest, and only the modules of the
+groups which are used get imported.
 """
 
-registry = {}
+from RAI.all_types import all_output_requirements, all_complexity_classes, all_dataset_requirements, \
+    all_data_types, all_task_types
+from RAI.utils.registry_manifest import RegistryManifest
+
+__all__ = ['registry', 'manifest', 'register_class', 'validate_config', 'get_group_names', 'get_group_config',
+           'get_group_class', 'get_group_versions', 'get_data_only_groups']
+
+registry = {}  # Metric group classes which have been imported, by name
+
+# Packages whose lazy_classes declare the metric groups shipped with RAI
+group_packages = ["RAI.metrics.metadata", "RAI.metrics.performance", "RAI.metrics.stats", "RAI.metrics.robust",
+                  "RAI.metrics.fairness", "RAI.metrics.explainable"]
 
 
 def register_class(class_name, class_object):
@@ -27,3 +41,153 @@ def register_class(class_name, class_object):
         if class_name in registry:
             raise NameError("Class Name: " + class_name + " already exists. Please enter a unique class name.")
         registry[class_name] = class_object
+
+
+# Manifest entries hold the part of a validated config needed to plan, with metrics reduced to their names
+def _get_manifest_entry(class_name, config):
+    validate_config(config)
+    return config["name"], {"config": {"name": config["name"], "compatibility": config["compatibility"],
+                                       "complexity_class": config["complexity_class"],
+                                       "dependency_list": config["dependency_list"],
+                                       "metrics": list(config["metrics"])}}
+
+
+manifest = RegistryManifest("metric_manifest", group_packages, _get_manifest_entry)
+
+
+def get_group_names() -> list:
+    """
+    Returns the names of every metric group, those in the manifest followed by groups registered from elsewhere
+
+    :return: list of metric group names
+    """
+    entries = manifest.entries()
+    return list(entries) + [name for name in registry if name not in entries]
+
+
+def get_group_config(name: str) -> dict:
+    """
+    Returns the config used to plan with a metric group, without importing it when it is in the manifest.
+    Manifest configs hold only the name, compatibility, complexity_class, dependency_list and metric names.
+
+    :param name: name of the metric group
+
+    :return: config dict
+    """
+    entries = manifest.entries()
+    return entries[name]["config"] if name in entries else registry[name].config
+
+
+def get_group_class(name: str):
+    """
+    Returns the class of a metric group, importing its module the first time
+
+    :param name: name of the metric group
+
+    :return: MetricGroup subclass
+    """
+    if name not in registry:
+        manifest.load_class(name)
+    return registry[name]
+
+
+def get_group_versions() -> dict:
+    """
+    Returns the version of every metric group, a digest of its source and config
+
+    :return: dict mapping metric group names to versions
+    """
+    entries = manifest.entries()
+    versions = {name: entry["version"] for name, entry in entries.items()}
+    versions.update({name: registry[name].version for name in registry if name not in entries})
+    return versions
+
+
+def get_data_only_groups() -> list:
+    """
+    Returns the names of the metric groups whose values depend only on the data, and are the same for every model
+    computed on a dataset split. Groups are model dependent when compatibility["model_dependent"] is True, by
+    default when they have output requirements, and when they depend on a model dependent group.
+
+    :return: list of metric group names
+    """
+    names = get_group_names()
+    configs = {name: get_group_config(name) for name in names}
+    data_only = {name for name in names if not configs[name]["compatibility"].get(
+        "model_dependent", configs[name]["compatibility"]["output_requirements"] != [])}
+    changed = True
+    while changed:
+        changed = False
+        for name in list(data_only):
+            if any(dependency not in data_only for dependency in configs[name]["dependency_list"]):
+                data_only.discard(name)
+                changed = True
+    return [name for name in names if name in data_only]
+
+
+def validate_config(config):
+    assert "name" in config and isinstance(config["name"], str), \
+        "All configs must contain names"
+
+    assert "display_name" in config and isinstance(config["display_name"], str), \
+        config["name"] + " must contain a valid display name"
+
+    assert "compatibility" in config, \
+        config["name"] + " must contain compatibility details"
+
+    assert "task_type" in config["compatibility"] and (config["compatibility"]["task_type"] == [] or
+            all(i in all_task_types for i in config["compatibility"]["task_type"])),\
+        config["name"] + "['compatibility']['task_type'] must be empty or one of " + str(all_task_types)
+
+    assert "data_type" in config["compatibility"] and all(x in all_data_types for x in config["compatibility"]["data_type"]), \
+        config["name"] + "['compatibility']['data_type'] must be one of " + str(all_data_types)
+
+    assert "output_requirements" in config["compatibility"] and \
+           all(x in all_output_requirements for x in config["compatibility"]["output_requirements"]), \
+        config["name"] + "['compatibility']['output_requirements'] must be one of " + str(all_output_requirements)
+
+    assert "dataset_requirements" in config["compatibility"] and \
+           all(x in all_dataset_requirements for x in config["compatibility"]["dataset_requirements"]), \
+        config["name"] + "['compatibility']['dataset_requirements'] must be one of " + str(all_dataset_requirements)
+
+    assert isinstance(config["compatibility"].get("model_dependent", False), bool), \
+        config["name"] + "['compatibility']['model_dependent'] must be a boolean"
+
+    assert isinstance(config["compatibility"].get("sparse_data", False), bool), \
+        config["name"] + "['compatibility']['sparse_data'] must be a boolean"
+
+    assert "dependency_list" in config and isinstance(config["dependency_list"], list) and \
+           all(isinstance(x, str) for x in config["dependency_list"]), \
+        config["name"] + " must contain a dependency list"
+
+    assert "tags" in config and isinstance(config["tags"], list) and \
+           all(isinstance(x, str) for x in config["tags"]), \
+        config["name"] + " must contain a list of 0 or more string tags"
+
+    assert "complexity_class" in config and config["complexity_class"] in all_complexity_classes, \
+        config["name"] + " must have a complexity class belong to " + str(all_complexity_classes)
+
+    assert "metrics" in config, \
+        config["name"] + " must contain metrics."
+
+    for metric in config["metrics"]:
+        assert "display_name" in config["metrics"][metric] and \
+               isinstance(config["metrics"][metric]["display_name"], str), \
+            metric + " must have a valid display name."
+
+        assert "type" in config["metrics"][metric] and isinstance(config["metrics"][metric]["type"], str), \
+            metric + " must contain a valid type."
+
+        assert "has_range" in config["metrics"][metric] and \
+               isinstance(config["metrics"][metric]["has_range"], bool), \
+            metric + " must contain a boolean for has_range."
+
+        assert "range" in config["metrics"][metric] and (config["metrics"][metric]["range"] is None or
+               (isinstance(config["metrics"][metric]["range"], list) and
+               len(config["metrics"][metric]["range"]) == 2 and (x in {None, False, True} for x in
+               config["metrics"][metric]["range"]))), \
+            metric + " must contain a valid list of length 2 consisting of null, false or true."
+
+        assert "explanation" in config["metrics"][metric] and \
+               isinstance(config["metrics"][metric]["explanation"], str), \
+            metric + " must contain a valid explanation."
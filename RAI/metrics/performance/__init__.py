@@ -15,9 +15,13 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .performance_cl import PerformanceClassificationMetricGroup
-from .performance_reg import PerformanceRegMetricGroup
-from .performance_cl_probas import PerformanceClassificationProbasMetricGroup
-from .image_generation_inception import ImageGenerationInception
-from .image_generation import ImageGeneration
-from .text_generation import TextGeneration
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+lazy_classes = {"PerformanceClassificationMetricGroup": ".performance_cl",
+                "PerformanceRegMetricGroup": ".performance_reg",
+                "PerformanceClassificationProbasMetricGroup": ".performance_cl_probas",
+                "ImageGenerationInception": ".image_generation_inception",
+                "ImageGeneration": ".image_generation",
+                "TextGeneration": ".text_generation"}
+__getattr__ = lazy_import(__name__, lazy_classes)
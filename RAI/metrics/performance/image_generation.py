@@ -17,9 +17,6 @@
 
 from RAI.metrics.metric_group import MetricGroup
 import os
-from torchmetrics.image.fid import FrechetInceptionDistance
-from torchmetrics.image.kid import KernelInceptionDistance
-import torch
 import numpy as np
 
 
@@ -35,6 +32,8 @@ class ImageGeneration(MetricGroup, class_location=os.path.abspath(__file__)):
         return self.config
 
     def compute(self, data_dict):
+        # torch is imported when the group is computed, so importing RAI does not load it
+        import torch
         gt_images = data_dict["data"].y
         gen_images = data_dict["generate_image"]
         gt_images = gt_images[:self.max_samples]
@@ -60,6 +59,7 @@ class ImageGeneration(MetricGroup, class_location=os.path.abspath(__file__)):
 
 
 def _kid(gt_images, gen_images):
+    from torchmetrics.image.kid import KernelInceptionDistance
     kid = KernelInceptionDistance(subset_size=50)
     kid.update(gt_images, real=True)
     kid.update(gen_images, real=False)
@@ -68,6 +68,7 @@ def _kid(gt_images, gen_images):
 
 
 def _fid(gt_images, gen_images):
+    from torchmetrics.image.fid import FrechetInceptionDistance
     fid = FrechetInceptionDistance(feature=64)
     fid.update(gt_images, real=True)
     fid.update(gen_images, real=False)
@@ -17,8 +17,6 @@
 
 from RAI.metrics.metric_group import MetricGroup
 import os
-from torchmetrics.image.inception import InceptionScore
-import torch
 import numpy as np
 
 
@@ -39,7 +37,10 @@ class ImageGenerationInception(MetricGroup, class_location=os.path.abspath(__fil
         self.metrics["inception"].value = inception_score
 
 
+# torch and torchmetrics are imported when the group is computed, so importing RAI does not load them.
 def _inception(images):
+    import torch
+    from torchmetrics.image.inception import InceptionScore
     shape = list(images.shape)
     shape = shape[-3:]
     shape.insert(0, -1)
@@ -17,6 +17,7 @@
 
 from RAI.metrics.metric_group import MetricGroup
 from RAI.dataset import NumpyData
+from RAI.metrics.compute_context import get_accuracy, get_confusion_matrix
 import numpy as np
 import sklearn
 import os
@@ -24,13 +25,53 @@ import warnings
 
 
 class PerformanceClassificationMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
         self._y_data = []
         self._preds = []
-        
-    def update(self, data):
-        pass
+
+    # Every metric can be derived from the confusion matrix, so only the confusion matrix is kept between updates
+    def get_state(self, data_dict):
+        y_data = np.asarray(data_dict["data"].y).ravel()
+        preds = np.asarray(data_dict["predict"]).ravel()
+        labels = np.union1d(y_data, preds)
+        return {"labels": labels, "confusion_matrix": sklearn.metrics.confusion_matrix(y_data, preds, labels=labels)}
+
+    def merge_state(self, state, other):
+        labels = np.union1d(state["labels"], other["labels"])
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        for part in [state, other]:
+            positions = np.searchsorted(labels, part["labels"])
+            matrix[np.ix_(positions, positions)] += part["confusion_matrix"]
+        return {"labels": labels, "confusion_matrix": matrix}
+
+    def compute_from_state(self):
+        self._compute_from_confusion_matrix(self.persistent_data["confusion_matrix"])
+
+    def _compute_from_confusion_matrix(self, matrix):
+        fptn = get_fptn(matrix)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.metrics["accuracy"].value = np.trace(matrix) / matrix.sum()
+            per_class = np.diag(matrix) / matrix.sum(axis=1)
+            self.metrics["balanced_accuracy"].value = np.mean(per_class[~np.isnan(per_class)])
+            self.metrics["confusion_matrix"].value = matrix
+
+            self.metrics["fp_rate"].value = _fp_rate(fptn)
+            self.metrics["fp_rate_avg"].value = np.mean(self.metrics["fp_rate"].value)
+
+            self.metrics["f1"].value = _safe_divide(2 * fptn['tp'], 2 * fptn['tp'] + fptn['fp'] + fptn['fn'])
+            self.metrics["f1_avg"].value = np.mean(self.metrics["f1"].value)
+
+            self.metrics["jaccard_score"].value = _safe_divide(fptn['tp'], fptn['tp'] + fptn['fp'] + fptn['fn'])
+            self.metrics["jaccard_score_avg"].value = np.mean(self.metrics["jaccard_score"].value)
+
+            self.metrics["precision_score"].value = _safe_divide(fptn['tp'], fptn['tp'] + fptn['fp'])
+            self.metrics["precision_score_avg"].value = np.mean(self.metrics["precision_score"].value)
+
+            self.metrics["recall_score"].value = np.nan_to_num(_recall_score(fptn), nan=0)
+            self.metrics["recall_score_avg"].value = np.mean(self.metrics["recall_score"].value)
 
     def getConfig(self):
         return self.config
@@ -42,9 +83,9 @@ class PerformanceClassificationMetricGroup(MetricGroup, class_location=os.path.a
         y_data = data.y
 
         warnings.filterwarnings("ignore")
-        self.metrics["accuracy"].value = sklearn.metrics.accuracy_score(y_data, preds, **args.get("accuracy", {}))
+        self.metrics["accuracy"].value = get_accuracy(data_dict)
         self.metrics["balanced_accuracy"].value = sklearn.metrics.balanced_accuracy_score(y_data, preds, **args.get("balanced_accuracy", {}))
-        self.metrics["confusion_matrix"].value = sklearn.metrics.confusion_matrix(y_data, preds, **args.get("confusion_matrix", {}))
+        self.metrics["confusion_matrix"].value = get_confusion_matrix(data_dict)
         fptn = get_fptn(self.metrics["confusion_matrix"].value)  # TP, TN, FP, FN values. Used quite a bit.
 
         self.metrics["fp_rate"].value = _fp_rate(fptn, **args.get("fp_rate", {}))
@@ -93,6 +134,11 @@ def get_fptn(confusion_matrix):
     return result
 
 
+# Divides elementwise, returning 0 where the denominator is 0, matching sklearn's zero_division behaviour
+def _safe_divide(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(np.shape(numerator)), where=denominator != 0)
+
+
 def _fp_rate(fptn):
         return fptn['fp'] / (fptn['fp'] + fptn['tn'])
 
@@ -16,16 +16,62 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
+from RAI.utils.streaming_stats import moment_state, merge_moment_states, QuantileSketch, merge_sketches
+import numpy as np
+import scipy.special
 import sklearn
 import os
 
 
 class PerformanceRegMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
 
-    def update(self, data):
-        pass
+    # Keeps running moments of the targets and errors, sums of the per sample losses and a sketch of absolute errors.
+    # median_absolute_error is exact until the sketch capacity is reached, and an estimate afterwards.
+    def get_state(self, data_dict):
+        y_true = np.asarray(data_dict["data"].y, dtype=np.float64).ravel()
+        y_pred = np.asarray(data_dict["predict"], dtype=np.float64).ravel()
+        errors = y_true - y_pred
+        absolute_errors = QuantileSketch()
+        absolute_errors.add(np.abs(errors))
+        state = {"n": len(y_true), "y": moment_state(y_true), "errors": moment_state(errors),
+                 "absolute_error": np.abs(errors).sum(),
+                 "percentage_error": (np.abs(errors) / np.maximum(np.abs(y_true), np.finfo(np.float64).eps)).sum(),
+                 "gamma_deviance": None, "poisson_deviance": None, "squared_log_error": None,
+                 "absolute_errors": absolute_errors}
+        # Losses which are undefined for some of the values are left as None, sklearn raises a ValueError for them
+        if not ((y_true <= 0).any() or (y_pred <= 0).any()):
+            state["gamma_deviance"] = (2 * (np.log(y_pred / y_true) + y_true / y_pred - 1)).sum()
+        if not ((y_true < 0).any() or (y_pred <= 0).any()):
+            state["poisson_deviance"] = (2 * (scipy.special.xlogy(y_true, y_true / y_pred) - y_true + y_pred)).sum()
+        if not ((y_true < 0).any() or (y_pred < 0).any()):
+            state["squared_log_error"] = ((np.log1p(y_true) - np.log1p(y_pred)) ** 2).sum()
+        return state
+
+    def merge_state(self, state, other):
+        result = {"n": state["n"] + other["n"], "y": merge_moment_states(state["y"], other["y"]),
+                  "errors": merge_moment_states(state["errors"], other["errors"]),
+                  "absolute_errors": merge_sketches(state["absolute_errors"], other["absolute_errors"])}
+        for key in ["absolute_error", "percentage_error", "gamma_deviance", "poisson_deviance", "squared_log_error"]:
+            result[key] = None if state[key] is None or other[key] is None else state[key] + other[key]
+        return result
+
+    def compute_from_state(self):
+        state = self.persistent_data
+        n = state["n"]
+        error_sum_squares = state["errors"]["m2"][0] + n * state["errors"]["mean"][0] ** 2
+        self.metrics["explained_variance"].value = _variance_score(state["errors"]["m2"][0], state["y"]["m2"][0])
+        self.metrics["mean_absolute_error"].value = state["absolute_error"] / n
+        self.metrics["mean_absolute_percentage_error"].value = state["percentage_error"] / n
+        self.metrics["mean_gamma_deviance"].value = _mean_or_none(state["gamma_deviance"], n)
+        self.metrics["mean_poisson_deviance"].value = _mean_or_none(state["poisson_deviance"], n)
+        self.metrics["mean_squared_error"].value = error_sum_squares / n
+        self.metrics["mean_squared_log_error"].value = _mean_or_none(state["squared_log_error"], n)
+        self.metrics["median_absolute_error"].value = state["absolute_errors"].quantile(0.5)
+        self.metrics["r2"].value = _variance_score(error_sum_squares, state["y"]["m2"][0])
 
     def compute(self, data_dict):
         data = data_dict["data"]
@@ -43,3 +89,14 @@ class PerformanceRegMetricGroup(MetricGroup, class_location=os.path.abspath(__fi
         self.metrics["mean_squared_log_error"].value = sklearn.metrics.mean_squared_log_error(data.y, preds, **args.get("mean_squared_log_error", {}))
         self.metrics["median_absolute_error"].value = sklearn.metrics.median_absolute_error(data.y, preds, **args.get("median_absolute_error", {}))
         self.metrics["r2"].value = sklearn.metrics.r2_score(data.y, preds, **args.get("r2", {}))
+
+
+# Returns 1 - numerator / denominator, with the same handling of constant targets as sklearn
+def _variance_score(numerator, denominator):
+    if denominator != 0:
+        return 1 - numerator / denominator
+    return 1.0 if numerator == 0 else 0.0
+
+
+def _mean_or_none(total, n):
+    return None if total is None else total / n
@@ -15,10 +15,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from nltk.translate.bleu_score import corpus_bleu
 from RAI.metrics.metric_group import MetricGroup
 import os
-from torchmetrics.text.rouge import ROUGEScore
 import numpy as np
 
 
@@ -41,7 +39,9 @@ class TextGeneration(MetricGroup, class_location=os.path.abspath(__file__)):
         self.metrics["bleu"].value = _bleu(gt_text, gen_text)
 
 
+# torchmetrics and nltk are imported when the group is computed, so importing RAI does not load them.
 def _rouge(gt_text, gen_text):
+    from torchmetrics.text.rouge import ROUGEScore
     rouge = ROUGEScore()
     result = rouge(gt_text, gen_text)
     result_1 = {"measure": result['rouge1_fmeasure'].item(),
@@ -60,6 +60,7 @@ def _rouge(gt_text, gen_text):
 
 
 def _bleu(gt_text, gen_text):
+    from nltk.translate.bleu_score import corpus_bleu
     gt_bleu = []
     gen_bleu = []
     bleu_score = []
@@ -0,0 +1,100 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import copy
+import threading
+import time
+import tracemalloc
+
+__all__ = ['ComputeProfile', 'profile_call']
+
+
+class ComputeProfile:
+    """
+    ComputeProfile records the cost of each MetricGroup during a single compute. MetricManager creates one per
+    compute when user_config["profile"] is set. For every group and method (compute, compute_batch,
+    finalize_batch_compute or update) it accumulates the number of calls, wall time, CPU time, input rows
+    and the peak memory allocated by a single call.
+    """
+
+    def __init__(self, track_memory: bool = False) -> None:
+        self.track_memory = track_memory
+        self.groups = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start = time.perf_counter()
+        self._wall_time = None
+
+    def add(self, group: str, method: str, record: dict, rows: int = None) -> None:
+        """
+        Adds the record of one call to a metric group's method
+
+        :param group: name of the metric group
+        :param method: name of the method called
+        :param record: wall_time, cpu_time and peak_memory of the call, as returned by profile_call
+        :param rows: number of input rows, None when the call has no input data
+
+        :return: None
+        """
+        with self._lock:
+            entry = self.groups.setdefault(group, {}).setdefault(
+                method, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_memory": None, "rows": 0})
+            entry["calls"] += 1
+            entry["wall_time"] += record["wall_time"]
+            entry["cpu_time"] += record["cpu_time"]
+            entry["rows"] += rows or 0
+            if record.get("peak_memory") is not None:
+                entry["peak_memory"] = max(entry["peak_memory"] or 0, record["peak_memory"])
+
+    def finish(self) -> None:
+        """
+        Ends the profile, recording the total wall time and stopping memory tracing if this profile started it
+
+        :return: None
+        """
+        self._wall_time = time.perf_counter() - self._start
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self) -> dict:
+        """
+        Returns the profile as a json serializable dict of {"wall_time", "groups": {group: {method: record}}}
+
+        :return: dict
+        """
+        with self._lock:
+            wall_time = self._wall_time if self._wall_time is not None else time.perf_counter() - self._start
+            return {"wall_time": wall_time, "groups": copy.deepcopy(self.groups)}
+
+
+# Calls function(*args), returning its result along with the wall time, CPU time of the calling thread, and
+# the peak memory allocated during the call. Memory is only measured while tracemalloc is tracing, and is only
+# attributable to the call when no other thread allocates concurrently.
+def profile_call(function, *args, track_memory: bool = False):
+    track_memory = track_memory and tracemalloc.is_tracing()
+    if track_memory:
+        tracemalloc.reset_peak()
+        base_memory = tracemalloc.get_traced_memory()[0]
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    result = function(*args)
+    record = {"wall_time": time.perf_counter() - start_wall, "cpu_time": time.thread_time() - start_cpu,
+              "peak_memory": tracemalloc.get_traced_memory()[1] - base_memory if track_memory else None}
+    return result, record
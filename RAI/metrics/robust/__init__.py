@@ -15,7 +15,10 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .basic_robustness import BasicRobustMetricGroup
-# from .noise_robustness import NoiseRobustnessMetricGroup
-from .adversarial_robustness import AdversarialRobustnessMetricGroup
-# from .art_trees import ArtAdversarialRobustnessTreeGroup
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+# noise_robustness and art_trees are not registered
+lazy_classes = {"BasicRobustMetricGroup": ".basic_robustness",
+                "AdversarialRobustnessMetricGroup": ".adversarial_robustness"}
+__getattr__ = lazy_import(__name__, lazy_classes)
@@ -16,6 +16,7 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
+from RAI.metrics.compute_context import get_accuracy
 import numpy as np
 import sklearn
 import os
@@ -35,7 +36,11 @@ class AdversarialRobustnessMetricGroup(MetricGroup, class_location=os.path.abspa
 
         data = data_dict["data"]
         preds = data_dict["predict"]
-        self.metrics["inaccuracy"].value = np.sqrt(1 - sklearn.metrics.accuracy_score(data.y, preds, **args.get("accuracy", {})))
+        if "accuracy" in args:
+            accuracy = sklearn.metrics.accuracy_score(data.y, preds, **args["accuracy"])
+        else:
+            accuracy = get_accuracy(data_dict)
+        self.metrics["inaccuracy"].value = np.sqrt(1 - accuracy)
 
 
 # TODO: Add more metrics
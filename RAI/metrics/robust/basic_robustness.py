@@ -15,6 +15,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from RAI.metrics.metric_group import MetricGroup
+from RAI.metrics.compute_context import get_scalar_moments
 import numpy as np
 import os
 
@@ -30,12 +31,11 @@ class BasicRobustMetricGroup(MetricGroup, class_location=os.path.abspath(__file_
         args = {}
         if self.ai_system.metric_manager.user_config is not None and "stats" in self.ai_system.metric_manager.user_config and "args" in self.ai_system.metric_manager.user_config["stats"]:
             args = self.ai_system.metric_manager.user_config["stats"]["args"]
-        scalar_data = data_dict["data"].scalar
-        # scalar_data = np.array(scalar_data)
-        mean_v = np.mean(scalar_data, axis=0, keepdims=True)
-        std_v = np.std(scalar_data, axis=0, keepdims=True)
-        max_v = np.max(scalar_data, axis=0, keepdims=True)
-        min_v = np.min(scalar_data, axis=0, keepdims=True)
+        moments = get_scalar_moments(data_dict)
+        mean_v = moments["mean"]
+        std_v = moments["std"]
+        max_v = moments["max"]
+        min_v = moments["min"]
 
         self.metrics["normalized_feature_std"].value = bool(np.all(np.isclose(std_v, np.ones_like(std_v))) and \
                                                 np.all(np.isclose(mean_v, np.ones_like(mean_v))))
@@ -0,0 +1,100 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import threading
+from collections import deque
+import numpy as np
+
+__all__ = ['RuntimeModel', 'runtime_model']
+
+# Exponent of the row count assumed for each complexity class, until a group has been timed on several sizes
+complexity_exponents = {"constant": 0.0, "linear": 1.0, "multi_linear": 1.0, "polynomial": 2.0, "exponential": 3.0}
+prior_row_cost = 1e-6  # Seconds per row, raised to the class exponent, assumed for groups never timed
+prior_call_cost = 1e-3  # Seconds assumed for a call to a group never timed, whatever its size
+
+
+class RuntimeModel:
+    """
+    RuntimeModel estimates how long a MetricGroup's compute takes on a number of rows. Each group's runtime is
+    modelled as a * rows ^ b, fit by least squares in log space to its most recent observed computes. Groups
+    timed on a single size keep the exponent of their complexity class, and groups never timed are estimated
+    from their complexity class alone. MetricManagers share the module level runtime_model, so estimates improve
+    with every compute in the process.
+    """
+
+    def __init__(self, max_observations: int = 50) -> None:
+        self.max_observations = max_observations
+        self._observations = {}
+        self._lock = threading.Lock()
+
+    def observe(self, group: str, rows: int, seconds: float) -> None:
+        """
+        Records the time taken by one compute of a metric group
+
+        :param group: name of the metric group
+        :param rows: number of input rows
+        :param seconds: wall time of the compute
+
+        :return: None
+        """
+        with self._lock:
+            self._observations.setdefault(group, deque(maxlen=self.max_observations)).append(
+                (max(int(rows or 1), 1), max(float(seconds), 1e-9)))
+
+    def estimate(self, group: str, rows: int, complexity_class: str = "linear") -> float:
+        """
+        Returns the estimated seconds a compute of a metric group takes
+
+        :param group: name of the metric group
+        :param rows: number of input rows
+        :param complexity_class: complexity class of the group, used while it has few observations
+
+        :return: estimated wall time in seconds
+        """
+        rows = max(int(rows or 1), 1)
+        exponent = complexity_exponents.get(complexity_class, 1.0)
+        with self._lock:
+            observations = list(self._observations.get(group, []))
+        if not observations:
+            return prior_call_cost + prior_row_cost * rows ** exponent
+        sizes = np.log([n for n, _ in observations])
+        times = np.log([t for _, t in observations])
+        if np.ptp(sizes) > 0:
+            exponent = float(np.clip(np.polyfit(sizes, times, 1)[0], 0.0, 3.0))
+        intercept = float(np.mean(times - exponent * sizes))
+        return float(np.exp(intercept + exponent * np.log(rows)))
+
+    def clear(self) -> None:
+        """
+        Forgets every observation
+
+        :return: None
+        """
+        with self._lock:
+            self._observations = {}
+
+    # Locks can not be pickled, which is required when metric groups run in worker processes
+    def __getstate__(self):
+        with self._lock:
+            return {"max_observations": self.max_observations, "_observations": dict(self._observations)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+runtime_model = RuntimeModel()
@@ -15,10 +15,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .summary_stats import StatMetricGroup
-from .moments import StatMomentGroup
-from .correlation_stats_regression import CorrelationStatRegression
-from .frequency_stats import FrequencyStatMetricGroup
-# from .correlation_stats_regression_slow import CorrelationStatRegressionSlow  # Runs like butter without these ones.
-from .correlation_stats_binary import BinaryCorrelationStats
-from .image_stats import ImageStatsGroup
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use.
+# correlation_stats_regression_slow is not registered, as correlation_stats_regression covers it faster.
+lazy_classes = {"StatMetricGroup": ".summary_stats",
+                "StatMomentGroup": ".moments.moments",
+                "CorrelationStatRegression": ".correlation_stats_regression",
+                "FrequencyStatMetricGroup": ".frequency_stats",
+                "BinaryCorrelationStats": ".correlation_stats_binary",
+                "ImageStatsGroup": ".image_stats"}
+__getattr__ = lazy_import(__name__, lazy_classes)
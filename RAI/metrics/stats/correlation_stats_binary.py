@@ -16,8 +16,10 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
+import scipy.sparse
 import scipy.stats
 from RAI.utils.utils import calculate_per_mapped_features, convert_to_feature_dict
+from RAI.utils.sparse_stats import sparse_pearsonr
 import os
 
 
@@ -37,11 +39,13 @@ class BinaryCorrelationStats(MetricGroup, class_location=os.path.abspath(__file_
         map = self.ai_system.meta_database.scalar_map
         features = self.ai_system.meta_database.features
 
-        self.metrics["point_biserial_r"].value = calculate_per_mapped_features(scipy.stats.pointbiserialr, map, features, data.scalar, data.y)
+        # The point biserial correlation is the pearson correlation with a binary y
+        function = sparse_pearsonr if scipy.sparse.issparse(data.scalar) else scipy.stats.pointbiserialr
+        self.metrics["point_biserial_r"].value = calculate_per_mapped_features(function, map, features, data.scalar, data.y)
         for i, value in enumerate(self.metrics["point_biserial_r"].value):
             result = {}
             if value is not None:
-                temp = self.metrics["point_biserial_r"].value[i]
-                result = {"correlation": temp.correlation, "pvalue": temp.pvalue}
+                correlation, pvalue = self.metrics["point_biserial_r"].value[i]
+                result = {"correlation": correlation, "pvalue": pvalue}
             self.metrics["point_biserial_r"].value[i] = result
         self.metrics["point_biserial_r"].value = convert_to_feature_dict(self.metrics["point_biserial_r"].value, [feature.name for feature in features])
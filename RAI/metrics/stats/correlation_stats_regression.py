@@ -16,8 +16,10 @@
 
 
 from RAI.metrics.metric_group import MetricGroup
+import scipy.sparse
 import scipy.stats
 from RAI.utils.utils import calculate_per_mapped_features
+from RAI.utils.sparse_stats import sparse_pearsonr, sparse_spearmanr
 import os
 
 
@@ -36,5 +38,8 @@ class CorrelationStatRegression(MetricGroup, class_location=os.path.abspath(__fi
         map = self.ai_system.meta_database.scalar_map
         features = self.ai_system.meta_database.features
 
-        self.metrics["pearson_correlation"].value = calculate_per_mapped_features(scipy.stats.pearsonr, map, features, data.scalar, data.y, to_array=False)
-        self.metrics["spearman_correlation"].value = calculate_per_mapped_features(scipy.stats.spearmanr, map, features, data.scalar, data.y, to_array=False)
+        pearsonr, spearmanr = scipy.stats.pearsonr, scipy.stats.spearmanr
+        if scipy.sparse.issparse(data.scalar):
+            pearsonr, spearmanr = sparse_pearsonr, sparse_spearmanr
+        self.metrics["pearson_correlation"].value = calculate_per_mapped_features(pearsonr, map, features, data.scalar, data.y, to_array=False)
+        self.metrics["spearman_correlation"].value = calculate_per_mapped_features(spearmanr, map, features, data.scalar, data.y, to_array=False)
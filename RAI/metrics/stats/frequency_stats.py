@@ -17,22 +17,67 @@
 
 from RAI.metrics.metric_group import MetricGroup
 import scipy.stats
+import numpy as np
+import scipy.sparse
 from RAI.utils.utils import convert_to_feature_value_dict
+from RAI.utils.sparse_stats import sparse_value_counts
 import os
 
 
 class FrequencyStatMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    # Keeps the value counts of each categorical feature, which is all the histograms below depend on.
+    def get_state(self, data_dict):
+        X = data_dict["data"].X
+        features = self.ai_system.meta_database.features
+        sparse = scipy.sparse.issparse(X)
+        if sparse:
+            X = scipy.sparse.csc_matrix(X)
+        counts = {}
+        for i in range(len(features)):
+            if features[i].categorical:
+                if sparse:
+                    values, value_counts = sparse_value_counts(X[:, i])
+                else:
+                    values, value_counts = np.unique(np.asarray(X[:, i], dtype=np.float64), return_counts=True)
+                counts[features[i].name] = dict(zip(values.tolist(), value_counts.tolist()))
+        return {"counts": counts}
+
+    def merge_state(self, state, other):
+        counts = {}
+        for feature in state["counts"]:
+            counts[feature] = dict(state["counts"][feature])
+            for value, count in other["counts"][feature].items():
+                counts[feature][value] = counts[feature].get(value, 0) + count
+        return {"counts": counts}
+
+    def compute_from_state(self):
+        features = self.ai_system.meta_database.features
+        counts = self.persistent_data["counts"]
+        self.metrics["relative_freq"].value = {}
+        self.metrics["cumulative_freq"].value = {}
+        for i in range(len(features)):
+            if features[i].categorical:
+                numbins = len(features[i].values)
+                frequencies = _histogram_from_counts(counts[features[i].name], numbins)
+                self.metrics["relative_freq"].value[features[i].name] = \
+                    convert_to_feature_value_dict(frequencies / np.sum(frequencies), features[i])
+                self.metrics["cumulative_freq"].value[features[i].name] = \
+                    convert_to_feature_value_dict(np.cumsum(frequencies).tolist(), features[i])
 
     def compute(self, data_dict):
         args = {}
         if self.ai_system.metric_manager.user_config is not None and "stats" in self.ai_system.metric_manager.user_config and "args" in self.ai_system.metric_manager.user_config["stats"]:
             args = self.ai_system.metric_manager.user_config["stats"]["args"]
         data = data_dict["data"]
+        if scipy.sparse.issparse(data.X):
+            self.persistent_data = self.get_state(data_dict)
+            self.compute_from_state()
+            return
         self.metrics["relative_freq"].value = _rel_freq(data.X, self.ai_system.meta_database.features)
         self.metrics["cumulative_freq"].value = _cumulative_freq(data.X, self.ai_system.meta_database.features)
 
@@ -53,3 +98,13 @@ def _rel_freq(X, features=None):
            numbins = len(features[i].values)
            result[features[i].name] = convert_to_feature_value_dict(scipy.stats.relfreq(X[:, i], numbins=numbins)[0], features[i])
     return result
+
+
+# Rebuilds the histogram scipy.stats.relfreq and scipy.stats.cumfreq use, from value counts.
+def _histogram_from_counts(counts, numbins):
+    values = np.array(list(counts.keys()), dtype=np.float64)
+    weights = np.array(list(counts.values()), dtype=np.float64)
+    low, high = values.min(), values.max()
+    spacing = (high - low) / (2. * (numbins - 1)) if numbins > 1 else 0.5
+    frequencies, _ = np.histogram(values, numbins, range=(low - spacing, high + spacing), weights=weights)
+    return frequencies
@@ -17,7 +17,6 @@
 
 from RAI.metrics.metric_group import MetricGroup
 import os
-from RAI.utils import convert_float32_to_float64
 import numpy as np
 
 
@@ -35,14 +34,15 @@ class ImageStatsGroup(MetricGroup, class_location=os.path.abspath(__file__)):
         data = data_dict["data"]
         # images are of shape [examples, image columns, c, w, h]
         images = data.image
-        means = convert_float32_to_float64(images.mean(axis=(0, 1, 3, 4)))  # images.mean((0, 1, 3, 4))
-        self.metrics["mean"].value = {"red": convert_float32_to_float64(means[0]),
-                                      "green": convert_float32_to_float64(means[1]),
-                                      "blue": convert_float32_to_float64(means[2])}
-        std = convert_float32_to_float64(images.std(axis=(0, 1, 3, 4)))
-        self.metrics["std"].value = {"red": convert_float32_to_float64(std[0]),
-                                     "green": convert_float32_to_float64(std[1]),
-                                     "blue": convert_float32_to_float64(std[2])}  # images.std((0, 1, 3, 4))
+        if images.dtype != np.float32:
+            images = images.astype(np.float64, copy=False)
+        # float32 images are summed in float64, and their deviations from the mean are kept in float32
+        means = images.mean(axis=(0, 1, 3, 4), dtype=np.float64)
+        d = images - means.astype(images.dtype)[:, None, None]
+        delta = d.mean(axis=(0, 1, 3, 4), dtype=np.float64)
+        std = np.sqrt(np.square(d).mean(axis=(0, 1, 3, 4), dtype=np.float64) - delta ** 2)
+        self.metrics["mean"].value = {"red": means[0], "green": means[1], "blue": means[2]}
+        self.metrics["std"].value = {"red": std[0], "green": std[1], "blue": std[2]}
 
     def reset(self):
         super().reset()
@@ -55,7 +55,7 @@ class ImageStatsGroup(MetricGroup, class_location=os.path.abspath(__file__)):
         images = data.image
         for image in images:
             self._batch_total_examples += 1
-            means = convert_float32_to_float64(image.mean(axis=(0, 2, 3)))
+            means = image.mean(axis=(0, 2, 3), dtype=np.float64)
             for i in range(len(self._batch_average)):
                 prev_avg = self._batch_average[i]
                 self._batch_average[i] = (self._batch_average[i] - means[i]) / self._batch_total_examples
@@ -14,5 +14,9 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from .moments import StatMomentGroup
 
+from RAI.utils.registry_manifest import lazy_import
+
+# Metric groups and their modules, which are imported on first use
+lazy_classes = {"StatMomentGroup": ".moments"}
+__getattr__ = lazy_import(__name__, lazy_classes)
@@ -15,31 +15,49 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from RAI.metrics.metric_group import MetricGroup
-from RAI.utils import map_to_feature_array, map_to_feature_dict, convert_float32_to_float64
+from RAI.utils import map_to_feature_array, map_to_feature_dict
+from RAI.utils.streaming_stats import moment_state, merge_moment_states
+import scipy.sparse
 import scipy.stats
 import os
 import numpy as np
 
 
 class StatMomentGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    def get_state(self, data_dict):
+        return {"moments": moment_state(data_dict["data"].scalar)}
+
+    def merge_state(self, state, other):
+        return {"moments": merge_moment_states(state["moments"], other["moments"])}
+
+    def compute_from_state(self):
+        moments = self.persistent_data["moments"]
+        scalar_map = self.ai_system.meta_database.scalar_map
+        features = self.ai_system.meta_database.features
+
+        central_moments = [np.zeros(len(scalar_map)), moments["m2"] / moments["n"], moments["m3"] / moments["n"]]
+        for i in range(1, 4):
+            if self.is_requested("moment_" + str(i)):
+                self.metrics["moment_" + str(i)].value = map_to_feature_dict(central_moments[i - 1], features, scalar_map)
 
     def compute(self, data_dict):
         args = {}
         if self.ai_system.metric_manager.user_config is not None and "stats" in self.ai_system.metric_manager.user_config and "args" in self.ai_system.metric_manager.user_config["stats"]:
             args = self.ai_system.metric_manager.user_config["stats"]["args"]
         data = data_dict["data"]
+        if scipy.sparse.issparse(data.scalar) or data.scalar.dtype == np.float32:
+            self.persistent_data = self.get_state(data_dict)
+            self.compute_from_state()
+            return
         scalar_data = data.scalar
         scalar_map = self.ai_system.meta_database.scalar_map
         features = self.ai_system.meta_database.features
 
-        self.metrics["moment_1"].value = map_to_feature_dict(scipy.stats.moment(scalar_data, 1), features, scalar_map)
-        self.metrics["moment_2"].value = map_to_feature_dict(scipy.stats.moment(scalar_data, 2), features, scalar_map)
-        self.metrics["moment_3"].value = map_to_feature_dict(scipy.stats.moment(scalar_data, 3), features, scalar_map)
-        self.metrics["moment_1"].value = convert_float32_to_float64(self.metrics["moment_1"].value)
-        self.metrics["moment_2"].value = convert_float32_to_float64(self.metrics["moment_2"].value)
-        self.metrics["moment_3"].value = convert_float32_to_float64(self.metrics["moment_3"].value)
+        for i in range(1, 4):
+            if self.is_requested("moment_" + str(i)):
+                self.metrics["moment_" + str(i)].value = map_to_feature_dict(scipy.stats.moment(scalar_data, i), features, scalar_map)
@@ -17,20 +17,163 @@
 
 from RAI.metrics.metric_group import MetricGroup
 import numpy as np
+import scipy.sparse
 import scipy.stats
 import warnings
 import os
-import pandas as pd
-from RAI.utils.utils import calculate_per_mapped_features, map_to_feature_dict, map_to_feature_array, convert_float32_to_float64
+from RAI.utils.utils import calculate_per_mapped_features, map_to_feature_dict, map_to_feature_array
+from RAI.metrics.compute_context import get_scalar_moments
+from RAI.utils.streaming_stats import moment_state, merge_moment_states, comoment_state, merge_comoment_states, \
+    QuantileSketch, FrequencySketch, merge_sketches, mvsdist_from_moments
+from RAI.utils.sparse_stats import sparse_value_counts, sparse_extremes, sparse_log_sum, sparse_nan_rows
 import json
 
 
 class StatMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
+    supports_update = True
+
     def __init__(self, ai_system) -> None:
         super().__init__(ai_system)
-        
-    def update(self, data):
-        pass
+
+    # Keeps running central moments, co-moments and extremes of the scalar features, along with sketches for the
+    # order statistics. median, quantiles, iqr and mode are exact until the sketches reach capacity.
+    def get_state(self, data_dict):
+        return _summary_state(data_dict["data"])
+
+    def merge_state(self, state, other):
+        return {"moments": merge_moment_states(state["moments"], other["moments"]),
+                "comoments": merge_comoment_states(state["comoments"], other["comoments"]),
+                "min": np.minimum(state["min"], other["min"]), "max": np.maximum(state["max"], other["max"]),
+                "log_sum": state["log_sum"] + other["log_sum"], "nan_rows": state["nan_rows"] + other["nan_rows"],
+                "rows": state["rows"] + other["rows"],
+                "quantiles": [merge_sketches(a, b) for a, b in zip(state["quantiles"], other["quantiles"])],
+                "modes": [merge_sketches(a, b) for a, b in zip(state["modes"], other["modes"])]}
+
+    def compute_from_state(self):
+        state = self.persistent_data
+        self._compute_summary(state)
+        scalar_map = self.ai_system.meta_database.scalar_map
+        features = self.ai_system.meta_database.features
+        if self.is_requested("median", "quantile_1", "quantile_3", "iqr"):
+            quantile_1, median, quantile_3 = [np.array([sketch.quantile(q) for sketch in state["quantiles"]])
+                                              for q in [0.25, 0.5, 0.75]]
+            self._set_quantiles(quantile_1, median, quantile_3)
+        if self.is_requested("mode"):
+            self.metrics["mode"].value = map_to_feature_dict([sketch.mode() for sketch in state["modes"]],
+                                                             features, scalar_map)
+
+    # Sets the requested metrics which are derived from the moments, co-moments, extremes and log sums of a state
+    def _compute_summary(self, state):
+        scalar_map = self.ai_system.meta_database.scalar_map
+        features = self.ai_system.meta_database.features
+        n = state["moments"]["n"]
+        mean = state["moments"]["mean"]
+        m2 = state["moments"]["m2"] / n
+        m3 = state["moments"]["m3"] / n
+        m4 = state["moments"]["m4"] / n
+        std = np.sqrt(m2)
+        zero = m2 <= (np.finfo(m2.dtype).resolution * mean) ** 2
+        k2 = state["moments"]["m2"] / (n - 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k3 = n * state["moments"]["m3"] / ((n - 1.0) * (n - 2.0))
+            k4 = n * ((n + 1.0) * state["moments"]["m4"] - 3.0 * (n - 1.0) * state["moments"]["m2"] ** 2 / n) \
+                / ((n - 1.0) * (n - 2.0) * (n - 3.0))
+            skew = np.where(zero, 0, m3 / m2 ** 1.5)
+            kurtosis = np.where(zero, 0, m4 / m2 ** 2.0) - 3
+            geometric_mean = np.exp(state["log_sum"] / n)
+            variation = std / mean
+
+        if self.is_requested("mean"):
+            self.metrics["mean"].value = map_to_feature_dict(mean, features, scalar_map)
+        if self.is_requested("covariance"):
+            self.metrics["covariance"].value = map_to_feature_array(state["comoments"]["c"] / (n - 1), features, scalar_map)
+        if self.is_requested("num_nan_rows", "percent_nan_rows"):
+            self.metrics["num_nan_rows"].value = state["nan_rows"]
+            self.metrics["percent_nan_rows"].value = state["nan_rows"] / state["rows"]
+        if self.is_requested("geometric_mean"):
+            self.metrics["geometric_mean"].value = map_to_feature_dict(geometric_mean, features, scalar_map)
+        if self.is_requested("skew"):
+            self.metrics["skew"].value = map_to_feature_dict(skew, features, scalar_map)
+        if self.is_requested("variation"):
+            self.metrics["variation"].value = map_to_feature_dict(variation, features, scalar_map)
+        self.metrics["min"].value = map_to_feature_dict(state["min"], features, scalar_map)
+        self.metrics["max"].value = map_to_feature_dict(state["max"], features, scalar_map)
+        self.metrics["standard_deviation"].value = map_to_feature_dict(std, features, scalar_map)
+        if self.is_requested("sem"):
+            self.metrics["sem"].value = map_to_feature_dict(np.sqrt(k2) / np.sqrt(n), features, scalar_map)
+        if self.is_requested("kurtosis"):
+            self.metrics["kurtosis"].value = map_to_feature_dict(kurtosis, features, scalar_map)
+        for i, kstat in enumerate([mean, k2, k3, k4], 1):
+            if self.is_requested("kstat_" + str(i)):
+                self.metrics["kstat_" + str(i)].value = map_to_feature_dict(kstat, features, scalar_map)
+        if self.is_requested("kstatvar"):
+            self.metrics["kstatvar"].value = map_to_feature_dict((2 * n * k2 ** 2 + (n - 1) * k4) / (n * (n + 1)),
+                                                                 features, scalar_map)
+
+        frozen_metrics = ["frozen_mean_mean", "frozen_mean_variance", "frozen_mean_std", "frozen_variance_mean",
+                          "frozen_variance_variance", "frozen_variance_std", "frozen_std_mean", "frozen_std_variance",
+                          "frozen_std_std"]
+        bayes_metrics = ["bayes_mean", "bayes_mean_avg", "bayes_variance", "bayes_variance_avg", "bayes_std",
+                         "bayes_std_avg"]
+        frozen_requested = self.is_requested(*frozen_metrics)
+        bayes_requested = self.is_requested(*bayes_metrics)
+        if not frozen_requested and not bayes_requested:
+            return
+        for metric in (frozen_metrics if frozen_requested else []) + (bayes_metrics if bayes_requested else []):
+            self.metrics[metric].value = {}
+        for i, feature_index in enumerate(scalar_map):
+            key = features[feature_index].name
+            mean_dist, variance_dist, std_dist = mvsdist_from_moments(n, mean[i], m2[i])
+            if frozen_requested:
+                self.metrics["frozen_mean_mean"].value[key] = mean_dist.mean()
+                self.metrics["frozen_mean_variance"].value[key] = mean_dist.var()
+                self.metrics["frozen_mean_std"].value[key] = mean_dist.std()
+                self.metrics["frozen_variance_mean"].value[key] = variance_dist.mean()
+                self.metrics["frozen_variance_variance"].value[key] = variance_dist.var()
+                self.metrics["frozen_variance_std"].value[key] = variance_dist.std()
+                self.metrics["frozen_std_mean"].value[key] = std_dist.mean()
+                self.metrics["frozen_std_variance"].value[key] = std_dist.var()
+                self.metrics["frozen_std_std"].value[key] = std_dist.std()
+            if bayes_requested:
+                self.metrics["bayes_mean"].value[key] = mean_dist.interval(0.9)
+                self.metrics["bayes_mean_avg"].value[key] = mean_dist.mean()
+                self.metrics["bayes_variance"].value[key] = variance_dist.interval(0.9)
+                self.metrics["bayes_variance_avg"].value[key] = variance_dist.mean()
+                self.metrics["bayes_std"].value[key] = std_dist.interval(0.9)
+                self.metrics["bayes_std_avg"].value[key] = std_dist.mean()
+
+    # Order statistics need no sums, so a one-shot compute takes them from the data rather than from sketches.
+    # Sparse columns are summarized by their value counts, so they are never made dense.
+    def _compute_order_statistics(self, scalar_data):
+        scalar_map = self.ai_system.meta_database.scalar_map
+        features = self.ai_system.meta_database.features
+        quantiles_requested = self.is_requested("median", "quantile_1", "quantile_3", "iqr")
+        if scipy.sparse.issparse(scalar_data):
+            scalar_data = scipy.sparse.csc_matrix(scalar_data)
+            statistics = np.array([_value_count_statistics(*sparse_value_counts(scalar_data[:, i]))
+                                   for i in range(scalar_data.shape[1])]).reshape(-1, 4)
+            quantile_1, median, quantile_3, mode = statistics.T
+        else:
+            if quantiles_requested:
+                quantile_1, median, quantile_3 = np.quantile(scalar_data, [0.25, 0.5, 0.75], axis=0).astype(np.float64)
+            if self.is_requested("mode"):
+                mode = scipy.stats.mstats.mode(scalar_data)[0][0].astype(np.float64)
+        if quantiles_requested:
+            self._set_quantiles(quantile_1, median, quantile_3)
+        if self.is_requested("mode"):
+            self.metrics["mode"].value = map_to_feature_dict(mode, features, scalar_map)
+
+    def _set_quantiles(self, quantile_1, median, quantile_3):
+        scalar_map = self.ai_system.meta_database.scalar_map
+        features = self.ai_system.meta_database.features
+        if self.is_requested("median"):
+            self.metrics["median"].value = map_to_feature_dict(median, features, scalar_map)
+        if self.is_requested("quantile_1"):
+            self.metrics["quantile_1"].value = map_to_feature_dict(quantile_1, features, scalar_map)
+        if self.is_requested("quantile_3"):
+            self.metrics["quantile_3"].value = map_to_feature_dict(quantile_3, features, scalar_map)
+        if self.is_requested("iqr"):
+            self.metrics["iqr"].value = map_to_feature_dict(quantile_3 - quantile_1, features, scalar_map)
 
     def compute(self, data_dict):
         args = {}
@@ -38,87 +181,169 @@ class StatMetricGroup(MetricGroup, class_location=os.path.abspath(__file__)):
             args = self.ai_system.metric_manager.user_config["stats"]["args"]
         data = data_dict["data"]
         scalar_data = data.scalar
+        summarized = scipy.sparse.issparse(scalar_data) or scalar_data.dtype == np.float32
+        if summarized and ("mean" in args or "covariance" in args):
+            # The numpy arguments of mean and covariance need the values, so the data is computed as float64
+            scalar_data = scalar_data.toarray() if scipy.sparse.issparse(scalar_data) else scalar_data
+            scalar_data = np.asarray(scalar_data, dtype=np.float64)
+            summarized = False
+        if summarized:
+            # Sparse data is summarized from its nonzeros, and float32 data in float64 sums, and the metrics are
+            # derived from that summary
+            self._compute_summary(_summary_state(data, sketches=False, comoments=self.is_requested("covariance")))
+            if self.is_requested("median", "quantile_1", "quantile_3", "iqr", "mode"):
+                self._compute_order_statistics(scalar_data)
+            return
         scalar_map = self.ai_system.meta_database.scalar_map
         features = self.ai_system.meta_database.features
+        moments = get_scalar_moments(data_dict)
+
+        if self.is_requested("mean"):
+            mean = np.mean(scalar_data, **args["mean"], axis=0) if "mean" in args else moments["mean"]
+            self.metrics["mean"].value = map_to_feature_dict(mean, features, scalar_map)
+        if self.is_requested("covariance"):
+            self.metrics["covariance"].value = map_to_feature_array(np.cov(scalar_data.T, **args.get("covariance", {})), features, scalar_map)
+        if self.is_requested("num_nan_rows", "percent_nan_rows"):
+            self.metrics["num_nan_rows"].value = _count_nan_rows(data.X)
+            self.metrics["percent_nan_rows"].value = self.metrics["num_nan_rows"].value/np.shape(data.X)[0]
+
+        if self.is_requested("geometric_mean"):
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore')
+                try:
+                    self.metrics["geometric_mean"].value = map_to_feature_dict(scipy.stats.mstats.gmean(scalar_data), features, scalar_map)
+                except:
+                    self.metrics["geometric_mean"].value = None
+
+        if self.is_requested("mode"):
+            self.metrics["mode"].value = map_to_feature_dict(scipy.stats.mstats.mode(scalar_data)[0][0], features, scalar_map)
+        if self.is_requested("skew"):
+            self.metrics["skew"].value = map_to_feature_dict(scipy.stats.mstats.skew(scalar_data), features, scalar_map)
+        if self.is_requested("variation"):
+            self.metrics["variation"].value = map_to_feature_dict(scipy.stats.mstats.variation(scalar_data), features, scalar_map)
 
-        self.metrics["mean"].value = map_to_feature_dict(np.mean(scalar_data, **args.get("mean", {}), axis=0), features, scalar_map)
-        self.metrics["mean"].value = convert_float32_to_float64(self.metrics["mean"].value)
-        self.metrics["covariance"].value = map_to_feature_array(np.cov(scalar_data.T, **args.get("covariance", {})), features, scalar_map)
-        self.metrics["num_nan_rows"].value = np.count_nonzero(pd.isna(data.X).any(axis=1))
-        self.metrics["percent_nan_rows"].value = self.metrics["num_nan_rows"].value/np.shape(np.asarray(data.X))[0]
-
-        with warnings.catch_warnings():
-            warnings.filterwarnings('ignore')
-            try:
-                self.metrics["geometric_mean"].value = map_to_feature_dict(scipy.stats.mstats.gmean(scalar_data), features, scalar_map)
-                self.metrics['geometric_mean'].value = convert_float32_to_float64(self.metrics['geometric_mean'].value)
-            except:
-                self.metrics["geometric_mean"].value = None
-
-        self.metrics["mode"].value = map_to_feature_dict(scipy.stats.mstats.mode(scalar_data)[0][0], features, scalar_map)
-        self.metrics["skew"].value = map_to_feature_dict(scipy.stats.mstats.skew(scalar_data), features, scalar_map)
-        self.metrics['skew'].value = convert_float32_to_float64(self.metrics['skew'].value)
-        self.metrics["variation"].value = map_to_feature_dict(scipy.stats.mstats.variation(scalar_data), features, scalar_map)
-        self.metrics['variation'].value = convert_float32_to_float64(self.metrics['variation'].value)
-
-        self.metrics["median"].value = map_to_feature_dict(np.median(scalar_data, axis=0), features, scalar_map)
-        self.metrics["quantile_1"].value = map_to_feature_dict(np.quantile(scalar_data, 0.25, axis=0), features, scalar_map)
-        self.metrics["quantile_3"].value = map_to_feature_dict(np.quantile(scalar_data, 0.75, axis=0), features, scalar_map)
-        self.metrics["min"].value = map_to_feature_dict(np.min(scalar_data, axis=0), features, scalar_map)
-        self.metrics["max"].value = map_to_feature_dict(np.max(scalar_data, axis=0), features, scalar_map)
-        self.metrics["standard_deviation"].value = map_to_feature_dict(np.std(scalar_data, axis=0), features, scalar_map)
-
-        self.metrics["sem"].value = map_to_feature_dict(scipy.stats.mstats.sem(scalar_data), features, scalar_map)
-        self.metrics['kurtosis'].value = map_to_feature_dict(scipy.stats.mstats.kurtosis(scalar_data), features, scalar_map)
-        self.metrics['kurtosis'].value = convert_float32_to_float64(self.metrics['kurtosis'].value)
+        if self.is_requested("median"):
+            self.metrics["median"].value = map_to_feature_dict(np.median(scalar_data, axis=0), features, scalar_map)
+        if self.is_requested("quantile_1"):
+            self.metrics["quantile_1"].value = map_to_feature_dict(np.quantile(scalar_data, 0.25, axis=0), features, scalar_map)
+        if self.is_requested("quantile_3"):
+            self.metrics["quantile_3"].value = map_to_feature_dict(np.quantile(scalar_data, 0.75, axis=0), features, scalar_map)
+        self.metrics["min"].value = map_to_feature_dict(moments["min"], features, scalar_map)
+        self.metrics["max"].value = map_to_feature_dict(moments["max"], features, scalar_map)
+        self.metrics["standard_deviation"].value = map_to_feature_dict(moments["std"], features, scalar_map)
+
+        if self.is_requested("sem"):
+            self.metrics["sem"].value = map_to_feature_dict(scipy.stats.mstats.sem(scalar_data), features, scalar_map)
+        if self.is_requested("kurtosis"):
+            self.metrics['kurtosis'].value = map_to_feature_dict(scipy.stats.mstats.kurtosis(scalar_data), features, scalar_map)
 
         features = self.ai_system.meta_database.features
         map = self.ai_system.meta_database.scalar_map
 
-        self.metrics["frozen_mean_mean"].value = {}
-        self.metrics["frozen_mean_variance"].value = {}
-        self.metrics["frozen_mean_std"].value = {}
-        self.metrics["frozen_variance_mean"].value = {}
-        self.metrics["frozen_variance_variance"].value = {}
-        self.metrics["frozen_variance_std"].value = {}
-        self.metrics["frozen_std_mean"].value = {}
-        self.metrics["frozen_std_variance"].value = {}
-        self.metrics["frozen_std_std"].value = {}
-
-        values = calculate_per_mapped_features(scipy.stats.mvsdist, map, features, data.scalar, to_array=False)
-
-        for key in values:
-            if values[key] is not None:
-                self.metrics["frozen_mean_mean"].value[key] = values[key][0].mean()
-                self.metrics["frozen_mean_variance"].value[key] = values[key][0].var()
-                self.metrics["frozen_mean_std"].value[key] = values[key][0].std()
-                self.metrics["frozen_variance_mean"].value[key] = values[key][1].mean()
-                self.metrics["frozen_variance_variance"].value[key] = values[key][1].var()
-                self.metrics["frozen_variance_std"].value[key] = values[key][1].std()
-                self.metrics["frozen_std_mean"].value[key] = values[key][2].mean()
-                self.metrics["frozen_std_variance"].value[key] = values[key][2].var()
-                self.metrics["frozen_std_std"].value[key] = values[key][2].std()
-
-        self.metrics["kstat_1"].value = calculate_per_mapped_features(scipy.stats.kstat, map, features, data.scalar, 1, to_array=False)
-        self.metrics["kstat_2"].value = calculate_per_mapped_features(scipy.stats.kstat, map, features, data.scalar, 2, to_array=False)
-        self.metrics["kstat_3"].value = calculate_per_mapped_features(scipy.stats.kstat, map, features, data.scalar, 3, to_array=False)
-        self.metrics["kstat_4"].value = calculate_per_mapped_features(scipy.stats.kstat, map, features, data.scalar, 4, to_array=False)
-        self.metrics["kstatvar"].value = calculate_per_mapped_features(scipy.stats.kstatvar, map, features, data.scalar, to_array=False)
-        self.metrics["iqr"].value = calculate_per_mapped_features(scipy.stats.iqr, map, features, data.scalar, to_array=False)
-
-        self.metrics["bayes_mean"].value = {}
-        self.metrics["bayes_mean_avg"].value = {}
-        self.metrics["bayes_variance"].value = {}
-        self.metrics["bayes_variance_avg"].value = {}
-        self.metrics["bayes_std"].value = {}
-        self.metrics["bayes_std_avg"].value = {}
-        values = calculate_per_mapped_features(scipy.stats.bayes_mvs, map, features, data.scalar, to_array=False)
-
-        for key in values:
-            if values[key] is not None:
-                self.metrics["bayes_mean"].value[key] = values[key][0][1]
-                self.metrics["bayes_mean_avg"].value[key] = values[key][0][0]
-                self.metrics["bayes_variance"].value[key] = values[key][1][1]
-                self.metrics["bayes_variance_avg"].value[key] = values[key][1][0]
-                self.metrics["bayes_std"].value[key] = values[key][2][1]
-                self.metrics["bayes_std_avg"].value[key] = values[key][2][0]
+        frozen_metrics = ["frozen_mean_mean", "frozen_mean_variance", "frozen_mean_std", "frozen_variance_mean",
+                          "frozen_variance_variance", "frozen_variance_std", "frozen_std_mean", "frozen_std_variance",
+                          "frozen_std_std"]
+        if self.is_requested(*frozen_metrics):
+            for metric in frozen_metrics:
+                self.metrics[metric].value = {}
+
+            values = calculate_per_mapped_features(scipy.stats.mvsdist, map, features, scalar_data, to_array=False)
+
+            for key in values:
+                if values[key] is not None:
+                    self.metrics["frozen_mean_mean"].value[key] = values[key][0].mean()
+                    self.metrics["frozen_mean_variance"].value[key] = values[key][0].var()
+                    self.metrics["frozen_mean_std"].value[key] = values[key][0].std()
+                    self.metrics["frozen_variance_mean"].value[key] = values[key][1].mean()
+                    self.metrics["frozen_variance_variance"].value[key] = values[key][1].var()
+                    self.metrics["frozen_variance_std"].value[key] = values[key][1].std()
+                    self.metrics["frozen_std_mean"].value[key] = values[key][2].mean()
+                    self.metrics["frozen_std_variance"].value[key] = values[key][2].var()
+                    self.metrics["frozen_std_std"].value[key] = values[key][2].std()
+
+        for i in range(1, 5):
+            if self.is_requested("kstat_" + str(i)):
+                self.metrics["kstat_" + str(i)].value = calculate_per_mapped_features(scipy.stats.kstat, map, features, scalar_data, i, to_array=False)
+        if self.is_requested("kstatvar"):
+            self.metrics["kstatvar"].value = calculate_per_mapped_features(scipy.stats.kstatvar, map, features, scalar_data, to_array=False)
+        if self.is_requested("iqr"):
+            self.metrics["iqr"].value = calculate_per_mapped_features(scipy.stats.iqr, map, features, scalar_data, to_array=False)
+
+        bayes_metrics = ["bayes_mean", "bayes_mean_avg", "bayes_variance", "bayes_variance_avg", "bayes_std",
+                         "bayes_std_avg"]
+        if self.is_requested(*bayes_metrics):
+            for metric in bayes_metrics:
+                self.metrics[metric].value = {}
+            values = calculate_per_mapped_features(scipy.stats.bayes_mvs, map, features, scalar_data, to_array=False)
+
+            for key in values:
+                if values[key] is not None:
+                    self.metrics["bayes_mean"].value[key] = values[key][0][1]
+                    self.metrics["bayes_mean_avg"].value[key] = values[key][0][0]
+                    self.metrics["bayes_variance"].value[key] = values[key][1][1]
+                    self.metrics["bayes_variance_avg"].value[key] = values[key][1][0]
+                    self.metrics["bayes_std"].value[key] = values[key][2][1]
+                    self.metrics["bayes_std_avg"].value[key] = values[key][2][0]
+
+
+# The moments, co-moments, extremes and log sums of the scalar data, with sketches of the order statistics of each
+# column when sketches is True. float32 data is summarized without a float64 copy, and every sum is accumulated in
+# float64. Sparse data is summarized from its stored values, and its sketches count the implicit zeros at once.
+def _summary_state(data, sketches=True, comoments=True):
+    if scipy.sparse.issparse(data.scalar):
+        scalar_data = scipy.sparse.csc_matrix(data.scalar)
+        minimum, maximum = sparse_extremes(scalar_data)
+        log_sum = sparse_log_sum(scalar_data)
+    else:
+        scalar_data = np.asarray(data.scalar)
+        if scalar_data.dtype != np.float32:
+            scalar_data = scalar_data.astype(np.float64, copy=False)
+        empty = len(scalar_data) == 0
+        minimum = np.full(scalar_data.shape[1], np.inf) if empty else np.min(scalar_data, axis=0).astype(np.float64)
+        maximum = np.full(scalar_data.shape[1], -np.inf) if empty else np.max(scalar_data, axis=0).astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_sum = np.log(scalar_data).sum(axis=0, dtype=np.float64)
+    state = {"moments": moment_state(scalar_data), "min": minimum, "max": maximum, "log_sum": log_sum,
+             "nan_rows": _count_nan_rows(data.X), "rows": np.shape(data.X)[0]}
+    if comoments:
+        state["comoments"] = comoment_state(scalar_data)
+    if sketches:
+        state["quantiles"] = [QuantileSketch() for _ in range(scalar_data.shape[1])]
+        state["modes"] = [FrequencySketch() for _ in range(scalar_data.shape[1])]
+        for i in range(scalar_data.shape[1]):
+            if scipy.sparse.issparse(scalar_data):
+                values, counts = sparse_value_counts(scalar_data[:, i])
+            else:
+                values, counts = scalar_data[:, i], None
+            state["quantiles"][i].add(values, counts)
+            state["modes"][i].add(values, counts)
+    return state
+
+
+# Returns the first quartile, median, third quartile and smallest most frequent value of a column from its sorted
+# distinct values and their counts, interpolating the quantiles as np.quantile does.
+def _value_count_statistics(values, counts):
+    if len(values) == 0:
+        return [np.nan] * 4
+    mode = values[np.argmax(counts)]
+    if np.isnan(values).any():
+        return [np.nan, np.nan, np.nan, mode]
+    cumulative = np.cumsum(counts)
+    statistics = []
+    for q in [0.25, 0.5, 0.75]:
+        rank = q * (cumulative[-1] - 1)
+        low, high = np.floor(rank), np.ceil(rank)
+        low_value, high_value = values[np.searchsorted(cumulative, [low, high], side="right")]
+        statistics.append(low_value + (rank - low) * (high_value - low_value))
+    return statistics + [mode]
+
+
+# Numeric arrays are checked with numpy, so pandas is only imported for object arrays, which may hold None.
+def _count_nan_rows(x):
+    if scipy.sparse.issparse(x):
+        return sparse_nan_rows(x)
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.number):
+        return np.count_nonzero(np.isnan(x).any(axis=1))
+    import pandas as pd
+    return np.count_nonzero(pd.isna(x).any(axis=1))
@@ -15,4 +15,5 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-from .rai_redis import *
\ No newline at end of file
+from .rai_redis import *
+from .async_rai_redis import *
@@ -0,0 +1,59 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import json
+import redis.asyncio
+import RAI
+
+__all__ = ['AsyncRaiRedis']
+
+
+class AsyncRaiRedis:
+    """
+    AsyncRaiRedis publishes the measurements of an AISystem through an asyncio Redis client, under the keys
+    RaiRedis uses, so it can be passed as the publisher of AISystem.compute_async. Standard port: 6379, db=0.
+    """
+
+    def __init__(self, ai_system: RAI.AISystem = None) -> None:
+        self.redis_connection = None
+        self.ai_system = ai_system
+
+    async def connect(self, host: str = "localhost", port: int = 6379) -> bool:
+        self.redis_connection = redis.asyncio.Redis(host=host, port=port, db=0)
+        return await self.redis_connection.ping()
+
+    # aclose replaced close in redis 5
+    async def disconnect(self) -> None:
+        await getattr(self.redis_connection, "aclose", self.redis_connection.close)()
+
+    # Each metric group is published on the "<name>|group_values" channel as soon as it is computed
+    async def publish_group(self, dataset: str, group: str, values: dict) -> None:
+        await self.redis_connection.publish(self.ai_system.name + '|group_values',
+                                            json.dumps({"dataset": dataset, "group": group, "values": values}))
+
+    # When include_profile is True, the compute profile of each dataset split is pushed alongside the measurement
+    async def add_measurement(self, include_profile: bool = False) -> None:
+        certificates = self.ai_system.get_certificate_values()
+        metrics = self.ai_system.get_metric_values()
+        await self.redis_connection.rpush(self.ai_system.name + '|certificate_values', json.dumps(certificates))
+        await self.redis_connection.rpush(self.ai_system.name + '|metric_values', json.dumps(metrics))
+        if include_profile:
+            await self.redis_connection.rpush(self.ai_system.name + '|profile',
+                                              json.dumps(self.ai_system.get_profile()))
+        await self.redis_connection.publish('update',
+                                            "New measurement: %s" % metrics[list(metrics.keys())[0]]["metadata"]["date"])
@@ -128,7 +128,7 @@ class RaiRedis:
 
     def reset_redis(self, export_metadata: bool = True) -> None:
         to_delete = ["metric_values", "model_info", "metric_info", "metric", "certificate_metadata",
-                     "certificate_values", "certificate"]
+                     "certificate_values", "certificate", "profile"]
         for key in to_delete:
             self.redis_connection.delete(self.ai_system.name + "|" + key)
         for key in self.redis_connection.scan_iter(self.ai_system.name + "|analysis|*"):
@@ -139,7 +139,7 @@ class RaiRedis:
 
     def delete_data(self, system_name) -> None:
         to_delete = ["metric_values", "model_info", "metric_info", "metric", "certificate_metadata",
-                     "certificate_values", "certificate", "certificate_info", "project_info"]
+                     "certificate_values", "certificate", "certificate_info", "project_info", "profile"]
         for key in to_delete:
             self.redis_connection.delete(system_name + "|" + key)
         for key in self.redis_connection.scan_iter(self.ai_system.name + "|analysis|*"):
@@ -181,7 +181,8 @@ class RaiRedis:
                     encoded_res = json.dumps(self._jsonify_analysis(result[analysis].to_html()))
                     self.redis_connection.set(self.ai_system.name + "|analysis|" + analysis, encoded_res)
 
-    def add_measurement(self) -> None:
+    # When include_profile is True, the compute profile of each dataset split is pushed alongside the measurement
+    def add_measurement(self, include_profile: bool = False) -> None:
         certificates = self.ai_system.get_certificate_values()
         metrics = self.ai_system.get_metric_values()
         print("Sharing: ", self.ai_system.name)
@@ -207,6 +208,8 @@ class RaiRedis:
         '''
 
         self.redis_connection.rpush(self.ai_system.name + '|metric_values', json.dumps(metrics))  # True
+        if include_profile:
+            self.redis_connection.rpush(self.ai_system.name + '|profile', json.dumps(self.ai_system.get_profile()))
         self.redis_connection.publish('update',
                                       "New measurement: %s" % metrics[list(metrics.keys())[0]]["metadata"]["date"])
 
@@ -15,3 +15,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from .utils import *
+from .ingest import *
+from .streaming_stats import *
+from .sparse_stats import *
+from .result_cache import *
+from .sampling import *
+from .registry_manifest import *
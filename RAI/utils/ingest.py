@@ -0,0 +1,214 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import numpy as np
+from RAI.dataset.dataset import Feature, MetaDatabase
+
+__all__ = ['read_RAI']
+
+
+def read_RAI(source, target_column=None, chunksize: int = 1000000, clear_nans: bool = True, extra_symbols="?",
+             normalize=None, max_categorical_threshold=None, text_columns=[], read_options: dict = None):
+    """
+    Reads a CSV or Parquet file, or DataFrames, into a RAI MetaDatabase and X and y data, chunksize rows at a time.
+    Each chunk is cleaned, factorized and converted column by column into float64 blocks with vectorized operations,
+    and the blocks are joined once at the end. Categories are numbered in sorted order across every chunk, and
+    normalization uses the mean and standard deviation of every row, so the result matches df_to_RAI on the whole
+    data. pandas is needed, and pyarrow for Parquet files.
+
+    :param source: path of a .csv or .parquet file, a DataFrame, or an iterable of DataFrames such as the chunks
+        of pd.read_csv(..., chunksize=n)
+    :param target_column: column holding y, by default there is no y
+    :param chunksize: rows read from a file at a time
+    :param clear_nans: whether rows holding NaN, 'nan' or one of extra_symbols are dropped
+    :param extra_symbols: values standing for a missing value, each character of a string being one
+    :param normalize: "Scalar" to standardize the numeric columns which are not categorical
+    :param max_categorical_threshold: numeric columns with fewer distinct values are categorical
+    :param text_columns: columns holding text, which are kept as they are
+    :param read_options: further keyword arguments of pd.read_csv
+
+    :return: MetaDatabase, X as a float64 array, or an object array when there are text columns, y as an array
+        or None, and the list of output features
+    """
+    ingest = _Ingest(target_column, clear_nans, extra_symbols, normalize, max_categorical_threshold, text_columns)
+    for chunk in _read_chunks(source, chunksize, ingest.symbols if clear_nans else None, read_options or {}):
+        ingest.add(chunk)
+    return ingest.finish()
+
+
+def _read_chunks(source, chunksize: int, symbols: list, read_options: dict):
+    import pandas as pd
+    if isinstance(source, pd.DataFrame):
+        yield source
+    elif isinstance(source, str) and source.endswith(".parquet"):
+        import pyarrow.parquet
+        for batch in pyarrow.parquet.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif isinstance(source, str):
+        options = dict(read_options)
+        if symbols is not None:
+            options.setdefault("na_values", symbols)
+        yield from pd.read_csv(source, chunksize=chunksize, **options)
+    else:
+        yield from source
+
+
+class _Column:
+    # kind is "numeric", "categorical" or "text", as given by the dtype of the column in the first chunk
+    def __init__(self, name, kind: str, dtype, track_values: bool) -> None:
+        self.name = name
+        self.kind = kind
+        self.dtype = dtype
+        self.chunks = []
+        self.uniques = []  # Categories of each chunk, numbered by the codes stored in chunks
+        self.values = np.zeros(0) if track_values and kind == "numeric" else None
+
+
+class _Ingest:
+    """
+    Builds X, y and the MetaDatabase from chunks of a DataFrame, see read_RAI and df_to_RAI.
+    """
+
+    def __init__(self, target_column=None, clear_nans: bool = True, extra_symbols="?", normalize=None,
+                 max_categorical_threshold=None, text_columns=[]) -> None:
+        assert normalize in [None, "Scalar"], "normalize must be None or 'Scalar'"
+        self.target_column = target_column
+        self.clear_nans = clear_nans
+        self.symbols = ["nan"] + list(extra_symbols)
+        self.normalize = normalize
+        self.threshold = max_categorical_threshold
+        self.text_columns = text_columns
+        self.columns = None
+        self.rows = 0
+
+    def add(self, df) -> None:
+        import pandas as pd
+        if self.columns is None:
+            self.columns = [_Column(name, self._get_kind(name, df[name].dtype), df[name].dtype, bool(self.threshold))
+                            for name in df.columns]
+        # Missing values are found on the factorized codes of categorical columns, which is far cheaper than
+        # comparing every object to NaN and to each symbol
+        missing = np.zeros(len(df), dtype=bool)
+        arrays = []
+        for column in self.columns:
+            values = df[column.name]
+            if column.kind == "categorical":
+                codes, uniques = values.factorize()
+                uniques = np.asarray(uniques, dtype=object)
+                # Code -1, for NaN, indexes the last entry
+                missing |= np.append(pd.Index(uniques).isin(self.symbols), True)[codes]
+                arrays.append((codes, uniques))
+            elif column.kind == "text":
+                missing |= (values.isna() | values.isin(self.symbols)).to_numpy()
+                arrays.append(values.to_numpy(dtype=object))
+            else:
+                if values.dtype == object:
+                    values = values.where(~values.isin(self.symbols)).astype(np.float64)
+                values = values.to_numpy(dtype=np.float64)
+                missing |= np.isnan(values)
+                arrays.append(values)
+
+        keep = ~missing if self.clear_nans and missing.any() else None
+        for column, values in zip(self.columns, arrays):
+            if column.kind == "categorical":
+                codes, uniques = values
+                if keep is not None:
+                    codes, uniques = _drop_unused(codes[keep], uniques)
+                column.chunks.append(codes)
+                column.uniques.append(uniques)
+                continue
+            values = values[keep] if keep is not None else values
+            column.chunks.append(values)
+            # Distinct values are only kept until there are too many for the column to be categorical
+            if column.values is not None:
+                column.values = np.union1d(column.values, pd.unique(values))
+                if len(column.values) >= self.threshold:
+                    column.values = None
+        self.rows += len(df) if keep is None else int(keep.sum())
+
+    # Each column is written into X as it is finished, and its chunks released, so at most one copy of X is held
+    def finish(self):
+        output_feature = []
+        y = None
+        features = []
+        columns = [column for column in self.columns if column.name != self.target_column]
+        dtype = object if any(column.kind == "text" for column in columns) else np.float64
+        X = np.empty((self.rows, len(columns)), dtype=dtype)
+        for column in self.columns:
+            array, feature = self._finish_column(column)
+            column.chunks, column.uniques = [], []
+            if column.name == self.target_column:
+                y = array
+                output_feature.append(feature)
+            else:
+                X[:, len(features)] = array
+                features.append(feature)
+        return MetaDatabase(features), X, y, output_feature
+
+    def _get_kind(self, name, dtype) -> str:
+        if name in self.text_columns:
+            return "text"
+        if str(dtype) in ["object", "category"]:
+            return "categorical"
+        return "numeric"
+
+    # Returns the values of a column, and its feature. Integer columns keep their type in the categories, and in y.
+    def _finish_column(self, column: _Column):
+        import pandas as pd
+        name = column.name
+        integer = np.dtype(column.dtype).kind in "iub" if column.kind == "numeric" else False
+        values = np.concatenate(column.chunks) if len(column.chunks) > 0 else np.zeros(0)
+        if column.kind == "text":
+            return values, Feature(name, "text", name)
+        if column.kind == "numeric" and column.values is None:
+            if self.normalize == "Scalar" and len(values) > 0:
+                scale = values.std()
+                values = (values - values.mean()) / (scale if scale != 0 else 1.0)
+            elif integer and name == self.target_column:
+                values = values.astype(column.dtype)
+            return values, Feature(name, "numeric", name)
+        if column.kind == "numeric":
+            categories = column.values.astype(column.dtype) if integer else column.values
+            codes = np.searchsorted(column.values, values)
+            codes[np.isnan(values)] = -1
+        else:
+            categories, codes = self._merge_categories(column)
+        feature = Feature(name, "numeric", name, categorical=True,
+                          values={i: value for i, value in enumerate(pd.Index(categories))})
+        return codes.astype(np.int64 if name == self.target_column else np.float64), feature
+
+    # Numbers the categories of every chunk in sorted order, and renumbers the codes of each chunk to match
+    def _merge_categories(self, column: _Column):
+        import pandas as pd
+        if len(column.uniques) == 0:
+            return np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64)
+        categories = pd.Index(np.concatenate(column.uniques)).unique().sort_values()
+        codes = []
+        for chunk_codes, uniques in zip(column.chunks, column.uniques):
+            renumber = np.append(categories.get_indexer(uniques), -1)  # Code -1, for missing values, stays -1
+            codes.append(renumber[chunk_codes])
+        return categories, np.concatenate(codes)
+
+
+# Removes the categories no longer used once rows are dropped, renumbering the codes
+def _drop_unused(codes, uniques):
+    used = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 0
+    if used.all():
+        return codes, uniques
+    renumber = np.append(np.cumsum(used) - 1, -1)
+    return renumber[codes], uniques[used]
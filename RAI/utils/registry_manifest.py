@@ -0,0 +1,156 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+
+__all__ = ['lazy_import', 'RegistryManifest']
+
+manifest_format = 1
+
+
+# Returns a module __getattr__ which imports the classes of lazy_classes, a map from class name to module name
+# relative to package, on first access. Packages declaring their classes this way can be imported cheaply.
+def lazy_import(package: str, lazy_classes: dict):
+    def __getattr__(name):
+        if name not in lazy_classes:
+            raise AttributeError("module " + package + " has no attribute " + name)
+        return getattr(importlib.import_module(lazy_classes[name], package), name)
+    return __getattr__
+
+
+class RegistryManifest:
+    """
+    RegistryManifest holds the metadata needed to plan with a registry of classes, such as metric groups or
+    analyses, without importing their modules. Classes are declared by packages through a lazy_classes map,
+    and each one has a json config next to its module. The manifest is built from those configs by get_entry,
+    which validates a config and returns the name and the small part of the config used for planning.
+    The manifest is cached on disk, and rebuilt when any declaring package, module or config file changes.
+    """
+
+    def __init__(self, name: str, packages: list, get_entry, directory: str = None) -> None:
+        """
+        :param name: name of the manifest file, without extension
+        :param packages: names of the packages declaring classes through lazy_classes
+        :param get_entry: function of the class name and full config, returning the registered name and the
+            planning metadata. It raises an AssertionError for invalid configs
+        :param directory: directory the manifest is cached in. By default $RAI_CACHE_DIR, or ~/.cache/RAI
+        """
+        self.name = name
+        self.packages = packages
+        self.get_entry = get_entry
+        self.directory = directory
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        directory = self.directory or os.environ.get("RAI_CACHE_DIR") or \
+            os.path.join(os.path.expanduser("~"), ".cache", "RAI")
+        # Each installation of RAI keeps its own manifest
+        location = hashlib.sha1(os.path.dirname(os.path.abspath(__file__)).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(directory, self.name + "-" + location + ".json")
+
+    def entries(self) -> dict:
+        """
+        Returns the manifest entries, loading them from disk or building them on first use
+
+        :return: dict mapping each registered name to its module, class name, version and planning metadata
+        """
+        with self._lock:
+            if self._entries is None:
+                manifest = self._read()
+                if manifest is None or not _is_current(manifest):
+                    manifest = self._build()
+                    self._write(manifest)
+                self._entries = manifest["entries"]
+            return self._entries
+
+    def load_class(self, name: str):
+        """
+        Imports the module of a manifest entry and returns its class
+
+        :param name: registered name of the class
+
+        :return: the class
+        """
+        entry = self.entries()[name]
+        return getattr(importlib.import_module(entry["module"]), entry["class_name"])
+
+    def clear(self) -> None:
+        """
+        Forgets the entries held in memory, so the next use checks the files again
+
+        :return: None
+        """
+        with self._lock:
+            self._entries = None
+
+    def _build(self) -> dict:
+        entries, files = {}, {}
+        for package in self.packages:
+            module = importlib.import_module(package)
+            files[module.__file__] = os.stat(module.__file__).st_mtime_ns
+            for class_name, module_name in module.lazy_classes.items():
+                module_name = importlib.util.resolve_name(module_name, package)
+                source = importlib.util.find_spec(module_name).origin
+                config_file = source[:-2] + "json"
+                with open(config_file) as f:
+                    config = json.load(f)
+                name, metadata = self.get_entry(class_name, config)
+                if name in entries:
+                    raise NameError("Class Name: " + name + " already exists. Please enter a unique class name.")
+                with open(source, "rb") as f:
+                    version = hashlib.sha1(f.read() + json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+                entries[name] = dict(metadata, module=module_name, class_name=class_name, version=version)
+                for path in [source, config_file]:
+                    files[path] = os.stat(path).st_mtime_ns
+        return {"format": manifest_format, "packages": self.packages, "files": files, "entries": entries}
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != manifest_format or manifest.get("packages") != self.packages:
+            return None
+        return manifest
+
+    # The cache is an optimization, so manifests which cannot be written are only kept in memory
+    def _write(self, manifest):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+
+# A manifest is current while every file it was built from is unchanged
+def _is_current(manifest):
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in manifest["files"].items())
+    except OSError:
+        return False
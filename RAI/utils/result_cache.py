@@ -0,0 +1,183 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse
+
+__all__ = ['fingerprint', 'ResultCache']
+
+
+# Returns a hex digest of the content of values, which may be nested dicts, lists and tuples of arrays, sparse
+# matrices, tensors, strings and numbers. Equal content gives equal digests, whatever the identity of the objects
+# holding it.
+def fingerprint(*values) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    for value in values:
+        _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value):
+    if isinstance(value, dict):
+        digest.update(b"d%d" % len(value))
+        for key in sorted(value, key=str):
+            _update_digest(digest, str(key))
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)) and not all(isinstance(item, (int, float, bool)) for item in value):
+        digest.update(b"l%d" % len(value))
+        for item in value:
+            _update_digest(digest, item)
+    elif isinstance(value, str):
+        digest.update(b"s%d:" % len(value) + value.encode("utf-8"))
+    elif value is None or isinstance(value, (bool, int, float, np.generic)):
+        digest.update(b"v" + repr(value).encode("utf-8"))
+    elif scipy.sparse.issparse(value):
+        value = value.tocsr()
+        digest.update(b"p" + repr(value.shape).encode("utf-8"))
+        for part in [value.indptr, value.indices, value.data]:
+            _update_digest(digest, part)
+    else:
+        if hasattr(value, "detach"):
+            value = value.detach().cpu().numpy()
+        array = np.asarray(value)
+        digest.update(b"a" + str(array.dtype).encode("utf-8") + repr(array.shape).encode("utf-8"))
+        if array.dtype.hasobject:
+            digest.update(pickle.dumps(array.tolist()))
+        else:
+            digest.update(np.ascontiguousarray(array).data)
+
+
+class ResultCache:
+    """
+    ResultCache is a size bounded, least recently used mapping from fingerprints to computed results.
+    When a directory is given, results are also pickled to it, so they outlive the process and can be shared
+    between AISystems. Entries evicted from memory are still read back from the directory, which holds up to
+    max_directory_entries results, the least recently used files being removed past that.
+    """
+
+    def __init__(self, max_entries: int = 32, directory: str = None, max_directory_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_directory_entries = max_directory_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str):
+        """
+        Returns the result stored under key, or None when there is none
+
+        :param key: fingerprint of the result
+
+        :return: the stored result or None
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory is None or not os.path.isfile(self._get_path(key)):
+            return None
+        try:
+            with open(self._get_path(key), "rb") as f:
+                value = pickle.load(f)
+            os.utime(self._get_path(key))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        """
+        Stores value under key, evicting the least recently used entries from memory past max_entries,
+        and from the directory past max_directory_entries
+
+        :param key: fingerprint of the result
+        :param value: picklable result
+
+        :return: None
+        """
+        self._put_memory(key, value)
+        if self.directory is not None:
+            # Written to a temporary file first, so readers never see a partially written result
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f)
+            os.replace(temp_path, self._get_path(key))
+            self._prune_directory()
+
+    def clear(self) -> None:
+        """
+        Removes all results held in memory and in the directory
+
+        :return: None
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    # Locks can not be pickled, so a cache held by a pickled AISystem recreates its lock
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.directory is not None and os.path.isfile(self._get_path(key)))
+
+    def _put_memory(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Removes the least recently written or read files past max_directory_entries. Files removed meanwhile by
+    # another AISystem sharing the directory are skipped.
+    def _prune_directory(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+                except OSError:
+                    pass
+        entries.sort()
+        for _, name in entries[:max(len(entries) - self.max_directory_entries, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
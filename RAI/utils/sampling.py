@@ -0,0 +1,132 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import math
+import numpy as np
+import scipy.stats
+
+__all__ = ['get_strata', 'stratified_sample', 'replicate_intervals']
+
+
+def get_strata(columns: list) -> np.ndarray:
+    """
+    Returns the stratum of each row, numbering each combination of values of the given columns
+
+    :param columns: list of arrays, each holding one value per row
+
+    :return: array of stratum indices, one per row
+    """
+    columns = [np.asarray(column).ravel() for column in columns]
+    if len(columns) == 0:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.column_stack([np.unique(column, return_inverse=True)[1].ravel() for column in columns])
+    return np.unique(codes, axis=0, return_inverse=True)[1].ravel()
+
+
+def stratified_sample(strata: np.ndarray, size: int, replicates: int = 1, seed: int = None):
+    """
+    Draws size rows without replacement, allocating them to each stratum in proportion to its rows, with at least
+    one row from every stratum. The sampled rows are also dealt into replicates, each itself a stratified sample.
+
+    :param strata: stratum of each row, see get_strata
+    :param size: number of rows to draw
+    :param replicates: number of replicate subsamples the drawn rows are split into
+    :param seed: seed of the random generator
+
+    :return: sorted indices of the drawn rows, and the replicate of each drawn row
+    """
+    rng = np.random.default_rng(seed)
+    labels, counts = np.unique(strata, return_counts=True)
+    size = min(max(int(size), len(labels)), len(strata))
+    # Rows are allocated in proportion to the rows of each stratum, bounded below by one row and above by the rows
+    # of the stratum. Strata at a bound are fixed there and the other rows are split among the rest, until no
+    # quota is out of bounds. Largest remainder rounding then keeps the allocations adding up to size.
+    low = np.zeros(len(labels), dtype=bool)
+    high = np.zeros(len(labels), dtype=bool)
+    while True:
+        fixed = np.where(low, 1, np.where(high, counts, 0))
+        weights = np.where(low | high, 0, counts)
+        quotas = np.where(low | high, fixed, (size - fixed.sum()) * weights / max(weights.sum(), 1))
+        below, above = ~low & ~high & (quotas < 1), ~low & ~high & (quotas > counts)
+        if not below.any() and not above.any():
+            break
+        low |= below
+        high |= above
+    allocation = np.floor(quotas).astype(np.int64)
+    allocation[np.argsort(allocation - quotas, kind="stable")[:size - allocation.sum()]] += 1
+
+    order = np.argsort(strata, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)])
+    indices, replicate_of = [], []
+    for i in range(len(labels)):
+        chosen = rng.choice(order[starts[i]:starts[i + 1]], size=allocation[i], replace=False)
+        indices.append(chosen)
+        replicate_of.append((np.arange(allocation[i]) + rng.integers(replicates)) % replicates)
+    indices, replicate_of = np.concatenate(indices), np.concatenate(replicate_of)
+    ordered = np.argsort(indices)
+    return indices[ordered], replicate_of[ordered]
+
+
+def replicate_intervals(value, replicate_values: list, confidence: float = 0.95):
+    """
+    Returns confidence intervals of metric values computed on a sample, from the spread of the same metrics
+    computed on replicate subsamples of it. The standard error of each value is the standard deviation of the
+    replicate values over the square root of their count, and intervals use the t distribution. Intervals hold for
+    metrics estimating a quantity of the whole split, such as rates and means, but not for counts, which grow with
+    the size of the sample.
+
+    :param value: metric value computed on the whole sample. Nested dicts, numbers and numeric arrays are supported
+    :param replicate_values: the same metric computed on each replicate
+    :param confidence: confidence level of the intervals
+
+    :return: value with each number replaced by a [low, high] interval, and arrays by [low array, high array].
+             Values without an interval, such as text or values missing from a replicate, are None
+    """
+    if isinstance(value, dict):
+        return {key: replicate_intervals(value[key], [_get(other, key) for other in replicate_values], confidence)
+                for key in value}
+    if isinstance(value, bool) or value is None or len(replicate_values) < 2:
+        return None
+    if isinstance(value, (int, float, np.number)):
+        if not all(isinstance(other, (int, float, np.number)) and not isinstance(other, bool)
+                   for other in replicate_values):
+            return None
+        low, high = _interval(float(value), np.array(replicate_values, dtype=np.float64), confidence)
+        return [float(low), float(high)]
+    if isinstance(value, (list, np.ndarray)):
+        array = np.asarray(value)
+        if array.dtype.kind not in "biuf" or array.dtype.kind == "b":
+            return None
+        others = [np.asarray(other) for other in replicate_values if other is not None]
+        if len(others) != len(replicate_values) or any(other.shape != array.shape for other in others):
+            return None
+        low, high = _interval(array.astype(np.float64), np.stack(others).astype(np.float64), confidence)
+        return [low.tolist(), high.tolist()] if isinstance(value, list) else [low, high]
+    return None
+
+
+def _get(values, key):
+    return values.get(key) if isinstance(values, dict) else None
+
+
+def _interval(value, replicates: np.ndarray, confidence: float):
+    count = len(replicates)
+    with np.errstate(invalid="ignore"):
+        error = np.std(replicates, axis=0, ddof=1) / math.sqrt(count)
+    width = scipy.stats.t.ppf((1 + confidence) / 2, count - 1) * error
+    return value - width, value + width
@@ -0,0 +1,169 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import math
+import numpy as np
+import scipy.sparse
+import scipy.stats
+
+__all__ = ['sparse_columns', 'sparse_value_counts', 'sparse_moment_state', 'sparse_comoment_state',
+           'sparse_extremes', 'sparse_log_sum', 'sparse_nan_rows', 'sparse_pearsonr', 'sparse_spearmanr']
+
+
+# ===== SPARSE STATISTICS =====
+# Statistics of scipy.sparse matrices, computed from the stored values and the number of implicit zeros of each
+# column. Memory and time are proportional to the number of stored values, and X is never made dense.
+
+# Returns X as a float64 CSC matrix without duplicate entries, the column of each stored value, and the number
+# of implicit zeros in each column.
+def sparse_columns(X):
+    X = scipy.sparse.csc_matrix(X, dtype=np.float64)
+    if not X.has_canonical_format:
+        X = X.copy()
+        X.sum_duplicates()
+    stored = np.diff(X.indptr)
+    return X, np.repeat(np.arange(X.shape[1]), stored), X.shape[0] - stored
+
+
+# Returns the distinct values of a sparse column and how often each occurs, counting its implicit zeros.
+def sparse_value_counts(x):
+    x, _, zeros = sparse_columns(x)
+    values, counts = np.unique(x.data, return_counts=True)
+    position = np.searchsorted(values, 0.0)
+    if zeros[0] > 0 and position < len(values) and values[position] == 0:
+        counts[position] += zeros[0]
+    elif zeros[0] > 0:
+        values = np.insert(values, position, 0.0)
+        counts = np.insert(counts, position, zeros[0])
+    return values, counts
+
+
+# Returns the same state as streaming_stats.moment_state, the implicit zeros of each column adding
+# their deviation from the mean once per zero.
+def sparse_moment_state(X):
+    X, columns, zeros = sparse_columns(X)
+    n, width = X.shape
+    if n == 0:
+        empty = np.zeros(width)
+        return {"n": 0, "mean": empty, "m2": empty, "m3": empty, "m4": empty}
+    mean = np.bincount(columns, weights=X.data, minlength=width) / n
+    d = X.data - mean[columns]
+    d2 = d * d
+    return {"n": n, "mean": mean,
+            "m2": np.bincount(columns, weights=d2, minlength=width) + zeros * mean ** 2,
+            "m3": np.bincount(columns, weights=d2 * d, minlength=width) - zeros * mean ** 3,
+            "m4": np.bincount(columns, weights=d2 * d2, minlength=width) + zeros * mean ** 4}
+
+
+# Returns the same state as streaming_stats.comoment_state. The cross products are taken over the stored values
+# as X^T X - n * mean mean^T, which loses precision for columns whose mean is large next to their spread.
+def sparse_comoment_state(X):
+    X, _, _ = sparse_columns(X)
+    n, width = X.shape
+    if n == 0:
+        return {"n": 0, "mean": np.zeros(width), "c": np.zeros((width, width))}
+    mean = np.asarray(X.sum(axis=0)).ravel() / n
+    return {"n": n, "mean": mean, "c": (X.T @ X).toarray() - n * np.outer(mean, mean)}
+
+
+# Returns the minimum and maximum of each column, which are 0 or beyond in columns holding implicit zeros.
+# NaN values propagate as they do with np.min and np.max.
+def sparse_extremes(X):
+    X, _, zeros = sparse_columns(X)
+    minimum = np.where(zeros > 0, 0.0, np.inf)
+    maximum = np.where(zeros > 0, 0.0, -np.inf)
+    stored = np.flatnonzero(np.diff(X.indptr))
+    if len(stored) > 0:
+        starts = X.indptr[stored]
+        minimum[stored] = np.minimum(minimum[stored], np.minimum.reduceat(X.data, starts))
+        maximum[stored] = np.maximum(maximum[stored], np.maximum.reduceat(X.data, starts))
+    return minimum, maximum
+
+
+# Returns the sum of the logs of each column, which is -inf for columns holding implicit zeros.
+def sparse_log_sum(X):
+    X, columns, zeros = sparse_columns(X)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.bincount(columns, weights=np.log(X.data), minlength=X.shape[1]) + np.where(zeros > 0, -np.inf, 0.0)
+
+
+# Returns the number of rows holding a NaN, which can only be a stored value.
+def sparse_nan_rows(X):
+    X = scipy.sparse.coo_matrix(X)
+    return len(np.unique(X.row[np.isnan(X.data)]))
+
+
+# Returns the correlation and two sided p-value of scipy.stats.pearsonr for a sparse column x and a dense y.
+def sparse_pearsonr(x, y):
+    x, _, _ = sparse_columns(x)
+    y = np.asarray(y, dtype=np.float64).ravel()
+    r = _fill_correlation(x.data, x.indices, 0.0, y)
+    if len(y) == 2 and not np.isnan(r):
+        return r, 1.0
+    ab = len(y) / 2 - 1
+    return r, 2 * scipy.stats.beta(ab, ab, loc=-1, scale=2).sf(abs(r))
+
+
+# Returns the correlation and two sided p-value of scipy.stats.spearmanr for a sparse column x and a dense y.
+# The implicit zeros of x share one average rank, so the ranks of x stay a fill value plus the stored ranks.
+def sparse_spearmanr(x, y):
+    x, _, zeros = sparse_columns(x)
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if np.isnan(x.data).any() or np.isnan(y).any():
+        return np.nan, np.nan
+    ranks, fill = _sparse_ranks(x.data, zeros[0])
+    r = _fill_correlation(ranks, x.indices, fill, scipy.stats.rankdata(y))
+    dof = len(y) - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt(np.clip(dof / ((r + 1.0) * (1.0 - r)), 0, None))
+    return r, 2 * scipy.stats.t.sf(np.abs(t), dof)
+
+
+# Pearson correlation of y with a vector which holds values at rows and fill everywhere else.
+def _fill_correlation(values, rows, fill, y):
+    n = len(y)
+    if n < 2:
+        raise ValueError("x and y must have length at least 2.")
+    if np.isnan(values).any() or np.isnan(y).any():
+        return np.nan
+    fills = n - len(values)
+    mean = (values.sum() + fills * fill) / n
+    dx = values - mean
+    dfill = fill - mean
+    yc = y - y.mean()
+    sxx = dx @ dx + fills * dfill ** 2
+    sxy = dx @ yc[rows] + dfill * (yc.sum() - yc[rows].sum())
+    syy = yc @ yc
+    if sxx == 0 or syy == 0:
+        return np.nan
+    return max(min(sxy / math.sqrt(sxx * syy), 1.0), -1.0)
+
+
+# Average ranks of the stored values among themselves and the given number of zeros, with the rank of a zero.
+def _sparse_ranks(values, zeros):
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    position = np.searchsorted(unique, 0.0)
+    if zeros > 0:
+        if position < len(unique) and unique[position] == 0:
+            counts[position] += zeros
+        else:
+            unique = np.insert(unique, position, 0.0)
+            counts = np.insert(counts, position, zeros)
+            inverse = np.where(inverse >= position, inverse + 1, inverse)
+    average = np.cumsum(counts) - (counts - 1) / 2.0
+    fill = average[position] if zeros > 0 else 0.0
+    return average[np.asarray(inverse).ravel()], fill
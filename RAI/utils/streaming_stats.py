@@ -0,0 +1,260 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import copy
+import math
+import numpy as np
+import scipy.sparse
+import scipy.stats
+from .sparse_stats import sparse_moment_state, sparse_comoment_state
+
+__all__ = ['moment_state', 'merge_moment_states', 'comoment_state', 'merge_comoment_states',
+           'QuantileSketch', 'FrequencySketch', 'merge_sketches', 'mvsdist_from_moments']
+
+
+# ===== MERGEABLE SUMMARIES =====
+# These summaries are used by metric groups which support incremental updates. Each summary is built from a
+# batch of rows, and two summaries can be merged into the summary of the combined rows.
+
+# Returns the count, mean and the 2nd, 3rd and 4th central moment sums per column of X.
+def moment_state(X):
+    if scipy.sparse.issparse(X):
+        return sparse_moment_state(X)
+    X = _as_float(X)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    n = X.shape[0]
+    if n == 0:
+        zeros = np.zeros(X.shape[1])
+        return {"n": 0, "mean": zeros, "m2": zeros, "m3": zeros, "m4": zeros}
+    if X.dtype == np.float32:
+        return _float32_moment_state(X)
+    mean = X.mean(axis=0)
+    d = X - mean
+    d2 = d * d
+    return {"n": n, "mean": mean, "m2": d2.sum(axis=0), "m3": (d2 * d).sum(axis=0), "m4": (d2 * d2).sum(axis=0)}
+
+
+# Merges two moment states using the pairwise update formulas of Chan et al. and Pebay.
+def merge_moment_states(a, b):
+    if a is None or a["n"] == 0:
+        return b
+    if b is None or b["n"] == 0:
+        return a
+    na, nb = a["n"], b["n"]
+    n = na + nb
+    delta = b["mean"] - a["mean"]
+    delta2 = delta * delta
+    mean = a["mean"] + delta * nb / n
+    m2 = a["m2"] + b["m2"] + delta2 * na * nb / n
+    m3 = a["m3"] + b["m3"] + delta2 * delta * na * nb * (na - nb) / n ** 2 \
+        + 3 * delta * (na * b["m2"] - nb * a["m2"]) / n
+    m4 = a["m4"] + b["m4"] + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3 \
+        + 6 * delta2 * (na * na * b["m2"] + nb * nb * a["m2"]) / n ** 2 + 4 * delta * (na * b["m3"] - nb * a["m3"]) / n
+    return {"n": n, "mean": mean, "m2": m2, "m3": m3, "m4": m4}
+
+
+# Returns the count, column means and the matrix of summed cross products of deviations of X.
+def comoment_state(X):
+    if scipy.sparse.issparse(X):
+        return sparse_comoment_state(X)
+    X = _as_float(X)
+    n = X.shape[0]
+    if n == 0:
+        return {"n": 0, "mean": np.zeros(X.shape[1]), "c": np.zeros((X.shape[1], X.shape[1]))}
+    if X.dtype == np.float32:
+        return _float32_comoment_state(X)
+    mean = X.mean(axis=0)
+    d = X - mean
+    return {"n": n, "mean": mean, "c": d.T @ d}
+
+
+def merge_comoment_states(a, b):
+    if a is None or a["n"] == 0:
+        return b
+    if b is None or b["n"] == 0:
+        return a
+    n = a["n"] + b["n"]
+    delta = b["mean"] - a["mean"]
+    return {"n": n, "mean": a["mean"] + delta * b["n"] / n,
+            "c": a["c"] + b["c"] + np.outer(delta, delta) * a["n"] * b["n"] / n}
+
+
+# float32 data is summed a block of rows at a time, each block into float64 totals. No float64 copy of the data is
+# made, and the rounding error of a float32 sum is bounded by the block size rather than the number of rows.
+_block_rows = 4096
+
+
+# float32 arrays are kept as they are, and anything else is converted to float64.
+def _as_float(X):
+    X = np.asarray(X)
+    return X if X.dtype == np.float32 else X.astype(np.float64, copy=False)
+
+
+# Sums the powers of the deviations from a float32 shift close to the mean, then moves the sums to the exact
+# mean. The shift keeps the float32 deviations small, so their powers keep the precision of the data.
+def _float32_moment_state(X):
+    n = X.shape[0]
+    shift = X.mean(axis=0, dtype=np.float64).astype(np.float32)
+    s1, s2, s3, s4 = (np.zeros(X.shape[1]) for _ in range(4))
+    for start in range(0, n, _block_rows):
+        d = X[start:start + _block_rows] - shift
+        d2 = d * d
+        s1 += d.sum(axis=0, dtype=np.float64)
+        s2 += d2.sum(axis=0, dtype=np.float64)
+        s3 += (d2 * d).sum(axis=0, dtype=np.float64)
+        s4 += (d2 * d2).sum(axis=0, dtype=np.float64)
+    delta = s1 / n
+    return {"n": n, "mean": shift + delta, "m2": s2 - n * delta ** 2,
+            "m3": s3 - 3 * delta * s2 + 2 * n * delta ** 3,
+            "m4": s4 - 4 * delta * s3 + 6 * delta ** 2 * s2 - 3 * n * delta ** 4}
+
+
+def _float32_comoment_state(X):
+    n = X.shape[0]
+    shift = X.mean(axis=0, dtype=np.float64).astype(np.float32)
+    s1 = np.zeros(X.shape[1])
+    c = np.zeros((X.shape[1], X.shape[1]))
+    for start in range(0, n, _block_rows):
+        d = X[start:start + _block_rows] - shift
+        s1 += d.sum(axis=0, dtype=np.float64)
+        c += d.T @ d
+    delta = s1 / n
+    return {"n": n, "mean": shift + delta, "c": c - n * np.outer(delta, delta)}
+
+
+class QuantileSketch:
+    """
+    QuantileSketch is a mergeable summary used to estimate the quantiles of a stream of values.
+    Distinct values are stored with their counts, so quantiles are exact while fewer than capacity distinct
+    values have been seen. Past that, neighbouring values are compacted into equally weighted points,
+    bounding memory to the capacity regardless of the number of values seen.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+        self.has_nan = False
+
+    # counts gives how often each value occurs, such as the number of implicit zeros of a sparse column
+    def add(self, values, counts=None) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        counts = np.ones(len(values)) if counts is None else np.asarray(counts, dtype=np.float64).ravel()
+        if np.isnan(values).any():
+            self.has_nan = True
+            counts = counts[~np.isnan(values)]
+            values = values[~np.isnan(values)]
+        self._insert(values[counts > 0], counts[counts > 0])
+
+    def merge(self, other) -> None:
+        self.has_nan = self.has_nan or other.has_nan
+        self.exact = self.exact and other.exact
+        self._insert(other.values, other.weights)
+
+    # Matches the linear interpolation of np.quantile while the sketch is exact
+    def quantile(self, q):
+        if self.has_nan or len(self.values) == 0:
+            return np.nan
+        cumulative = np.cumsum(self.weights)
+        rank = q * (cumulative[-1] - 1)
+        low, high = np.floor(rank), np.ceil(rank)
+        indices = np.minimum(np.searchsorted(cumulative, [low, high], side="right"), len(self.values) - 1)
+        low_value, high_value = self.values[indices]
+        return low_value + (rank - low) * (high_value - low_value)
+
+    def _insert(self, values, weights):
+        values, inverse = np.unique(np.concatenate((self.values, values)), return_inverse=True)
+        self.weights = np.bincount(inverse, weights=np.concatenate((self.weights, weights)))
+        self.values = values
+        if len(self.values) > self.capacity:
+            self._compact()
+
+    def _compact(self):
+        size = self.capacity // 2
+        cumulative = np.cumsum(self.weights)
+        buckets = np.minimum((cumulative - self.weights / 2) * size // cumulative[-1], size - 1).astype(int)
+        weights = np.bincount(buckets, weights=self.weights, minlength=size)
+        sums = np.bincount(buckets, weights=self.weights * self.values, minlength=size)
+        keep = weights > 0
+        self.values = sums[keep] / weights[keep]
+        self.weights = weights[keep]
+        self.exact = False
+
+
+class FrequencySketch:
+    """
+    FrequencySketch is a mergeable Misra-Gries summary of how often each value occurs in a stream.
+    Counts are exact while fewer than capacity distinct values have been seen, after which only the
+    most frequent values are tracked.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self.counts = {}
+
+    def add(self, values, counts=None) -> None:
+        if counts is None:
+            values, counts = np.unique(np.asarray(values).ravel(), return_counts=True)
+        for value, count in zip(np.asarray(values).tolist(), np.asarray(counts).tolist()):
+            if count == 0:
+                continue
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._prune()
+
+    def merge(self, other) -> None:
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._prune()
+
+    # Returns the most frequent value, picking the smallest value on ties like scipy.stats.mode
+    def mode(self):
+        if len(self.counts) == 0:
+            return np.nan
+        return min(self.counts.items(), key=lambda item: (-item[1], item[0]))[0]
+
+    def _prune(self):
+        if len(self.counts) <= self.capacity:
+            return
+        threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = {value: count - threshold for value, count in self.counts.items() if count > threshold}
+
+
+# Returns a new sketch summarizing the values of both sketches, leaving both unchanged.
+def merge_sketches(a, b):
+    result = copy.deepcopy(a)
+    result.merge(b)
+    return result
+
+
+# Returns the same frozen distributions as scipy.stats.mvsdist, using only the sample count, mean and variance.
+def mvsdist_from_moments(n, xbar, variance):
+    if n < 2:
+        raise ValueError("Need at least 2 data-points.")
+    if n > 1000:
+        mdist = scipy.stats.norm(loc=xbar, scale=math.sqrt(variance / n))
+        sdist = scipy.stats.norm(loc=math.sqrt(variance), scale=math.sqrt(variance / (2. * n)))
+        vdist = scipy.stats.norm(loc=variance, scale=math.sqrt(2.0 / n) * variance)
+    else:
+        nm1 = n - 1
+        fac = n * variance / 2.
+        val = nm1 / 2.
+        mdist = scipy.stats.t(nm1, loc=xbar, scale=math.sqrt(variance / nm1))
+        sdist = scipy.stats.gengamma(val, -2, scale=math.sqrt(fac))
+        vdist = scipy.stats.invgamma(val, scale=fac)
+    return mdist, vdist, sdist
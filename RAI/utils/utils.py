@@ -18,12 +18,9 @@
 import math
 import pickle
 import numpy as np
-import pandas as pd
-import torch
-import torch.utils.data
 from sklearn.preprocessing import StandardScaler
 from RAI.dataset.dataset import Feature, MetaDatabase
-import torchvision.transforms as transforms
+from RAI.utils.ingest import _Ingest
 
 __all__ = ['jsonify', 'compare_runtimes', 'df_to_meta_database', 'df_to_RAI', 'reweighing',
            'calculate_per_mapped_features', 'convert_float32_to_float64',
@@ -103,105 +100,83 @@ def df_to_meta_database(df, categorical_values=None, protected_attribute_names=N
 
 
 def df_remove_nans(df, extra_symbols):
-    for i in df:
-        df[i].replace('nan', np.nan, inplace=True)
-        for s in extra_symbols:
-            df[i].replace(s, np.nan, inplace=True)
+    df.replace(["nan"] + list(extra_symbols), np.nan, inplace=True)
     df.dropna(inplace=True)
 
 
-def torch_to_RAI(torch_item, max_size=None, detailed=True):
-    result_x = None
-    result_y = []
-    raw_x = None
-    x_shape = None
-
-    if isinstance(torch_item, torch.utils.data.DataLoader):
-        transform = torch_item.dataset.transform
-        if torch_item.dataset.transform is None:
-            torch_item.dataset.transform = transforms.ToTensor()
-            torch_item.transform = transform
-        for i, val in enumerate(torch_item, 0):
-            x, y = val
-            if raw_x is None:
-                raw_x = x
-            else:
-                raw_x = torch.vstack((raw_x, x))
-            x = x.detach().numpy()
-            y = y.detach().numpy()
-            if x_shape is None:
-                x_shape = list(x.shape)
-                x_shape[0] = 1
-                x_shape.insert(0, -1)
-            x = x.reshape(x_shape)
-            if result_x is None:
-                result_x = x
-            else:
-                result_x = np.vstack((result_x, x))
-            result_y.extend(y.tolist())
-            if max_size is not None and len(result_x) > max_size:
-                result_x = result_x[:max_size]
-                break
-
-    elif isinstance(torch_item, torch.Tensor):
-        result_x = np.array([[x] for x in torch_item])
-    else:
-        assert "torch_item must be of type DataLoader or Tensor"
-    return result_x, result_y, raw_x
+# torch and torchvision are imported on use, so importing RAI does not load them.
+# Batches are written in place into a tensor allocated for the whole dataset, or grown geometrically when its length
+# is unknown, so conversion is linear in the number of rows. The numpy X is a view of that tensor when
+# share_memory is True, and a copy otherwise. At most max_size rows are read.
+def torch_to_RAI(torch_item, max_size=None, detailed=True, share_memory=True):
+    import torch
+    import torch.utils.data
+    import torchvision.transforms as transforms
+    assert isinstance(torch_item, (torch.utils.data.DataLoader, torch.Tensor)), \
+        "torch_item must be of type DataLoader or Tensor"
+    if isinstance(torch_item, torch.Tensor):
+        x = torch_item.detach().cpu().numpy()
+        return x.reshape((-1, 1) + x.shape[1:]), [], None
+
+    transform = torch_item.dataset.transform
+    if torch_item.dataset.transform is None:
+        torch_item.dataset.transform = transforms.ToTensor()
+        torch_item.transform = transform
+    try:
+        capacity = len(torch_item.dataset)
+    except TypeError:
+        capacity = None
+    if max_size is not None:
+        capacity = min(capacity, max_size) if capacity is not None else max_size
 
-
-# Converts a pandas dataframe to a Rai Metadatabase and X and y data.
+    raw_x = None
+    result_y = []
+    rows = 0
+    for x, y in torch_item:
+        if max_size is not None:
+            x, y = x[:max_size - rows], y[:max_size - rows]
+        x = x.detach().cpu()
+        if raw_x is None:
+            raw_x = torch.empty((capacity if capacity is not None else len(x),) + tuple(x.shape[1:]), dtype=x.dtype)
+        if rows + len(x) > len(raw_x):
+            grown = torch.empty((max(2 * len(raw_x), rows + len(x)),) + tuple(raw_x.shape[1:]), dtype=raw_x.dtype)
+            grown[:rows] = raw_x[:rows]
+            raw_x = grown
+        raw_x[rows:rows + len(x)] = x
+        rows += len(x)
+        result_y.extend(y.detach().cpu().numpy().tolist())
+        if max_size is not None and rows >= max_size:
+            break
+
+    if raw_x is None:
+        return None, result_y, None
+    raw_x = raw_x[:rows]
+    result_x = raw_x.numpy()
+    if not share_memory:
+        result_x = result_x.copy()
+    return result_x.reshape((-1, 1) + result_x.shape[1:]), result_y, raw_x
+
+
+# Converts a pandas dataframe to a Rai Metadatabase and X and y data, leaving the dataframe unchanged.
+# Earlier versions modified the dataframe in place: rows with missing values were dropped, the target column
+# was popped, categorical columns were replaced by their codes and scalar columns were normalized. Callers which
+# read those changes back from df should use the returned meta, X and y instead.
+# Files too large to load at once can be read in chunks with read_RAI, which gives the same result.
 def df_to_RAI(df, target_column=None, clear_nans=True, extra_symbols="?", normalize=None,
               max_categorical_threshold=None, text_columns=[]):
-    if clear_nans:
-        df_remove_nans(df, extra_symbols)
-    if max_categorical_threshold:
-        for col in df:
-            if len(df[col].unique()) < max_categorical_threshold:
-                df[col] = pd.Categorical(df[col])
-    if normalize is not None:
-        if normalize == "Scalar":
-            num_d = df.select_dtypes(exclude=['object', 'category'])
-            df[num_d.columns] = StandardScaler().fit_transform(num_d)
-    output_feature = []
-    if target_column:
-        y = df.pop(target_column)
-        categorical = str(y.dtypes) in ["object", "category"]
-        if y.name in text_columns:
-            f = Feature(y.name, "text", y.name)
-            y = y.tolist()
-        elif categorical:
-            fact = y.factorize(sort=True)
-            f = Feature(y.name, "numeric", y.name, categorical=True,
-                    values={i: v for i, v in enumerate(fact[1])})
-            y, _ = y.factorize(sort=True)
-        else:
-            f = Feature(y.name, "numeric", y.name)
-            y = y.tolist()
-        output_feature.append(f)
-    else:
-        y = None
-
-    features = []
-
-    for c in df:
-        if c in text_columns:
-            f = Feature(c, "text", c)
-        elif str(df.dtypes[c]) in ["object", "category"]:
-            fact = df[c].factorize(sort=True)
-            df[c] = fact[0]
-            f = Feature(c, "numeric", c, categorical=True,
-                        values={i: v for i, v in enumerate(fact[1])})
-        elif "float" in str(df.dtypes[c]):
-            f = Feature(c, "numeric", c)
-        features.append(f)
-    return MetaDatabase(features), df.to_numpy(), y, output_feature
+    ingest = _Ingest(target_column, clear_nans, extra_symbols, normalize, max_categorical_threshold, text_columns)
+    ingest.add(df)
+    meta, X, y, output_feature = ingest.finish()
+    if y is not None and not output_feature[0].categorical:
+        y = y.tolist()
+    return meta, X, y, output_feature
 
 
 # Converts a pandas dataframe with numeric data and text, as well as image dictionaries to a Rai Metadatabase and X and y data.
 # TODO: This needs to be formalized for multi modal data
 def modals_to_RAI(df, df_target_column=None, image_X: dict = {}, image_y: dict = {}, clear_nans=True, extra_symbols="?", normalize=None,
               max_categorical_threshold=None, text_columns=[]):
+    import pandas as pd
     if max_categorical_threshold:
         for col in df:
             if len(df[col].unique()) > max_categorical_threshold:
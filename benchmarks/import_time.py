@@ -0,0 +1,121 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Import time benchmark for RAI.
+
+Heavy optional backends are imported by the metric groups and helpers that use them, so importing RAI stays cheap
+for jobs that never run those groups. Each run imports RAI in a fresh interpreter, records the time reported by
+python -X importtime and lists any heavy backends which were loaded.
+
+    python -m benchmarks.import_time --output import_time.json
+    python -m benchmarks.import_time --max-seconds 1.5
+
+Exits with status 1 when a heavy backend is loaded by the import, or the median import time exceeds --max-seconds.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+__all__ = ['heavy_modules', 'measure_import', 'check_import', 'main']
+
+# Backends which should only be loaded once a metric group, analysis or helper using them runs
+heavy_modules = ["torch", "torchvision", "torchmetrics", "aif360", "nltk", "pandas", "matplotlib", "dash", "redis"]
+
+
+def _parse_importtime(stderr):
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def measure_import(module: str = "RAI", repeats: int = 5, top: int = 10) -> dict:
+    """
+    Imports module in a fresh interpreter repeats times.
+
+    :param module: name of the module to import
+    :param repeats: number of fresh interpreters to time
+    :param top: number of slowest imports to report
+
+    :return: dict holding the median import time in seconds, the time of each run, the heavy backends loaded
+             and the slowest imports of the last run
+    """
+    code = "import json, sys; import {}; print(json.dumps(sorted(sys.modules)))".format(module)
+    # The interpreter is given this one's path, so it imports the same RAI
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    runs, loaded, times = [], [], {}
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                                check=True, env=env)
+        times = _parse_importtime(result.stderr)
+        runs.append(times[module])
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    slowest = sorted(((name, seconds) for name, seconds in times.items() if name != module),
+                     key=lambda item: -item[1])[:top]
+    return {"module": module, "seconds": statistics.median(runs), "runs": runs,
+            "heavy_modules": [name for name in heavy_modules if name in loaded],
+            "slowest": [{"name": name, "seconds": seconds} for name, seconds in slowest]}
+
+
+def check_import(result: dict, max_seconds: float = None) -> list:
+    """
+    Returns the problems found in a measure_import result.
+
+    :param result: result of measure_import
+    :param max_seconds: largest allowed median import time, or None to not check it
+
+    :return: list of messages, empty when the import is within budget
+    """
+    problems = ["{} loads {}".format(result["module"], name) for name in result["heavy_modules"]]
+    if max_seconds is not None and result["seconds"] > max_seconds:
+        problems.append("{} takes {:.3f}s to import, more than {:.3f}s".format(result["module"], result["seconds"],
+                                                                             max_seconds))
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the time taken to import RAI.")
+    parser.add_argument("--module", default="RAI")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--output", default=None, help="json file the result is written to")
+    args = parser.parse_args(argv)
+
+    result = measure_import(args.module, args.repeats)
+    print("{}: {:.3f}s median over {} runs".format(result["module"], result["seconds"], len(result["runs"])))
+    for item in result["slowest"]:
+        print("  {:<40} {:.3f}s".format(item["name"], item["seconds"]))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    problems = check_import(result, args.max_seconds)
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+"""
+Ingestion benchmark for df_to_RAI and read_RAI.
+
+Tiles the adult dataset to the requested number of rows, and times its conversion to a MetaDatabase and X and y
+data: with df_to_RAI on a DataFrame held in memory, and with read_RAI reading a CSV file, and a Parquet file when
+pyarrow is installed, in chunks. Files are written to a temporary directory a tile at a time before timing starts.
+
+    python -m benchmarks.ingest --rows 10000000 --output ingest.json
+    python -m benchmarks.ingest --rows 1000000 --chunksize 250000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+__all__ = ['make_adult_data', 'measure_ingest', 'main']
+
+adult_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "adult")
+options = {"target_column": "income-per-year", "normalize": "Scalar", "max_categorical_threshold": 5}
+
+
+def _load_adult():
+    import pandas as pd
+    return pd.concat([pd.read_csv(os.path.join(adult_path, name), header=0, skipinitialspace=True)
+                      for name in ["train.csv", "test.csv"]], ignore_index=True)
+
+
+def make_adult_data(rows: int):
+    """
+    Returns the adult train and test data tiled to the given number of rows
+
+    :param rows: number of rows
+
+    :return: DataFrame
+    """
+    import pandas as pd
+    adult = _load_adult()
+    repeats = -(-rows // len(adult))
+    return pd.concat([adult] * repeats, ignore_index=True).iloc[:rows]
+
+
+# Writes the adult data tiled to rows rows one tile at a time, so the tiled data is never held in memory
+def _write_tiles(rows: int, write):
+    adult = _load_adult()
+    for start in range(0, rows, len(adult)):
+        write(adult.iloc[:rows - start], start == 0)
+
+
+def _time(function, *args, **kwargs) -> dict:
+    start = time.perf_counter()
+    meta, X, y, _ = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "rows": len(X), "rows_per_second": len(X) / seconds, "features": len(meta.features)}
+
+
+def measure_ingest(rows: int = 10000000, chunksize: int = 1000000, directory: str = None,
+                   in_memory: bool = True) -> dict:
+    """
+    Times read_RAI on CSV and Parquet files, and df_to_RAI, on the adult data tiled to rows rows. Files are written
+    a tile at a time, and the DataFrame for df_to_RAI is only built once the files are read.
+
+    :param rows: number of rows
+    :param chunksize: rows read_RAI reads at a time
+    :param directory: directory the CSV and Parquet files are written to, by default a temporary directory
+    :param in_memory: whether df_to_RAI is also timed, which needs the whole DataFrame in memory
+
+    :return: dict holding the row count, chunk size and the timing of each ingestion path
+    """
+    from RAI.utils import df_to_RAI, read_RAI
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as temp:
+        csv_path = os.path.join(temp, "adult.csv")
+        _write_tiles(rows, lambda tile, first: tile.to_csv(csv_path, mode="w" if first else "a", header=first,
+                                                           index=False))
+        results["read_RAI csv"] = _time(read_RAI, csv_path, chunksize=chunksize,
+                                        read_options={"skipinitialspace": True}, **options)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            pyarrow = None
+        if pyarrow is not None:
+            parquet_path = os.path.join(temp, "adult.parquet")
+            writers = []
+
+            def write(tile, first):
+                table = pyarrow.Table.from_pandas(tile, preserve_index=False)
+                if first:
+                    writers.append(pyarrow.parquet.ParquetWriter(parquet_path, table.schema))
+                writers[0].write_table(table)
+            _write_tiles(rows, write)
+            writers[0].close()
+            results["read_RAI parquet"] = _time(read_RAI, parquet_path, chunksize=chunksize, **options)
+    if in_memory:
+        results["df_to_RAI"] = _time(df_to_RAI, make_adult_data(rows), **options)
+    return {"rows": rows, "chunksize": chunksize, "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the time taken to convert the adult data to RAI.")
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--chunksize", type=int, default=1000000)
+    parser.add_argument("--directory", default=None, help="directory for the temporary CSV and Parquet files")
+    parser.add_argument("--skip-in-memory", action="store_true", help="do not time df_to_RAI on a DataFrame")
+    parser.add_argument("--output", default=None, help="json file the result is written to")
+    args = parser.parse_args(argv)
+
+    result = measure_ingest(args.rows, args.chunksize, args.directory, not args.skip_in_memory)
+    for name, item in result["results"].items():
+        print("{:<18} {:10d} rows {:8.3f}s {:12.0f} rows/s".format(name, item["rows"], item["seconds"],
+                                                                  item["rows_per_second"]))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
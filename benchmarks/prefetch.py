@@ -0,0 +1,130 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+"""
+Prefetch benchmark for IteratorData.
+
+Streams a synthetic image dataset through AISystem.run_compute with and without prefetching. Each image is
+decoded when the DataLoader reads it, so with prefetch the next batches are read and converted while the metric
+groups compute the current one. Reports the images computed per second for each prefetch depth and worker count.
+
+    python -m benchmarks.prefetch --images 2048 --batch-size 64 --output prefetch.json
+    python -m benchmarks.prefetch --settings 0:1 2:1 4:2
+"""
+
+import argparse
+import json
+import sys
+import time
+
+__all__ = ['measure_prefetch', 'main']
+
+
+# Each setting is a prefetch depth and a number of prefetch workers, prefetch 0 being the unprefetched baseline
+def _parse_setting(text):
+    prefetch, workers = text.split(":")
+    return int(prefetch), int(workers)
+
+
+# Images are decoded on read, standing in for jpeg decoding and augmentation
+def _image_loader(images, batch_size, size, decode_rounds):
+    import torch
+    from torch.utils.data import DataLoader, Dataset
+
+    class SyntheticImages(Dataset):
+        def __len__(self):
+            return images
+
+        def __getitem__(self, index):
+            generator = torch.Generator().manual_seed(index)
+            image = torch.rand(3, size, size, generator=generator)
+            for _ in range(decode_rounds):
+                image = torch.nn.functional.avg_pool2d(image, 3, stride=1, padding=1)
+            return image, index % 2
+
+    return DataLoader(SyntheticImages(), batch_size=batch_size)
+
+
+def measure_prefetch(images: int = 1024, batch_size: int = 64, size: int = 64, decode_rounds: int = 4,
+                     settings: list = None, repeats: int = 1) -> dict:
+    """
+    Times run_compute over a synthetic image dataset for each prefetch setting.
+
+    :param images: number of images in the dataset
+    :param batch_size: images in each batch
+    :param size: height and width of each image
+    :param decode_rounds: rounds of filtering applied to each image as it is read
+    :param settings: list of (prefetch, prefetch_workers) pairs, by default (0, 1), (2, 1) and (4, 2)
+    :param repeats: runs of each setting, the fastest of which is reported
+
+    :return: dict holding the dataset parameters and the seconds and images per second of each setting
+    """
+    from RAI.AISystem import AISystem, Model
+    from RAI.dataset import Dataset, IteratorData, MetaDatabase, Feature
+
+    settings = settings if settings is not None else [(0, 1), (2, 1), (4, 2)]
+    meta = MetaDatabase([Feature(name="image", dtype="image", description="A synthetic image")])
+    output = Feature(name="class", dtype="numeric", description="The image class", categorical=True,
+                     values={0: "a", 1: "b"})
+    model = Model(agent=None, output_features=output, name="mean_classifier", model_class="Threshold",
+                  predict_fun=lambda x: (x.mean(dim=(1, 2, 3)) > 0.5).long())
+    results = []
+    for prefetch, workers in settings:
+        runs = []
+        for _ in range(repeats):
+            data = IteratorData(_image_loader(images, batch_size, size, decode_rounds), prefetch=prefetch,
+                                prefetch_workers=workers)
+            ai = AISystem("Prefetch_Benchmark", task="classification", meta_database=meta,
+                          dataset=Dataset({"test": data}), model=model, enable_certificates=False)
+            ai.initialize(user_config={"time_complexity": "polynomial"})
+            start = time.perf_counter()
+            ai.run_compute()
+            runs.append(time.perf_counter() - start)
+        seconds = min(runs)
+        results.append({"prefetch": prefetch, "prefetch_workers": workers, "seconds": seconds,
+                        "images_per_second": images / seconds})
+    return {"images": images, "batch_size": batch_size, "size": size, "decode_rounds": decode_rounds,
+            "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure IteratorData throughput with and without prefetching.")
+    parser.add_argument("--images", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--decode-rounds", type=int, default=4)
+    parser.add_argument("--settings", nargs="+", type=_parse_setting, default=None,
+                        help="prefetch:workers pairs, 0:1 being no prefetching")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", default=None, help="json file the result is written to")
+    args = parser.parse_args(argv)
+
+    result = measure_prefetch(args.images, args.batch_size, args.size, args.decode_rounds, args.settings, args.repeats)
+    baseline = result["results"][0]["seconds"]
+    for item in result["results"]:
+        print("prefetch {:<3} workers {:<3} {:8.3f}s {:10.1f} images/s {:6.2f}x".format(
+            item["prefetch"], item["prefetch_workers"], item["seconds"], item["images_per_second"],
+            baseline / item["seconds"]))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
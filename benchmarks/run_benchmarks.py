@@ -0,0 +1,274 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Scaling benchmarks for every registered MetricGroup and Analysis, on synthetic data.
+
+Each configuration of the sweep builds an AISystem on synthetic data, computes all compatible metric groups with
+profiling enabled, then runs every compatible analysis. Wall time, CPU time, peak memory and throughput in rows per
+second are written to a json file, which later runs can be compared against.
+
+    python -m benchmarks.run_benchmarks --rows 1000 100000 --output baseline.json
+    python -m benchmarks.run_benchmarks --rows 1000 100000 --output current.json --compare baseline.json
+    python -m benchmarks.run_benchmarks --compare baseline.json --current current.json
+
+Comparisons report groups whose throughput fell, or whose peak memory grew, by more than --threshold, and exit
+with status 1 when there are any.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import sys
+import tracemalloc
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from RAI.AISystem import AISystem, Model
+from RAI.dataset import NumpyData, Dataset
+from RAI.metrics.metric_registry import get_group_names
+from RAI.metrics.profiler import profile_call
+from benchmarks.synthetic import make_classification_data, make_regression_data
+
+__all__ = ['get_configurations', 'run_configuration', 'run_benchmarks', 'compare_results', 'main']
+
+training_rows = 10000  # Models are fit on at most this many rows, so fitting does not dominate large sweeps
+
+
+def get_configurations(tasks=("classification",), rows=(1000,), scalar_features=(8,), cardinality=(5,),
+                       classes=(2,), protected_groups=(1,), categorical_features: int = 4) -> list:
+    """
+    Returns every combination of the swept values. Regression configurations do not sweep the class count.
+
+    :return: list of configuration dicts
+    """
+    configurations = []
+    for task, n, scalar, card, n_classes, protected in itertools.product(tasks, rows, scalar_features, cardinality,
+                                                                         classes, protected_groups):
+        configuration = {"task": task, "rows": int(n), "scalar_features": scalar, "categorical_features":
+                         categorical_features, "cardinality": card, "protected_groups": protected}
+        if task == "classification":
+            configuration["classes"] = n_classes
+        if configuration not in configurations:
+            configurations.append(configuration)
+    return configurations
+
+
+def _create_ai_system(configuration: dict, time_complexity: str):
+    arguments = {key: value for key, value in configuration.items() if key != "task"}
+    if configuration["task"] == "classification":
+        data = make_classification_data(**arguments)
+        agent = DecisionTreeClassifier(max_depth=4, random_state=0)
+    else:
+        data = make_regression_data(**arguments)
+        agent = DecisionTreeRegressor(max_depth=4, random_state=0)
+    agent.fit(data["X"][:training_rows], data["y"][:training_rows])
+    model = Model(agent=agent, output_features=data["output"], name="benchmark_model", predict_fun=agent.predict,
+                  predict_prob_fun=agent.predict_proba if hasattr(agent, "predict_proba") else None,
+                  model_class="Decision Tree")
+    ai = AISystem("Benchmark", task=data["task"], meta_database=data["meta"],
+                  dataset=Dataset({"test": NumpyData(data["X"], data["y"])}), model=model, enable_certificates=False)
+    user_config = {"time_complexity": time_complexity, "profile": {"memory": True}}
+    if data["fairness"] is not None:
+        user_config["fairness"] = data["fairness"]
+    ai.initialize(user_config=user_config)
+    predictions = {output_type: model.output_types[output_type](data["X"]) for output_type in model.output_types}
+    return ai, predictions
+
+
+def _record(configuration, kind, name, status, timing=None, rows=None, message=None):
+    record = {"configuration": configuration, "kind": kind, "name": name, "status": status}
+    if timing is not None:
+        record.update({"wall_time": timing["wall_time"], "cpu_time": timing["cpu_time"],
+                       "peak_memory": timing["peak_memory"], "rows": rows,
+                       "throughput": rows / timing["wall_time"] if rows and timing["wall_time"] > 0 else None})
+    if message is not None:
+        record["message"] = message
+    return record
+
+
+def run_configuration(configuration: dict, time_complexity: str = "linear", include_analysis: bool = True) -> list:
+    """
+    Benchmarks every registered metric group and analysis on one synthetic configuration
+
+    :param configuration: configuration dict, as returned by get_configurations
+    :param time_complexity: highest complexity class of the metric groups and analyses to run
+    :param include_analysis: whether analyses are benchmarked as well as metric groups
+
+    :return: list of records, one per metric group and analysis
+    """
+    ai, predictions = _create_ai_system(configuration, time_complexity)
+    rows = configuration["rows"]
+    failed = {}
+    try:
+        ai.compute({"test": predictions}, tag="benchmark")
+    except Exception:
+        # Some groups do not support every configuration, for example aif360 groups with more than two classes.
+        # Failing groups are found by computing each group on its own, and the others are then benchmarked together.
+        for name in sorted(get_group_names()):
+            try:
+                ai.compute({"test": predictions}, tag="benchmark", metrics=[name])
+            except Exception as e:
+                failed[name] = repr(e)
+        ai.compute({"test": predictions}, tag="benchmark", metrics=[name for name in get_group_names() if name not in failed])
+    profile = ai.get_profile()["test"]
+
+    records = [_record(configuration, "compute", "total", "ok",
+                       {"wall_time": profile["wall_time"], "cpu_time": None, "peak_memory": None}, rows)]
+    for name in sorted(get_group_names()):
+        if name in failed:
+            records.append(_record(configuration, "metric_group", name, "error", message=failed[name]))
+            continue
+        if name not in profile["groups"]:
+            records.append(_record(configuration, "metric_group", name, "incompatible"))
+            continue
+        timing = {"wall_time": 0.0, "cpu_time": 0.0, "peak_memory": None}
+        for method_record in profile["groups"][name].values():
+            timing["wall_time"] += method_record["wall_time"]
+            timing["cpu_time"] += method_record["cpu_time"]
+            if method_record["peak_memory"] is not None:
+                timing["peak_memory"] = max(timing["peak_memory"] or 0, method_record["peak_memory"])
+        records.append(_record(configuration, "metric_group", name, "ok", timing, rows))
+
+    if include_analysis:
+        # Analyses depend on the dashboard packages, which are imported once a compatible analysis is found
+        from RAI.Analysis import AnalysisManager
+        from RAI.Analysis.analysis_registry import get_analysis_names
+        manager = AnalysisManager()
+        available = manager.get_available_analysis(ai, "test")
+        for name in sorted(get_analysis_names()):
+            if name not in available:
+                records.append(_record(configuration, "analysis", name, "incompatible"))
+                continue
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            try:
+                _, timing = profile_call(manager.run_analysis, ai, "test", name, track_memory=True)
+                records.append(_record(configuration, "analysis", name, "ok", timing, rows))
+            except Exception as e:  # A failing analysis is recorded, so the rest of the sweep still runs
+                records.append(_record(configuration, "analysis", name, "error", message=repr(e)))
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+    return records
+
+
+def run_benchmarks(configurations: list, time_complexity: str = "linear", include_analysis: bool = True) -> dict:
+    """
+    Benchmarks every configuration, returning the results along with a description of the environment
+
+    :param configurations: list of configuration dicts, as returned by get_configurations
+    :param time_complexity: highest complexity class of the metric groups and analyses to run
+    :param include_analysis: whether analyses are benchmarked as well as metric groups
+
+    :return: dict of {"created", "environment", "results"}
+    """
+    results = []
+    for configuration in configurations:
+        print("Benchmarking", json.dumps(configuration, sort_keys=True))
+        results.extend(run_configuration(configuration, time_complexity, include_analysis))
+    return {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                            "machine": platform.machine(), "time_complexity": time_complexity},
+            "results": results}
+
+
+def _key(record):
+    return json.dumps(record["configuration"], sort_keys=True), record["kind"], record["name"]
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.2, min_time: float = 0.01) -> list:
+    """
+    Returns the regressions between two benchmark results: groups which now fail, whose throughput fell by more
+    than threshold, or whose peak memory grew by more than threshold. Groups that took less than min_time seconds
+    in the baseline are not compared on time, as their timings are mostly noise.
+
+    :param baseline: results of run_benchmarks to compare against
+    :param current: results of run_benchmarks to check
+    :param threshold: relative change counted as a regression
+    :param min_time: smallest baseline wall time, in seconds, compared on throughput
+
+    :return: list of regression dicts holding the configuration, kind, name, measure, baseline and current values
+    """
+    baseline_records = {_key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = baseline_records.get(_key(record))
+        if old is None or old["status"] != "ok":
+            continue
+        found = {"configuration": record["configuration"], "kind": record["kind"], "name": record["name"]}
+        if record["status"] != "ok":
+            regressions.append(dict(found, measure="status", baseline=old["status"], current=record["status"]))
+            continue
+        if old.get("throughput") and record.get("throughput") and old["wall_time"] >= min_time \
+                and record["throughput"] < old["throughput"] * (1 - threshold):
+            regressions.append(dict(found, measure="throughput", baseline=old["throughput"],
+                                    current=record["throughput"]))
+        if old.get("peak_memory") and record.get("peak_memory") is not None \
+                and record["peak_memory"] > old["peak_memory"] * (1 + threshold):
+            regressions.append(dict(found, measure="peak_memory", baseline=old["peak_memory"],
+                                    current=record["peak_memory"]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for RAI metric groups and analyses")
+    parser.add_argument("--tasks", nargs="+", default=["classification", "regression"],
+                        choices=["classification", "regression"])
+    parser.add_argument("--rows", nargs="+", type=float, default=[1e3, 1e4, 1e5],
+                        help="row counts to sweep, up to 1e7")
+    parser.add_argument("--scalar-features", nargs="+", type=int, default=[8])
+    parser.add_argument("--categorical-features", type=int, default=4)
+    parser.add_argument("--cardinality", nargs="+", type=int, default=[5])
+    parser.add_argument("--classes", nargs="+", type=int, default=[2])
+    parser.add_argument("--protected-groups", nargs="+", type=int, default=[1])
+    parser.add_argument("--time-complexity", default="linear")
+    parser.add_argument("--skip-analysis", action="store_true", help="only benchmark metric groups")
+    parser.add_argument("--output", help="json file the results are written to")
+    parser.add_argument("--compare", help="baseline json file to compare the results against")
+    parser.add_argument("--current", help="compare this results file instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.current is not None:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        configurations = get_configurations(args.tasks, args.rows, args.scalar_features, args.cardinality,
+                                            args.classes, args.protected_groups, args.categorical_features)
+        current = run_benchmarks(configurations, args.time_complexity, not args.skip_analysis)
+        if args.output is not None:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+
+    if args.compare is None:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print("REGRESSION %s %s %s: %s %s -> %s" % (json.dumps(regression["configuration"], sort_keys=True),
+                                                   regression["kind"], regression["name"], regression["measure"],
+                                                   regression["baseline"], regression["current"]))
+    print("%d regressions found" % len(regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import numpy as np
+from RAI.dataset import Feature, MetaDatabase
+
+__all__ = ['make_classification_data', 'make_regression_data']
+
+
+# Returns the features, MetaDatabase and fairness config for rows of scalar features, categorical features with
+# the given cardinality, and binary protected attributes. Columns are ordered scalar, categorical, protected.
+def _make_features(rng, rows, scalar_features, categorical_features, cardinality, protected_groups):
+    scalar = rng.normal(size=(rows, scalar_features))
+    categorical = rng.integers(0, cardinality, size=(rows, categorical_features))
+    protected = rng.integers(0, 2, size=(rows, protected_groups))
+    X = np.hstack([scalar, categorical, protected]).astype(np.float64)
+
+    features = [Feature("scalar_%d" % i, "numeric", "Synthetic normal feature") for i in range(scalar_features)]
+    features += [Feature("categorical_%d" % i, "numeric", "Synthetic uniform categorical feature", categorical=True,
+                         values={j: "value_%d" % j for j in range(cardinality)}) for i in range(categorical_features)]
+    features += [Feature("protected_%d" % i, "numeric", "Synthetic binary protected attribute", categorical=True,
+                         values={0: "unprivileged", 1: "privileged"}) for i in range(protected_groups)]
+    fairness = None
+    if protected_groups > 0:
+        fairness = {"priv_group": {"protected_%d" % i: {"privileged": 1, "unprivileged": 0}
+                                   for i in range(protected_groups)},
+                    "protected_attributes": ["protected_%d" % i for i in range(protected_groups)],
+                    "positive_label": 1}
+    return X, MetaDatabase(features), fairness
+
+
+def make_classification_data(rows: int = 1000, scalar_features: int = 8, categorical_features: int = 4,
+                             cardinality: int = 5, classes: int = 2, protected_groups: int = 1, seed: int = 0) -> dict:
+    """
+    Generates a synthetic classification dataset, with labels that depend on the scalar and protected features
+
+    :param rows: number of rows
+    :param scalar_features: number of normally distributed scalar features
+    :param categorical_features: number of uniformly distributed categorical features
+    :param cardinality: number of values of each categorical feature
+    :param classes: number of classes
+    :param protected_groups: number of binary protected attributes
+    :param seed: random seed
+
+    :return: dict holding X, y, the MetaDatabase as meta, the output Feature as output and the fairness config
+    """
+    rng = np.random.default_rng(seed)
+    X, meta, fairness = _make_features(rng, rows, scalar_features, categorical_features, cardinality, protected_groups)
+    scores = X[:, :scalar_features] @ rng.normal(size=(scalar_features, classes)) if scalar_features > 0 \
+        else np.zeros((rows, classes))
+    if protected_groups > 0:
+        scores[:, 0] += 0.5 * X[:, -protected_groups:].sum(axis=1)
+    y = np.argmax(scores + rng.gumbel(size=(rows, classes)), axis=1)
+    output = Feature("target", "numeric", "Synthetic class", categorical=True,
+                     values={i: "class_%d" % i for i in range(classes)})
+    return {"X": X, "y": y, "meta": meta, "output": output, "fairness": fairness,
+            "task": "binary_classification" if classes == 2 else "classification"}
+
+
+def make_regression_data(rows: int = 1000, scalar_features: int = 8, categorical_features: int = 4,
+                         cardinality: int = 5, protected_groups: int = 1, seed: int = 0) -> dict:
+    """
+    Generates a synthetic regression dataset, with a positive target depending on the scalar features
+
+    :param rows: number of rows
+    :param scalar_features: number of normally distributed scalar features
+    :param categorical_features: number of uniformly distributed categorical features
+    :param cardinality: number of values of each categorical feature
+    :param protected_groups: number of binary protected attributes
+    :param seed: random seed
+
+    :return: dict holding X, y, the MetaDatabase as meta, the output Feature as output and the fairness config
+    """
+    rng = np.random.default_rng(seed)
+    X, meta, fairness = _make_features(rng, rows, scalar_features, categorical_features, cardinality, protected_groups)
+    # The target is strictly positive, as the gamma and poisson deviances require
+    y = np.abs(X[:, :scalar_features] @ rng.normal(size=scalar_features)) + rng.uniform(1, 2, size=rows)
+    output = Feature("target", "numeric", "Synthetic target")
+    return {"X": X, "y": y, "meta": meta, "output": output, "fairness": fairness, "task": "regression"}
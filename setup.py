@@ -32,7 +32,7 @@ setup(name='rai',
       description="Responsible AI framework.",
       long_description=open('README.md').read(),
       install_requires=[
-          'redis~=4.0.2',
+          'redis>=4.2.0',
           'sklearn~=0.0',
           'numpy~=1.20.3',
           'pandas~=1.3.5',
@@ -0,0 +1,181 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import asyncio
+import json
+import os
+import sys
+import time
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics.performance.performance_cl import PerformanceClassificationMetricGroup
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+predictions = {"train": {"predict": clf.predict(xTrain)}, "test": {"predict": clf.predict(xTest)}}
+
+
+def _create_ai_system(user_config=None):
+    ai = AISystem("AsyncCompute_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"train": NumpyData(xTrain, yTrain), "test": NumpyData(xTest, yTest)}),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config=dict({"time_complexity": "polynomial"}, **(user_config or {})))
+    return ai
+
+
+def _dump(values):
+    values = dict(values)
+    values.pop("metadata")
+    values.pop("tree_model_metadata")  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+async def _collect(stream):
+    return [item async for item in stream]
+
+
+class _Publisher:
+    def __init__(self):
+        self.groups = []
+        self.measurements = 0
+
+    async def publish_group(self, dataset, group, values):
+        self.groups.append((dataset, group))
+
+    async def add_measurement(self, include_profile=False):
+        self.measurements += 1
+
+
+sync_ai = _create_ai_system()
+sync_ai.compute(predictions)
+sync_values = sync_ai.get_metric_values()
+
+
+def _slow_compute(monkeypatch):
+    compute = PerformanceClassificationMetricGroup.compute
+
+    def slow_compute(self, data_dict):
+        time.sleep(1.5)
+        compute(self, data_dict)
+
+    monkeypatch.setattr(PerformanceClassificationMetricGroup, "compute", slow_compute)
+
+
+def test_compute_async_matches_compute():
+    """Tests that an async compute stores the same values as a compute, with splits serial or concurrent."""
+    for split_workers in [1, 2]:
+        ai = _create_ai_system({"scheduler": {"split_workers": split_workers}})
+        asyncio.run(ai.compute_async(predictions))
+        values = ai.get_metric_values()
+        assert list(values) == list(sync_values)
+        for split in sync_values:
+            assert _dump(values[split]) == _dump(sync_values[split])
+
+
+def test_stream_yields_every_group():
+    """Tests that each metric group of each split is streamed once, with its final values."""
+    ai = _create_ai_system()
+    items = asyncio.run(_collect(ai.stream_compute(predictions)))
+    values = ai.get_metric_values()
+    assert sorted((split, group) for split, group, _ in items) == \
+        sorted((split, group) for split in values for group in values[split])
+    for split, group, group_values in items:
+        assert group_values == values[split][group]
+
+
+def test_stream_from_cache():
+    """Tests that groups of cached results, which are not computed, are streamed once the compute finishes."""
+    ai = _create_ai_system({"cache": {"max_entries": 4}})
+    ai.compute(predictions)
+    items = asyncio.run(_collect(ai.stream_compute(predictions)))
+    assert len(items) == sum(len(ai.get_metric_values()[split]) for split in predictions)
+
+
+def test_timeout_cancels_compute(monkeypatch):
+    """Tests that a timeout raises without waiting for the compute, and stops it before its next group."""
+    _slow_compute(monkeypatch)
+    ai = _create_ai_system()
+
+    async def compute():
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await ai.compute_async(predictions, timeout=0.3)
+        return time.perf_counter() - start
+
+    assert asyncio.run(compute()) < 1.5
+    with ai._async_lock:  # Waits for the cancelled compute to stop
+        assert ai.get_metric_values() == {}
+    ai.compute(predictions, metrics=["metadata"])  # The cancel event no longer applies
+    assert set(ai.get_metric_values()) == set(predictions)
+
+
+def test_cancel_stream(monkeypatch):
+    """Tests that stopping a stream cancels its compute, and that a cancelled task raises CancelledError."""
+    _slow_compute(monkeypatch)
+    ai = _create_ai_system()
+
+    async def first_group():
+        stream = ai.stream_compute(predictions, metrics=["metadata", "performance_cl"])
+        item = await stream.__anext__()
+        await stream.aclose()
+        return item
+
+    assert asyncio.run(first_group())[1] == "metadata"
+    with ai._async_lock:
+        assert "test" not in ai.get_metric_values()
+
+    async def cancel():
+        task = asyncio.ensure_future(ai.compute_async(predictions))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel())
+
+
+def test_publisher():
+    """Tests that each group and the final measurement are passed to the publisher."""
+    ai = _create_ai_system()
+    publisher = _Publisher()
+    asyncio.run(ai.compute_async(predictions, metrics=["metadata", "performance_cl"], publisher=publisher))
+    assert sorted(publisher.groups) == sorted((split, group) for split in predictions
+                                              for group in ["metadata", "performance_cl"])
+    assert publisher.measurements == 1
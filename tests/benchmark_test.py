@@ -0,0 +1,54 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import copy
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.run_benchmarks import get_configurations, run_benchmarks, compare_results
+
+configurations = get_configurations(tasks=("classification", "regression"), rows=(500,), scalar_features=(3,),
+                                    cardinality=(4,), protected_groups=(1,))
+results = run_benchmarks(configurations, include_analysis=False)
+
+
+def test_records_cover_registry():
+    """Tests that each configuration records a total and one record per registered metric group."""
+    from RAI.metrics.metric_registry import get_group_names
+    for configuration in configurations:
+        records = [record for record in results["results"] if record["configuration"] == configuration]
+        assert [record["name"] for record in records if record["kind"] == "compute"] == ["total"]
+        assert {record["name"] for record in records if record["kind"] == "metric_group"} == set(get_group_names())
+        assert all(record["status"] != "error" for record in records)
+
+
+def test_compare_results():
+    """Tests that comparing results flags slower, larger and failing groups, and nothing when results match."""
+    assert compare_results(results, results) == []
+    current = copy.deepcopy(results)
+    slow = next(record for record in current["results"] if record["status"] == "ok" and record["throughput"])
+    slow["wall_time"] = slow["wall_time"] * 10 + 1
+    slow["throughput"] = slow["throughput"] / 100
+    failing = next(record for record in current["results"] if record["status"] == "ok" and record is not slow)
+    failing["status"] = "error"
+    baseline = copy.deepcopy(results)
+    for record in baseline["results"]:
+        record["wall_time"] = max(record.get("wall_time") or 0, 1)
+    measures = {(regression["name"], regression["measure"]) for regression in compare_results(baseline, current)}
+    assert (slow["name"], "throughput") in measures
+    assert (failing["name"], "status") in measures
@@ -0,0 +1,65 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import pickle
+import threading
+import numpy as np
+from RAI.dataset import NumpyData
+from RAI.metrics.compute_context import ComputeContext, get_intermediate, get_scalar_moments
+
+
+def test_value_is_built_once():
+    """Tests that an intermediate is only built once, even when requested from several threads."""
+    context = ComputeContext()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return len(calls)
+
+    threads = [threading.Thread(target=context.get, args=("value", build)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert context.get("value", build) == 1
+    assert len(calls) == 1
+
+
+def test_without_context():
+    """Tests that intermediates are built directly when the data_dict has no context."""
+    assert get_intermediate({}, "value", lambda x: x + 1, 1) == 2
+
+
+def test_scalar_moments():
+    """Tests that the shared scalar moments match numpy."""
+    data = NumpyData(np.random.rand(50, 3), np.zeros(50))
+    data.initialize({"scalar": [True, True, True]})
+    moments = get_scalar_moments({"data": data, "context": ComputeContext()})
+    assert np.allclose(moments["mean"], np.mean(data.scalar, axis=0))
+    assert np.allclose(moments["std"], np.std(data.scalar, axis=0))
+    assert np.allclose(moments["min"], np.min(data.scalar, axis=0))
+    assert np.allclose(moments["max"], np.max(data.scalar, axis=0))
+
+
+def test_pickle():
+    """Tests that a context can be sent to worker processes."""
+    context = ComputeContext()
+    context.get("value", lambda: 5)
+    copy = pickle.loads(pickle.dumps(context))
+    assert "value" in copy
+    assert copy.get("value", lambda: 6) == 5
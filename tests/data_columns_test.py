@@ -0,0 +1,88 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import sys
+from RAI.dataset import NumpyData, IteratorData
+import numpy as np
+import torch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(1000, 6))
+X[:, 4:] = rng.integers(0, 3, size=(1000, 2))
+masks = {"scalar": np.array([True, True, True, True, False, False]),
+         "categorical": np.array([False, False, False, False, True, True]),
+         "image": np.zeros(6, dtype=bool), "text": np.zeros(6, dtype=bool)}
+split_masks = {"scalar": np.array([True, False, True, True, False, True]),
+               "categorical": np.array([False, True, False, False, True, False])}
+
+
+def test_consecutive_columns_are_views():
+    """Tests that consecutive float64 columns are views of X, rather than copies."""
+    data = NumpyData(X)
+    data.initialize(masks)
+    assert np.shares_memory(data.scalar, X) and np.shares_memory(data.categorical, X)
+    assert data.scalar.dtype == np.float64
+    assert np.array_equal(data.scalar, X[:, masks["scalar"]])
+    assert np.array_equal(data.categorical, X[:, masks["categorical"]])
+    assert data.image is None and data.text is None
+
+
+def test_split_columns_are_copied():
+    """Tests that columns which are not consecutive, or not float64 scalars, are copied with their values kept."""
+    data = NumpyData(X)
+    data.initialize(split_masks)
+    assert not np.shares_memory(data.scalar, X)
+    assert np.array_equal(data.scalar, X[:, split_masks["scalar"]])
+    assert np.array_equal(data.categorical, X[:, split_masks["categorical"]])
+
+    int_data = NumpyData(X.astype(np.int32))
+    int_data.initialize(masks)
+    assert int_data.scalar.dtype == np.float64 and int_data.categorical.dtype == np.int32
+    assert np.array_equal(int_data.scalar, X.astype(np.int32)[:, :4].astype(np.float64))
+
+    object_data = NumpyData(X.astype(object))
+    object_data.initialize(split_masks)
+    assert object_data.scalar.dtype == np.float64 and object_data.categorical.dtype == object
+    assert np.array_equal(object_data.scalar, X[:, split_masks["scalar"]])
+
+
+def test_text_columns():
+    """Tests that text data holds the text columns."""
+    text = np.array([["a", "1.5", "b"], ["c", "2.5", "d"]], dtype=object)
+    data = NumpyData(text)
+    data.initialize({"scalar": np.array([False, True, False]), "text": np.array([True, False, True])})
+    assert data.text.tolist() == [["a", "b"], ["c", "d"]]
+    assert data.scalar.tolist() == [[1.5], [2.5]]
+
+
+def test_iterator_batches():
+    """Tests that iterator batches hold float64 images, with the values of the batch tensors."""
+    images = rng.normal(size=(100, 3, 4, 4)).astype(np.float32)
+    batches = [(torch.tensor(images[i:i + 25]), torch.zeros(25)) for i in range(0, 100, 25)]
+    data = IteratorData(batches)
+    data.initialize({"image": [True]})
+    data.reset()
+    rows = 0
+    while data.next_batch():
+        assert data.image.dtype == np.float64 and data.image.shape == (25, 1, 3, 4, 4)
+        assert np.array_equal(data.image[:, 0], images[rows:rows + 25])
+        assert data.scalar is None
+        rows += 25
+    assert rows == 100
@@ -0,0 +1,121 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from RAI.dataset import NumpyData, FileData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+batch_groups = ["stat_moment_group", "frequency_stats", "dataset_fairness", "performance_cl"]
+
+
+def _compute(data):
+    ai = AISystem("FileData_Test", task="binary_classification", meta_database=meta, dataset=Dataset({"test": data}),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    ai.compute(predictions)
+    return ai.get_metric_values()["test"]
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, float):
+        assert np.isclose(expected, actual, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+full_values = _compute(NumpyData(xTest, yTest))
+
+
+def test_npy_batches(tmp_path):
+    """Tests that memory mapped .npy files are read batch by batch, as views of the mapped file."""
+    np.save(tmp_path / "x.npy", xTest)
+    np.save(tmp_path / "y.npy", yTest)
+    data = FileData(str(tmp_path / "x.npy"), str(tmp_path / "y.npy"), batch_size=4000)
+    data.initialize({"scalar": meta.scalar_mask, "categorical": meta.categorical_mask})
+    data.reset()
+    sizes = []
+    while data.next_batch():
+        assert isinstance(data.X, np.memmap)
+        assert np.array_equal(data.categorical, data.X[:, meta.categorical_mask])
+        sizes.append(len(data.y))
+    assert sizes == [4000, 4000, len(xTest) - 8000]
+    assert len(data) == len(xTest)
+
+
+def test_npy_compute(tmp_path):
+    """Tests that a split read from .npy files gets the values of the same split held in memory."""
+    np.save(tmp_path / "x.npy", xTest)
+    np.save(tmp_path / "y.npy", yTest)
+    values = _compute(FileData(str(tmp_path / "x.npy"), str(tmp_path / "y.npy"), batch_size=4000))
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
+    _assert_close(full_values["summary_stats"]["mean"], values["summary_stats"]["mean"])
+    assert values["metadata"]["sample_count"] == len(xTest)
+    prefetched = _compute(FileData(str(tmp_path / "x.npy"), str(tmp_path / "y.npy"), batch_size=4000, prefetch=2))
+    for group in batch_groups:
+        _assert_close(values[group], prefetched[group])
+
+
+def test_parquet_compute(tmp_path):
+    """Tests that Parquet files with y as a column are read across row groups, and give the in memory values."""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    columns = {f.name: xTest[:, i] for i, f in enumerate(meta.features)}
+    columns["label"] = yTest
+    pyarrow.parquet.write_table(pyarrow.table(columns), str(tmp_path / "test.parquet"), row_group_size=3000)
+    values = _compute(FileData(str(tmp_path / "test.parquet"), y_column="label", batch_size=4000))
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
@@ -0,0 +1,39 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.import_time import measure_import, check_import
+
+
+def test_import_does_not_load_heavy_backends():
+    """Tests that importing RAI does not load torch, aif360, nltk, pandas or the other heavy backends."""
+    result = measure_import("RAI", repeats=1)
+    assert result["heavy_modules"] == []
+    assert check_import(result) == []
+
+
+def test_lazy_backends_load_on_use():
+    """Tests that the groups using lazily imported backends still compute."""
+    from RAI.metrics.performance.text_generation import _bleu
+    from RAI.metrics.performance.image_generation_inception import _convert_float_to_uint8
+    text = ["the cat sat on the mat", "a quick brown fox"]
+    assert np.isclose(_bleu(text, text), 1.0)
+    assert _convert_float_to_uint8(np.ones((1, 3, 2, 2))).dtype == np.uint8
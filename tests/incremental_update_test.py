@@ -0,0 +1,178 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import sys
+from unittest import mock
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics import MetricManager
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+clf.fit(xTrain, yTrain)
+
+# Groups whose values after an update must equal a full compute. summary_stats is checked separately,
+# since its quantiles are only exact while few distinct values have been seen.
+exact_groups = ["performance_cl", "stat_moment_group", "frequency_stats", "dataset_fairness"]
+
+
+def _create_ai_system(x, y_values, meta_database=meta, task="binary_classification", ai_model=model):
+    dataset = Dataset({"test": NumpyData(x, y_values)})
+    ai = AISystem("Update_Test", task=task, meta_database=meta_database, dataset=dataset, model=ai_model,
+                  enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    return ai
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, float):
+        assert np.isclose(expected, actual, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+full_ai = _create_ai_system(xTest, yTest)
+full_ai.compute({"test": {"predict": clf.predict(xTest)}})
+full_values = full_ai.get_metric_values()["test"]
+splits = [0, 4000, 8000, len(xTest)]
+
+
+def _update_in_chunks():
+    ai = _create_ai_system(xTest[:splits[1]], yTest[:splits[1]])
+    ai.compute({"test": {"predict": clf.predict(xTest[:splits[1]])}})
+    for start, end in zip(splits[1:-1], splits[2:]):
+        ai.update({"test": NumpyData(xTest[start:end], yTest[start:end])},
+                  {"test": {"predict": clf.predict(xTest[start:end])}})
+    return ai.get_metric_values()["test"]
+
+
+updated_values = _update_in_chunks()
+
+
+def test_updates_match_full_compute():
+    """Tests that updating a compute with new rows gives the same values as computing on all rows at once."""
+    for group in exact_groups:
+        _assert_close(full_values[group], updated_values[group])
+    assert updated_values["metadata"]["sample_count"] == len(xTest)
+
+
+def test_summary_stats_update():
+    """Tests that moment based summary stats are exact after updates, and sketched quantiles are close."""
+    for metric in full_values["summary_stats"]:
+        if metric in ["median", "quantile_1", "quantile_3", "iqr"]:
+            for feature, value in full_values["summary_stats"][metric].items():
+                if value is not None:
+                    assert np.isclose(value, updated_values["summary_stats"][metric][feature], atol=1e-2)
+        else:
+            _assert_close(full_values["summary_stats"][metric], updated_values["summary_stats"][metric])
+
+
+def test_fairness_counts_update():
+    """Tests that count based fairness metrics are maintained by updates, and the others are unset."""
+    for group in ["prediction_fairness", "group_fairness"]:
+        for metric, value in full_values[group].items():
+            if updated_values[group][metric] is not None:
+                _assert_close(value, updated_values[group][metric])
+    assert updated_values["prediction_fairness"]["consistency"] is None
+    assert updated_values["prediction_fairness"]["true_positive_rate"] is not None
+    assert updated_values["group_fairness"]["disparate_impact_ratio"] is not None
+
+
+def test_update_without_compute():
+    """Tests that an update on a split without an earlier compute covers only the updated rows."""
+    ai = _create_ai_system(xTest, yTest)
+    ai.update({"test": NumpyData(xTest, yTest)}, {"test": {"predict": clf.predict(xTest)}})
+    for group in exact_groups:
+        _assert_close(full_values[group], ai.get_metric_values()["test"][group])
+
+
+def test_regression_update():
+    """Tests that regression performance metrics are maintained by updates."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(1, 10, size=(3000, 3)), columns=["a", "b", "c"])
+    df["target"] = df["a"] * 2 + df["b"] + rng.uniform(0, 1, 3000)
+    reg_meta, reg_X, reg_y, reg_output = df_to_RAI(df, target_column="target")
+    reg = LinearRegression().fit(reg_X, reg_y)
+    reg_model = Model(agent=reg, output_features=reg_output, name="test_regressor", predict_fun=reg.predict,
+                      model_class="Linear Regression")
+
+    full = _create_ai_system(reg_X, reg_y, reg_meta, "regression", reg_model)
+    full.compute({"test": {"predict": reg.predict(reg_X)}})
+    ai = _create_ai_system(reg_X[:1000], reg_y[:1000], reg_meta, "regression", reg_model)
+    ai.compute({"test": {"predict": reg.predict(reg_X[:1000])}})
+    ai.update({"test": NumpyData(reg_X[1000:], reg_y[1000:])})
+    _assert_close(full.get_metric_values()["test"]["performance_reg"], ai.get_metric_values()["test"]["performance_reg"])
+
+
+def test_update_keeps_metric_selection():
+    """Tests that an update reuses the plan of the last compute, updating only the metrics it selected."""
+    ai = _create_ai_system(xTest[:splits[1]], yTest[:splits[1]])
+    ai.compute({"test": {"predict": clf.predict(xTest[:splits[1]])}}, metrics=["performance_cl"])
+    with mock.patch.object(MetricManager, "_compile_plan", autospec=True,
+                           side_effect=MetricManager._compile_plan) as compile_plan:
+        ai.update({"test": NumpyData(xTest[splits[1]:], yTest[splits[1]:])},
+                  {"test": {"predict": clf.predict(xTest[splits[1]:])}})
+        assert not compile_plan.called
+    assert set(ai.get_metric_values()["test"]) == {"performance_cl"}
+    _assert_close(full_values["performance_cl"], ai.get_metric_values()["test"]["performance_cl"])
+
+
+def test_update_with_tensor_outputs():
+    """Tests that outputs generated by a model returning tensors are converted to numpy before updating."""
+    tensor_model = Model(agent=clf, output_features=output, name="test_classifier",
+                         predict_fun=lambda x: torch.as_tensor(clf.predict(x)), model_class="Random Forest Classifier")
+    ai = _create_ai_system(xTest[:splits[1]], yTest[:splits[1]], ai_model=tensor_model)
+    ai.compute({"test": {"predict": clf.predict(xTest[:splits[1]])}})
+    with mock.patch.object(MetricManager, "update", autospec=True, side_effect=MetricManager.update) as update:
+        ai.update({"test": NumpyData(xTest[splits[1]:], yTest[splits[1]:])})
+        assert isinstance(update.call_args.args[1]["predict"], np.ndarray)
+    _assert_close(full_values["performance_cl"], ai.get_metric_values()["test"]["performance_cl"])
@@ -0,0 +1,98 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from RAI.utils import df_to_RAI, read_RAI
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.ingest import measure_ingest
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0, skipinitialspace=True)
+test_data = pd.read_csv(data_path + "test.csv", header=0, skipinitialspace=True)
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+options = {"target_column": "income-per-year", "normalize": "Scalar", "max_categorical_threshold": 5}
+meta, X, y, output = df_to_RAI(all_data.copy(), **options)
+
+
+def _assert_same(expected, actual):
+    assert np.allclose(expected[1], actual[1])
+    assert np.array_equal(expected[2], actual[2])
+    assert [vars(f) for f in expected[0].features] == [vars(f) for f in actual[0].features]
+    assert [vars(f) for f in expected[3]] == [vars(f) for f in actual[3]]
+
+
+def test_df_to_RAI():
+    """Tests that df_to_RAI drops rows with missing values, factorizes in sorted order and leaves the df unchanged."""
+    df = all_data.copy()
+    df_to_RAI(df, **options)
+    assert df.equals(all_data)
+    expected_rows = (~all_data.isin(["?"]).any(axis=1) & ~all_data.isna().any(axis=1)).sum()
+    assert X.shape == (expected_rows, all_data.shape[1] - 1) and X.dtype == np.float64
+    workclass = meta.features[1]
+    assert workclass.categorical and "?" not in workclass.values.values()
+    assert list(workclass.values.values()) == sorted(workclass.values.values())
+    assert output[0].values == {0: "<=50K", 1: ">50K"}
+    assert np.isclose(X[:, 0].mean(), 0) and np.isclose(X[:, 0].std(), 1)
+
+
+def test_integer_columns():
+    """Tests that integer columns are numeric features, and integer categories keep their type."""
+    df = pd.DataFrame({"a": [1, 2, 3, 4, 5, 6], "b": [0, 1, 0, 1, 0, 1], "c": ["x", "y", "x", "?", "y", "x"],
+                       "label": [3, 1, 2, 3, 1, 2]})
+    int_meta, int_X, int_y, int_output = df_to_RAI(df, target_column="label", max_categorical_threshold=3)
+    assert [(f.name, f.categorical) for f in int_meta.features] == [("a", False), ("b", True), ("c", True)]
+    assert int_meta.features[1].values == {0: 0, 1: 1}
+    assert int_y == [3, 1, 2, 1, 2] and not int_output[0].categorical
+    assert np.array_equal(int_X[:, 0], [1, 2, 3, 5, 6])
+
+
+def test_read_csv_chunks(tmp_path):
+    """Tests that reading a CSV file in chunks gives the result of df_to_RAI on the whole file."""
+    all_data.to_csv(tmp_path / "adult.csv", index=False)
+    result = read_RAI(str(tmp_path / "adult.csv"), chunksize=7000, **options)
+    _assert_same((meta, X, y, output), result)
+
+
+def test_chunk_categories():
+    """Tests that categories are numbered across chunks, leaving out those seen only in dropped rows."""
+    chunks = [pd.DataFrame({"c": ["b", "a", "?", "z"], "v": [1.0, 2.0, 3.0, np.nan]}),
+              pd.DataFrame({"c": ["c", "b", "a", "a"], "v": [4.0, 5.0, 6.0, 7.0]})]
+    chunk_meta, chunk_X, _, _ = read_RAI(iter(chunks))
+    whole = df_to_RAI(pd.concat(chunks, ignore_index=True))
+    assert chunk_meta.features[0].values == {0: "a", 1: "b", 2: "c"}
+    assert np.array_equal(chunk_X, whole[1])
+    assert np.array_equal(chunk_X[:, 0], [1, 0, 2, 1, 0, 0])
+
+
+def test_read_parquet(tmp_path):
+    """Tests that reading a Parquet file in batches gives the result of df_to_RAI."""
+    pytest.importorskip("pyarrow")
+    all_data.to_parquet(tmp_path / "adult.parquet", row_group_size=10000)
+    result = read_RAI(str(tmp_path / "adult.parquet"), chunksize=9000, **options)
+    _assert_same((meta, X, y, output), result)
+
+
+def test_ingest_benchmark(tmp_path):
+    """Tests that the ingestion benchmark times each ingestion path."""
+    result = measure_ingest(rows=5000, chunksize=2000, directory=str(tmp_path))
+    assert result["results"]["df_to_RAI"]["rows"] == result["results"]["read_RAI csv"]["rows"]
+    assert all(item["rows_per_second"] > 0 for item in result["results"].values())
@@ -0,0 +1,157 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import json
+import pickle
+import os
+import sys
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+from RAI.metrics.metric_manager import max_plans
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"time_complexity": "polynomial"}
+
+dataset = Dataset({"train": NumpyData(xTrain, yTrain), "test": NumpyData(xTest, yTest)})
+ai = AISystem("MetricManager_Test", task="binary_classification", meta_database=meta, dataset=dataset, model=model,
+              enable_certificates=False)
+ai.initialize(user_config=configuration)
+
+clf.fit(xTrain, yTrain)
+predictions = clf.predict(xTest)
+
+
+def test_plan_is_reused():
+    """Tests that repeated computes with the same configuration reuse the compiled metric groups."""
+    ai.compute({"test": {"predict": predictions}}, tag="first")
+    first_groups = ai.metric_manager.metric_groups
+    first_values = ai.get_metric_values()["test"]
+    ai.compute({"test": {"predict": predictions}}, tag="second")
+    assert ai.metric_manager.metric_groups is first_groups
+    assert ai.get_metric_values()["test"]["performance_cl"] == first_values["performance_cl"]
+    assert ai.get_metric_values()["test"]["metadata"]["tag"] == "second"
+
+
+def test_plan_depends_on_outputs():
+    """Tests that a different set of model outputs compiles a different plan."""
+    ai.compute({"test": {"predict": predictions}})
+    predict_groups = ai.metric_manager.metric_groups
+    ai.compute({"test": {"predict": predictions, "predict_proba": clf.predict_proba(xTest)}})
+    assert ai.metric_manager.metric_groups is not predict_groups
+    assert "performance_cl_probas" in ai.metric_manager.metric_groups
+    assert "performance_cl_probas" not in predict_groups
+
+
+def test_plan_cache_is_bounded():
+    """Tests that the plan cache keeps only the most recently used plans."""
+    ai.metric_manager.clear_plan_cache()
+    ai.compute({"test": {"predict": predictions}}, metrics=["metadata"])
+    metadata_groups = ai.metric_manager.metric_groups
+    for metric in ["mean", "median", "min", "max", "skew", "kurtosis", "mode", "sem", "iqr"]:
+        ai.compute({"test": {"predict": predictions}}, metrics=["summary_stats > " + metric])
+        assert len(ai.metric_manager._plans) <= max_plans
+    ai.compute({"test": {"predict": predictions}}, metrics=["summary_stats > iqr"])
+    iqr_groups = ai.metric_manager.metric_groups
+    ai.compute({"test": {"predict": predictions}}, metrics=["metadata"])
+    assert ai.metric_manager.metric_groups is not metadata_groups
+    ai.compute({"test": {"predict": predictions}}, metrics=["summary_stats > iqr"])
+    assert ai.metric_manager.metric_groups is iqr_groups
+
+
+def test_clear_plan_cache():
+    """Tests that clearing the plan cache rebuilds the metric groups."""
+    ai.compute({"test": {"predict": predictions}})
+    groups = ai.metric_manager.metric_groups
+    ai.metric_manager.clear_plan_cache()
+    ai.compute({"test": {"predict": predictions}})
+    assert ai.metric_manager.metric_groups is not groups
+    assert set(ai.metric_manager.metric_groups) == set(groups)
+
+
+def _compute_with_scheduler(scheduler):
+    ai.metric_manager.user_config["scheduler"] = scheduler
+    try:
+        ai.compute({"test": {"predict": predictions}}, tag="scheduler")
+    finally:
+        ai.metric_manager.user_config.pop("scheduler")
+    values = dict(ai.get_metric_values()["test"])
+    values.pop("metadata")
+    values.pop("tree_model_metadata")  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+def test_thread_scheduler_matches_serial():
+    """Tests that running metric groups in a thread pool gives the same values as running them serially."""
+    serial = _compute_with_scheduler({"workers": 1})
+    threaded = _compute_with_scheduler({"workers": 4, "executor": "thread"})
+    assert threaded == serial
+
+
+def test_process_scheduler_matches_serial():
+    """Tests that running metric groups in a process pool gives the same values as running them serially."""
+    serial = _compute_with_scheduler({"workers": 1})
+    processes = _compute_with_scheduler({"workers": 2, "executor": "process", "process_min_seconds": 0})
+    assert processes == serial
+
+
+def test_process_scheduler_spawn_with_cache():
+    """Tests that worker processes can be spawned for an AISystem with a result cache, and give the serial values."""
+    serial = _compute_with_scheduler({"workers": 1})
+    cached_ai = AISystem("MetricManager_Test", task="binary_classification", meta_database=meta, dataset=dataset,
+                         model=model, enable_certificates=False)
+    cached_ai.initialize(user_config=dict(configuration, cache={"max_entries": 2}, scheduler={
+        "workers": 2, "executor": "process", "process_min_seconds": 0, "start_method": "spawn"}))
+    with mock.patch("RAI.metrics.metric_manager.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as process_pool:
+        cached_ai.compute({"test": {"predict": predictions}}, tag="scheduler")
+        assert process_pool.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+    values = dict(cached_ai.get_metric_values()["test"])
+    values.pop("metadata")
+    values.pop("tree_model_metadata")
+    assert json.dumps(values, sort_keys=True) == serial
+    assert pickle.loads(pickle.dumps(cached_ai))._result_cache is None
+
+
+def test_process_scheduler_keeps_small_groups_in_threads():
+    """Tests that groups estimated below process_min_seconds run in threads, without starting worker processes."""
+    serial = _compute_with_scheduler({"workers": 1})
+    with mock.patch("RAI.metrics.metric_manager.ProcessPoolExecutor") as process_pool:
+        processes = _compute_with_scheduler({"workers": 2, "executor": "process", "process_min_seconds": 1e6})
+        assert not process_pool.called
+    assert processes == serial
@@ -0,0 +1,102 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import sys
+from unittest import mock
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+import scipy.stats
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+
+
+def _create_ai_system(user_config):
+    ai = AISystem("MetricSelection_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model, enable_certificates=False)
+    ai.initialize(user_config=user_config)
+    return ai
+
+
+full_ai = _create_ai_system(configuration)
+full_ai.compute(predictions)
+full_values = full_ai.get_metric_values()["test"]
+
+
+def test_compute_requested_metrics():
+    """Tests that compute with metrics returns only the requested groups and metrics, with unchanged values."""
+    ai = _create_ai_system(configuration)
+    ai.compute(predictions, metrics=["metadata", "summary_stats > mean", "summary_stats > median"])
+    values = ai.get_metric_values()["test"]
+    assert set(values) == {"metadata", "summary_stats"}
+    assert set(values["summary_stats"]) == {"mean", "median"}
+    assert values["summary_stats"]["mean"] == full_values["summary_stats"]["mean"]
+    assert values["summary_stats"]["median"] == full_values["summary_stats"]["median"]
+    assert set(values["metadata"]) == set(full_values["metadata"])
+    assert set(ai.get_metric_info()["summary_stats"]) == {"meta", "mean", "median"}
+
+
+def test_unrequested_metrics_are_skipped():
+    """Tests that groups skip the scipy routines of metrics which were not requested."""
+    ai = _create_ai_system(configuration)
+    with mock.patch("scipy.stats.bayes_mvs", wraps=scipy.stats.bayes_mvs) as bayes_mvs, \
+            mock.patch("scipy.stats.mvsdist", wraps=scipy.stats.mvsdist) as mvsdist:
+        ai.compute(predictions, metrics=["summary_stats > mean"])
+        assert not bayes_mvs.called and not mvsdist.called
+        ai.compute(predictions, metrics=["summary_stats > bayes_mean"])
+        assert bayes_mvs.called and not mvsdist.called
+    assert ai.get_metric_values()["test"]["summary_stats"]["bayes_mean"] == full_values["summary_stats"]["bayes_mean"]
+
+
+def test_metric_whitelist_and_blacklist():
+    """Tests that whitelists and blacklists accept single metrics, named as "group > metric"."""
+    user_config = dict(configuration, whitelist=["metadata", "prediction_fairness", "stat_moment_group > moment_2"],
+                       blacklist=["prediction_fairness > consistency"])
+    ai = _create_ai_system(user_config)
+    ai.compute(predictions)
+    values = ai.get_metric_values()["test"]
+    assert set(values) == {"metadata", "prediction_fairness", "stat_moment_group"}
+    assert set(values["stat_moment_group"]) == {"moment_2"}
+    assert "consistency" not in values["prediction_fairness"]
+    assert values["prediction_fairness"]["true_positive_rate"] == full_values["prediction_fairness"]["true_positive_rate"]
@@ -0,0 +1,136 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import json
+import os
+import sys
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics.metric_registry import get_data_only_groups
+from RAI.metrics.stats.summary_stats import StatMetricGroup
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+
+models = {}
+predictions = {}
+for name, agent in [("forest", RandomForestClassifier(n_estimators=10, random_state=0, max_depth=2)),
+                    ("boost", AdaBoostClassifier(n_estimators=10, random_state=0))]:
+    agent.fit(xTrain, yTrain)
+    models[name] = Model(agent=agent, output_features=output, name=name, predict_fun=agent.predict,
+                         predict_prob_fun=agent.predict_proba, model_class=type(agent).__name__)
+    predictions[name] = {"train": {"predict": agent.predict(xTrain)}, "test": {"predict": agent.predict(xTest)}}
+
+
+def _create_ai_system(model, scheduler=None):
+    ai = AISystem("MultiModel_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"train": NumpyData(xTrain, yTrain), "test": NumpyData(xTest, yTest)}),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config=dict(configuration, scheduler=scheduler or {}))
+    return ai
+
+
+def _dump(values):
+    values = dict(values)
+    values.pop("metadata")
+    values.pop("tree_model_metadata", None)  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+separate_values = {}
+for name in models:
+    separate_ai = _create_ai_system(models[name])
+    separate_ai.compute(predictions[name], tag=name)
+    separate_values[name] = separate_ai.get_metric_values()
+
+
+def test_data_only_groups():
+    """Tests that groups reading only the data are shared, and groups reading predictions or the model are not."""
+    data_only = get_data_only_groups()
+    for group in ["summary_stats", "stat_moment_group", "frequency_stats", "dataset_fairness", "basic_robustness"]:
+        assert group in data_only
+    for group in ["metadata", "tree_model_metadata", "performance_cl", "prediction_fairness", "group_fairness"]:
+        assert group not in data_only
+
+
+def test_data_only_compute():
+    """Tests that data only groups, stat_moment_group included, run without predictions, and no certificate reads
+    stat_moment_group."""
+    ai = AISystem("MultiModel_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=models["forest"])
+    ai.initialize(user_config=configuration)
+    ai.compute({"test": {}})
+    values = ai.get_metric_values()
+    assert "stat_moment_group" in values["test"]
+    assert values["test"]["stat_moment_group"] == separate_values["forest"]["test"]["stat_moment_group"]
+    assert "performance_cl" not in values["test"]
+    without_moments = {"test": {group: values["test"][group] for group in values["test"]
+                                if group != "stat_moment_group"}}
+    assert ai.certificate_manager.compute(without_moments) == ai.get_certificate_values()
+
+
+def test_compute_models_matches_separate_computes():
+    """Tests that each model gets the values of computing it alone, with models computed serially or concurrently."""
+    for scheduler in [{}, {"model_workers": 2}]:
+        ai = _create_ai_system(models["forest"], scheduler)
+        values = ai.compute_models(models, predictions)
+        assert values == ai.get_model_metric_values()
+        for name in models:
+            assert list(values[name]) == list(separate_values[name])
+            for split in separate_values[name]:
+                assert list(values[name][split]) == list(separate_values[name][split])
+                assert _dump(values[name][split]) == _dump(separate_values[name][split])
+                assert values[name][split]["metadata"]["tag"] == name
+                assert values[name][split]["metadata"]["model"] == str(models[name].agent)
+        assert ai.get_metric_values() == {}
+
+
+def test_data_only_groups_run_once(monkeypatch):
+    """Tests that a data only group is computed once for each split, however many models there are."""
+    calls = []
+    compute = StatMetricGroup.compute
+
+    def counted_compute(self, data_dict):
+        calls.append(len(data_dict["data"].X))
+        compute(self, data_dict)
+
+    monkeypatch.setattr(StatMetricGroup, "compute", counted_compute)
+    ai = _create_ai_system(models["forest"])
+    ai.compute_models(models, predictions, metrics=["summary_stats > mean", "performance_cl"])
+    assert sorted(calls) == sorted([len(xTrain), len(xTest)])
+    assert list(ai.get_model_metric_values()["boost"]["test"]["summary_stats"]) == ["mean"]
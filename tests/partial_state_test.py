@@ -0,0 +1,120 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import pickle
+import sys
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+clf.fit(xTrain, yTrain)
+exact_groups = ["performance_cl", "stat_moment_group", "frequency_stats", "dataset_fairness"]
+
+
+def _create_ai_system(data_dict):
+    ai = AISystem("PartialState_Test", task="binary_classification", meta_database=meta, dataset=Dataset(data_dict),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    return ai
+
+
+full_ai = _create_ai_system({"test": NumpyData(xTest, yTest)})
+full_ai.compute({"test": {"predict": clf.predict(xTest)}})
+full_values = full_ai.get_metric_values()["test"]
+
+# Each shard is computed by its own AISystem, as it would be on a separate worker
+shard_states = []
+for x_shard, y_shard in zip(np.array_split(xTest, 3), np.array_split(yTest, 3)):
+    worker = _create_ai_system({"test": NumpyData(x_shard, y_shard)})
+    shard_states.append(pickle.dumps(worker.compute_state({"test": {"predict": clf.predict(x_shard)}})))
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, float):
+        assert np.isclose(expected, actual, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+def test_merged_states_match_full_compute():
+    """Tests that merging the partial states of shards gives the values of a compute over all rows."""
+    coordinator = _create_ai_system({})
+    coordinator.merge([pickle.loads(state) for state in shard_states])
+    merged_values = coordinator.get_metric_values()["test"]
+    for group in exact_groups:
+        _assert_close(full_values[group], merged_values[group])
+    assert merged_values["metadata"]["sample_count"] == len(xTest)
+    assert np.isclose(merged_values["prediction_fairness"]["true_positive_rate"],
+                      full_values["prediction_fairness"]["true_positive_rate"])
+    assert np.isclose(merged_values["summary_stats"]["standard_deviation"]["age"],
+                      full_values["summary_stats"]["standard_deviation"]["age"])
+
+
+def test_merge_leaves_states_unchanged():
+    """Tests that merging does not modify the states passed to it, so they can be merged again."""
+    states = [pickle.loads(state) for state in shard_states]
+    matrix = states[0]["test"]["metric_groups"]["performance_cl"]["confusion_matrix"].copy()
+    coordinator = _create_ai_system({})
+    coordinator.merge(states)
+    first_values = coordinator.get_metric_values()["test"]
+    coordinator.merge(states)
+    assert coordinator.get_metric_values()["test"]["performance_cl"] == first_values["performance_cl"]
+    assert coordinator.get_metric_values()["test"]["summary_stats"]["median"] == first_values["summary_stats"]["median"]
+    assert np.array_equal(states[0]["test"]["metric_groups"]["performance_cl"]["confusion_matrix"], matrix)
+
+
+def test_merge_order():
+    """Tests that the merged count based values do not depend on the order of the states."""
+    coordinator = _create_ai_system({})
+    coordinator.merge([pickle.loads(state) for state in reversed(shard_states)])
+    reversed_values = coordinator.get_metric_values()["test"]
+    for group in ["performance_cl", "frequency_stats", "dataset_fairness"]:
+        _assert_close(full_values[group], reversed_values[group])
@@ -0,0 +1,142 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import sys
+import warnings
+import pytest
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI, moment_state, comoment_state
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+xTest32 = np.asarray(xTest, dtype=np.float32)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+groups = ["summary_stats", "stat_moment_group", "frequency_stats", "dataset_fairness", "performance_cl"]
+
+
+def _compute(x, precision, metrics=None, **user_config):
+    ai = AISystem("Precision_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(x, yTest)}), model=model, enable_certificates=False)
+    ai.initialize(user_config=dict(configuration, precision=precision, **user_config))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ai.compute({"test": {"predict": clf.predict(xTest)}}, metrics=metrics)
+    return ai
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, (float, np.floating)):
+        assert np.isclose(expected, actual, rtol=1e-5, atol=1e-5, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+float64_ai = _compute(xTest32, "float64")
+float32_ai = _compute(xTest32, "float32")
+
+
+def test_float32_scalar_data():
+    """Tests that the float32 precision keeps scalar data as float32, without copying consecutive columns."""
+    data = float32_ai.dataset.data_dict["test"]
+    assert data.scalar.dtype == np.float32
+    assert float64_ai.dataset.data_dict["test"].scalar.dtype == np.float64
+    mask = np.zeros(xTest32.shape[1], dtype=bool)
+    mask[:3] = True
+    data.initialize({"scalar": mask}, "float32")
+    assert np.shares_memory(data.scalar, xTest32)
+
+
+def test_float32_matches_float64():
+    """Tests that metric values computed with the float32 precision match those computed in float64."""
+    float64_values = float64_ai.get_metric_values()["test"]
+    float32_values = float32_ai.get_metric_values()["test"]
+    for group in groups:
+        _assert_close(float64_values[group], float32_values[group])
+
+
+def test_float32_args_and_selection():
+    """Tests that the float32 precision applies the stats args and returns the requested metrics, as float64 does."""
+    stats = {"args": {"mean": {"dtype": np.float64}, "covariance": {"ddof": 0}}}
+    float64_values = _compute(xTest32, "float64", stats=stats).get_metric_values()["test"]
+    float32_values = _compute(xTest32, "float32", stats=stats).get_metric_values()["test"]
+    _assert_close(float64_values["summary_stats"], float32_values["summary_stats"])
+    covariance = [row for row in float32_values["summary_stats"]["covariance"] if row is not None]
+    default_covariance = [row for row in float32_ai.get_metric_values()["test"]["summary_stats"]["covariance"]
+                          if row is not None]
+    assert not np.allclose(covariance, default_covariance)
+
+    metrics = ["summary_stats > mean", "summary_stats > median", "stat_moment_group > moment_2"]
+    float64_values = _compute(xTest32, "float64", metrics=metrics).get_metric_values()["test"]
+    float32_values = _compute(xTest32, "float32", metrics=metrics).get_metric_values()["test"]
+    assert set(float32_values["summary_stats"]) == {"mean", "median"}
+    assert set(float32_values["stat_moment_group"]) == {"moment_2"}
+    for group in ["summary_stats", "stat_moment_group"]:
+        _assert_close(float64_values[group], float32_values[group])
+
+
+def test_float32_moments_are_accurate():
+    """Tests that float32 moments are accumulated in float64, keeping their accuracy on data with a large offset."""
+    rng = np.random.default_rng(0)
+    values = (1e4 + rng.normal(0, 1, (200000, 3))).astype(np.float32)
+    expected = moment_state(values.astype(np.float64))
+    actual = moment_state(values)
+    for key in ["mean", "m2", "m4"]:
+        assert np.allclose(actual[key], expected[key], rtol=1e-7)
+    assert np.allclose(actual["m3"], expected["m3"], rtol=1e-4, atol=1e-3)
+    assert np.allclose(comoment_state(values)["c"], comoment_state(values.astype(np.float64))["c"], rtol=1e-5)
+    naive_variance = np.var(values, axis=0)
+    assert not np.allclose(naive_variance, expected["m2"] / len(values), rtol=1e-2)
+
+
+def test_invalid_precision():
+    """Tests that only the supported precisions are accepted."""
+    data = NumpyData(xTest32, yTest)
+    with pytest.raises(AssertionError):
+        data.initialize({"scalar": meta.scalar_mask}, "float16")
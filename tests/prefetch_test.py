@@ -0,0 +1,89 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import pickle
+import sys
+import numpy as np
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from RAI.dataset import IteratorData
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.prefetch import measure_prefetch
+
+images = torch.rand(50, 3, 4, 4)
+labels = torch.randint(0, 2, (50,))
+mapping = {"image": [True]}
+
+
+def _batches(data):
+    data.initialize(mapping)
+    data.reset()
+    batches = []
+    while data.next_batch():
+        batches.append((data.X.copy(), data.y.copy(), data.image.copy()))
+    return batches
+
+
+def test_prefetch_matches_serial():
+    """Tests that prefetched batches hold the same values, in the same order, as batches read one at a time."""
+    serial = _batches(IteratorData(DataLoader(TensorDataset(images, labels), batch_size=16)))
+    for prefetch, workers in [(1, 1), (2, 3), (8, 2)]:
+        prefetched = _batches(IteratorData(DataLoader(TensorDataset(images, labels), batch_size=16),
+                                           prefetch=prefetch, prefetch_workers=workers))
+        assert len(prefetched) == len(serial) == 4
+        for expected, actual in zip(serial, prefetched):
+            for expected_array, actual_array in zip(expected, actual):
+                assert np.array_equal(expected_array, actual_array)
+
+
+def test_prefetch_reset():
+    """Tests that a reset part way through a prefetched iteration starts again from the first batch."""
+    data = IteratorData(DataLoader(TensorDataset(images, labels), batch_size=16), prefetch=2)
+    data.initialize(mapping)
+    data.reset()
+    data.next_batch()
+    data.next_batch()
+    assert len(_batches(data)) == 4
+    assert not data.next_batch()
+    assert not data.next_batch()
+    assert len(pickle.loads(pickle.dumps(data)).iterator) == 4
+
+
+def test_prefetch_errors():
+    """Tests that a failure reading a batch on the prefetch thread is raised by next_batch."""
+    def failing():
+        yield images[:16], labels[:16]
+        raise ValueError("unreadable batch")
+
+    data = IteratorData([], prefetch=2)
+    data._read_batches = failing
+    data.initialize(mapping)
+    data.reset()
+    assert data.next_batch()
+    with pytest.raises(ValueError):
+        data.next_batch()
+    assert not data.next_batch()
+
+
+def test_prefetch_benchmark():
+    """Tests that the prefetch benchmark reports a throughput for each setting."""
+    result = measure_prefetch(images=64, batch_size=16, size=8, decode_rounds=1, settings=[(0, 1), (2, 2)])
+    assert [item["prefetch"] for item in result["results"]] == [0, 2]
+    assert all(item["images_per_second"] > 0 for item in result["results"])
@@ -0,0 +1,86 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import json
+import os
+import sys
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+
+
+def _compute(user_config):
+    ai = AISystem("Profile_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model, enable_certificates=False)
+    ai.initialize(user_config=dict(user_config, time_complexity="polynomial"))
+    ai.compute(predictions)
+    return ai
+
+
+def test_profile_records_each_group():
+    """Tests that the profile holds the time, rows and memory of every metric group, and is attached to metadata."""
+    ai = _compute({"profile": {"memory": True}})
+    profile = ai.get_profile()["test"]
+    values = ai.get_metric_values()["test"]
+    assert set(profile["groups"]) == set(values)
+    for group in profile["groups"]:
+        record = profile["groups"][group]["compute"]
+        assert record["calls"] == 1
+        assert record["rows"] == len(xTest)
+        assert record["wall_time"] >= 0 and record["cpu_time"] >= 0
+        assert record["peak_memory"] is not None and record["peak_memory"] >= 0
+    assert profile["wall_time"] >= max(profile["groups"][group]["compute"]["wall_time"] for group in profile["groups"])
+    assert values["metadata"]["profile"] == json.loads(json.dumps(profile))
+
+
+def test_concurrent_profile():
+    """Tests that groups run concurrently are profiled, without peak memory."""
+    ai = _compute({"profile": {"memory": True}, "scheduler": {"workers": 4}})
+    profile = ai.get_profile()["test"]
+    assert set(profile["groups"]) == set(ai.get_metric_values()["test"])
+    assert all(profile["groups"][group]["compute"]["peak_memory"] is None for group in profile["groups"])
+
+
+def test_profiling_off_by_default():
+    """Tests that no profile is kept unless profiling is enabled."""
+    ai = _compute({})
+    assert ai.get_profile()["test"] is None
+    assert ai.get_metric_values()["test"]["metadata"]["profile"] is None
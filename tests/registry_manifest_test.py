@@ -0,0 +1,91 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import json
+import os
+import subprocess
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from RAI.utils import RegistryManifest
+from RAI.metrics.metric_registry import group_packages, get_group_names, get_group_config, get_group_versions, \
+    _get_manifest_entry
+
+# Computes performance_cl alone in a fresh interpreter, printing the metric group modules which were imported
+lazy_compute = """
+import json, sys
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+from RAI.AISystem import AISystem, Model
+from RAI.dataset import Feature, MetaDatabase, NumpyData, Dataset
+x = np.random.default_rng(0).normal(size=(200, 2))
+y = (x[:, 0] > 0).astype(int)
+clf = DecisionTreeClassifier().fit(x, y)
+meta = MetaDatabase([Feature("a", "numeric", "a"), Feature("b", "numeric", "b")])
+model = Model(agent=clf, output_features=[Feature("y", "numeric", "y", categorical=True, values={0: "0", 1: "1"})],
+              name="clf", predict_fun=clf.predict, model_class="Decision Tree")
+ai = AISystem("Lazy", task="binary_classification", meta_database=meta, dataset=Dataset({"test": NumpyData(x, y)}),
+              model=model, enable_certificates=False)
+ai.initialize()
+ai.compute({"test": {"predict": clf.predict(x)}}, metrics=["performance_cl"])
+print(json.dumps(sorted(m for m in sys.modules if m.count(".") >= 3 and m.startswith("RAI.metrics."))))
+"""
+
+
+def test_manifest_matches_configs():
+    """Tests that the manifest lists every shipped group, with the planning metadata and version of its config."""
+    from RAI.metrics.performance.performance_cl import PerformanceClassificationMetricGroup
+    config = get_group_config("performance_cl")
+    assert config["compatibility"] == PerformanceClassificationMetricGroup.config["compatibility"]
+    assert config["metrics"] == list(PerformanceClassificationMetricGroup.config["metrics"])
+    assert "explanation" not in json.dumps(config)
+    assert get_group_versions()["performance_cl"] == PerformanceClassificationMetricGroup.version
+    assert "correlation_stats_regression_slow" not in get_group_names()
+
+
+def test_manifest_cache_invalidation(tmp_path):
+    """Tests that the manifest is read back from disk, and rebuilt once a group's config is modified."""
+    manifest = RegistryManifest("test_manifest", group_packages, _get_manifest_entry, directory=str(tmp_path))
+    entries = manifest.entries()
+    assert os.path.isfile(manifest.path)
+
+    with open(manifest.path) as f:
+        document = json.load(f)
+    document["entries"]["metadata"]["config"]["complexity_class"] = "cached"
+    with open(manifest.path, "w") as f:
+        json.dump(document, f)
+    cached = RegistryManifest("test_manifest", group_packages, _get_manifest_entry, directory=str(tmp_path))
+    assert cached.entries()["metadata"]["config"]["complexity_class"] == "cached"
+
+    config_file = next(path for path in document["files"] if path.endswith("metadata.json"))
+    os.utime(config_file, ns=(document["files"][config_file] + 1, document["files"][config_file] + 1))
+    try:
+        rebuilt = RegistryManifest("test_manifest", group_packages, _get_manifest_entry, directory=str(tmp_path))
+        assert rebuilt.entries()["metadata"] == entries["metadata"]
+    finally:
+        os.utime(config_file, ns=(document["files"][config_file], document["files"][config_file]))
+
+
+def test_only_selected_groups_are_imported(tmp_path):
+    """Tests that computing a single group imports its module, and not the modules of the other groups."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root, RAI_CACHE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", lazy_compute], capture_output=True, text=True, env=env, check=True)
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    assert "RAI.metrics.performance.performance_cl" in modules
+    assert "RAI.metrics.stats.summary_stats" not in modules
+    assert "RAI.metrics.fairness.group_fairness" not in modules
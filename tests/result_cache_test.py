@@ -0,0 +1,132 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import json
+import os
+import sys
+import time
+from unittest import mock
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics import MetricManager
+from RAI.metrics.metadata.metadata import MetadataGroup
+from RAI.utils import df_to_RAI, fingerprint, ResultCache
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+
+
+def _create_ai_system(cache_config):
+    ai = AISystem("ResultCache_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model)
+    ai.initialize(user_config={"time_complexity": "polynomial", "cache": cache_config})
+    return ai
+
+
+def _without_metadata(values):
+    return json.dumps({group: values[group] for group in values if group != "metadata"}, sort_keys=True)
+
+
+def test_repeated_compute_is_cached():
+    """Tests that computing again on the same data and predictions reuses the cached results, with a new tag and date."""
+    ai = _create_ai_system({"max_entries": 4})
+    ai.compute(predictions, tag="first")
+    first_values = ai.get_metric_values()["test"]
+    first_certificates = ai.get_certificate_values()
+    with mock.patch.object(MetricManager, "compute", wraps=ai.metric_manager.compute) as compute, \
+            mock.patch.object(MetadataGroup, "_get_time", return_value="2100-01-01 00:00:00"):
+        ai.compute({"test": {"predict": clf.predict(xTest)}}, tag="second")
+        assert not compute.called
+        values = ai.get_metric_values()["test"]
+        assert _without_metadata(values) == _without_metadata(first_values)
+        assert values["metadata"]["tag"] == "second"
+        assert values["metadata"]["date"] == "2100-01-01 00:00:00"
+        assert ai.get_certificate_values() == first_certificates
+
+        changed = clf.predict(xTest)
+        changed[0] = 1 - changed[0]
+        ai.compute({"test": {"predict": changed}})
+        assert compute.called
+
+
+def test_disk_cache(tmp_path):
+    """Tests that results cached on disk are reused by a new AISystem."""
+    ai = _create_ai_system({"directory": str(tmp_path)})
+    ai.compute(predictions, tag="disk")
+    expected = ai.get_metric_values()["test"]
+    other = _create_ai_system({"directory": str(tmp_path)})
+    with mock.patch.object(MetricManager, "compute") as compute:
+        other.compute(predictions, tag="disk")
+        assert not compute.called
+    assert _without_metadata(other.get_metric_values()["test"]) == _without_metadata(expected)
+    other.clear_result_cache()
+    assert len(os.listdir(tmp_path)) == 0
+
+
+def test_result_cache_eviction():
+    """Tests that the in memory cache keeps only the most recently used entries."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_directory_eviction(tmp_path):
+    """Tests that the directory keeps only the most recently written or read results."""
+    cache = ResultCache(max_entries=1, directory=str(tmp_path), max_directory_entries=2)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    cache.put("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.put("c", 3)
+    assert sorted(os.listdir(tmp_path)) == ["a.pkl", "c.pkl"]
+    assert "b" not in cache and cache.get("a") == 1
+
+
+def test_fingerprint():
+    """Tests that fingerprints depend on the content of arrays, not on the objects holding them."""
+    assert fingerprint({"X": xTest, "y": yTest}) == fingerprint({"y": yTest.copy(), "X": xTest.copy()})
+    changed = xTest.copy()
+    changed[0, 0] += 1
+    assert fingerprint({"X": xTest}) != fingerprint({"X": changed})
+    assert fingerprint(xTest) != fingerprint(xTest.astype(np.float32))
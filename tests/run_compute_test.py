@@ -0,0 +1,146 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import json
+import os
+import sys
+from RAI.dataset import NumpyData, IteratorData, Dataset, MetaDatabase, Feature
+from RAI.AISystem import AISystem, Model
+from RAI.metrics.metric_manager import _iterate_batches
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+clf.fit(xTrain, yTrain)
+batch_sizes = []
+
+
+def _recording_predict(x):
+    batch_sizes.append(len(x))
+    return clf.predict(x)
+
+
+def _run_compute(inference=None):
+    model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=_recording_predict,
+                  predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+    ai = AISystem("RunCompute_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model, enable_certificates=False)
+    configuration = {"time_complexity": "polynomial"}
+    if inference is not None:
+        configuration["inference"] = inference
+    ai.initialize(user_config=configuration)
+    ai.run_compute(tag="inference")
+    return ai.get_metric_values()["test"]
+
+
+def _dump(values):
+    values = dict(values)
+    values.pop("metadata")
+    values.pop("tree_model_metadata")  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+full_values = _run_compute()
+batch_sizes.clear()
+chunked_values = _run_compute({"batch_size": 1000, "workers": 2})
+
+
+def test_chunked_inference_matches_full():
+    """Tests that predicting in chunks on a pool of workers gives the same values as a single prediction."""
+    assert _dump(chunked_values) == _dump(full_values)
+    assert chunked_values["metadata"]["sample_count"] == len(xTest)
+    assert chunked_values["metadata"]["tag"] == "inference"
+
+
+def test_chunks_bounded_by_batch_size():
+    """Tests that the model is never given more rows than the configured batch size."""
+    assert max(batch_sizes) <= 1000
+    assert sum(batch_sizes) == len(xTest)
+
+
+def test_iterator_data_streaming():
+    """Tests that IteratorData splits are predicted and computed batch by batch."""
+    images = torch.rand(50, 3, 4, 4)
+    labels = torch.randint(0, 2, (50,))
+    image_meta = MetaDatabase([Feature(name="image", dtype="image", description="A 4x4 input image")])
+    image_output = Feature(name="class", dtype="numeric", description="The image class", categorical=True,
+                           values={0: "a", 1: "b"})
+    seen = []
+
+    def predict(x):
+        seen.append(len(x))
+        return (x.mean(dim=(1, 2, 3)) > 0.5).long()
+
+    model = Model(agent=None, output_features=image_output, name="mean_classifier", predict_fun=predict,
+                  model_class="Threshold")
+    ai = AISystem("RunComputeIterator_Test", task="classification", meta_database=image_meta,
+                  dataset=Dataset({"test": IteratorData(DataLoader(TensorDataset(images, labels), batch_size=16))}),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config={"time_complexity": "polynomial", "inference": {"workers": 2}})
+    ai.run_compute(tag="stream")
+    values = ai.get_metric_values()["test"]
+    assert seen == [16, 16, 16, 2]
+    assert values["metadata"]["sample_count"] == 50
+    assert values["metadata"]["tag"] == "stream"
+
+
+def test_results_in_dataset_order():
+    """Tests that results follow the order of the dataset splits, whether they are IteratorData or NumpyData."""
+    images = torch.rand(20, 3, 4, 4)
+    labels = torch.randint(0, 2, (20,))
+    image_meta = MetaDatabase([Feature(name="image", dtype="image", description="A 4x4 input image")])
+    image_output = Feature(name="class", dtype="numeric", description="The image class", categorical=True,
+                           values={0: "a", 1: "b"})
+    model = Model(agent=None, output_features=image_output, name="mean_classifier",
+                  predict_fun=lambda x: (torch.as_tensor(np.asarray(x)).reshape(len(x), -1).mean(dim=1) > 0.5).long(),
+                  model_class="Threshold")
+    dataset = Dataset({"stream": IteratorData(DataLoader(TensorDataset(images, labels), batch_size=8)),
+                       "array": NumpyData(images.numpy().reshape(20, 1, 3, 4, 4), labels.numpy())})
+    ai = AISystem("RunComputeOrder_Test", task="classification", meta_database=image_meta, dataset=dataset,
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config={"time_complexity": "polynomial"})
+    ai.run_compute()
+    assert list(ai.get_metric_values()) == ["stream", "array"]
+
+
+def test_iterate_batches_removes_stale_outputs():
+    """Tests that batches hold slices of the given predictions, and no outputs of an earlier compute."""
+    data = IteratorData(DataLoader(TensorDataset(torch.rand(20, 3, 4, 4), torch.randint(0, 2, (20,))), batch_size=8))
+    data_dict = {"data": data, "predict": np.zeros(20), "predict_proba": np.zeros((20, 2))}
+    batches = [dict(batch) for batch in _iterate_batches(data_dict, {"predict": np.arange(20)})]
+    assert [len(batch["predict"]) for batch in batches] == [8, 8, 4]
+    assert np.array_equal(batches[1]["predict"], np.arange(8, 16))
+    assert all("predict_proba" not in batch for batch in batches)
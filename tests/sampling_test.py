@@ -0,0 +1,130 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import sys
+from unittest import mock
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics import MetricManager
+from RAI.utils import df_to_RAI, get_strata, stratified_sample
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial", "sample": {"replicates": 8, "seed": 3}}
+clf.fit(xTrain, yTrain)
+
+
+def _create_ai_system():
+    ai = AISystem("Sampling_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model, enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    return ai
+
+
+predictions = {"test": {"predict": clf.predict(xTest)}}
+full_ai = _create_ai_system()
+full_ai.compute(predictions)
+full_values = full_ai.get_metric_values()["test"]
+sampled_ai = _create_ai_system()
+sampled_ai.compute(predictions, sample=0.25)
+sampled_values = sampled_ai.get_metric_values()["test"]
+race = [f.name for f in meta.features if f.categorical].index("race")
+
+
+def test_stratified_sample():
+    """Tests that every stratum is sampled in proportion, and that each replicate is itself stratified."""
+    strata = get_strata([yTest, xTest[:, meta.categorical_mask][:, race]])
+    indices, replicate_of = stratified_sample(strata, 2000, replicates=4, seed=0)
+    assert len(indices) == 2000
+    assert len(np.unique(indices)) == len(indices)
+    expected = np.bincount(strata) * 2000 / len(strata)
+    assert np.all(np.abs(np.bincount(strata[indices]) - expected) <= 1)
+    for i in range(4):
+        assert len(np.unique(strata[indices[replicate_of == i]])) == len(expected)
+
+
+def test_stratified_sample_size():
+    """Tests that the sample holds exactly size rows, raised only to hold one row of every stratum."""
+    strata = np.array([0] * 1000 + list(range(1, 51)))
+    for size in [51, 100, 500, 1050]:
+        indices, _ = stratified_sample(strata, size, seed=0)
+        assert len(indices) == size
+        assert len(np.unique(strata[indices])) == 51
+    assert len(stratified_sample(strata, 10, seed=0)[0]) == 51
+
+
+def test_sample_counts():
+    """Tests that the metadata group reports the sampled and total number of rows."""
+    assert sampled_values["metadata"]["sample_count"] == round(0.25 * len(xTest))
+    assert sampled_values["metadata"]["total_count"] == len(xTest)
+    assert full_values["metadata"]["total_count"] == full_values["metadata"]["sample_count"] == len(xTest)
+    assert full_ai.get_metric_intervals() == {}
+
+
+def test_confidence_intervals():
+    """Tests that sampled metrics get confidence intervals around their value which cover the full compute."""
+    intervals = sampled_ai.get_metric_intervals()["test"]
+    assert sampled_values["metadata"]["confidence_intervals"] == intervals
+    low, high = intervals["performance_cl"]["accuracy"]
+    assert low <= sampled_values["performance_cl"]["accuracy"] <= high
+    assert low <= full_values["performance_cl"]["accuracy"] <= high
+    low, high = intervals["summary_stats"]["mean"]["age"]
+    assert low <= full_values["summary_stats"]["mean"]["age"] <= high
+    low, high = intervals["dataset_fairness"]["base_rate"]
+    assert low <= full_values["dataset_fairness"]["base_rate"] <= high
+    assert np.shape(intervals["performance_cl"]["confusion_matrix"][0]) == (2, 2)
+
+
+def test_sample_rows():
+    """Tests that an integer sample gives the number of rows to compute on."""
+    ai = _create_ai_system()
+    ai.compute(predictions, sample=1000, metrics=["metadata", "performance_cl"])
+    values = ai.get_metric_values()["test"]
+    assert values["metadata"]["sample_count"] == 1000
+    assert set(ai.get_metric_intervals()["test"]) == {"performance_cl"}
+
+
+def test_replicates_reuse_plan():
+    """Tests that the replicates of a sample share one compiled metric plan."""
+    ai = _create_ai_system()
+    with mock.patch.object(MetricManager, "_compile_plan", autospec=True,
+                           side_effect=MetricManager._compile_plan) as compile_plan:
+        ai.compute(predictions, sample=1000, metrics=["metadata", "performance_cl"])
+    assert compile_plan.call_count == 2
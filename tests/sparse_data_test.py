@@ -0,0 +1,138 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import os
+import sys
+from unittest import mock
+import warnings
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI, sparse_pearsonr, sparse_spearmanr
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import scipy.stats
+from sklearn.linear_model import LogisticRegression
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+rng = np.random.default_rng(21)
+
+rows = 4000
+df = pd.DataFrame(np.round(rng.normal(2, 1, (rows, 4)), 1) * (rng.random((rows, 4)) < 0.1),
+                  columns=["a", "b", "c", "d"])
+df["gender"] = np.where(rng.random(rows) < 0.3, "female", "male")
+df["target"] = (df["a"] + rng.normal(0, 1, rows) > 0.5).astype(int)
+meta, X, y, output = df_to_RAI(df, target_column="target", max_categorical_threshold=3)
+X = np.asarray(X, dtype=np.float64)
+sparse_X = scipy.sparse.csr_matrix(X)
+
+clf = LogisticRegression().fit(X, y)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Logistic Regression")
+configuration = {"fairness": {"priv_group": {"gender": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["gender"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+sparse_groups = ["summary_stats", "stat_moment_group", "frequency_stats", "correlation_stats_binary",
+                 "dataset_fairness", "performance_cl"]
+
+
+def _compute(x):
+    ai = AISystem("Sparse_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(x, y)}), model=model, enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ai.compute({"test": {"predict": clf.predict(X)}})
+    return ai
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, (float, np.floating)):
+        assert np.isclose(expected, actual, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+dense_values = _compute(X).get_metric_values()["test"]
+sparse_ai = _compute(sparse_X)
+sparse_values = sparse_ai.get_metric_values()["test"]
+
+
+def test_sparse_columns():
+    """Tests that the data types of a sparse X are sparse column slices holding the values of the dense ones."""
+    data = NumpyData(sparse_X, y)
+    data.initialize({"scalar": meta.scalar_mask, "categorical": meta.categorical_mask})
+    dense = NumpyData(X, y)
+    dense.initialize({"scalar": meta.scalar_mask, "categorical": meta.categorical_mask})
+    assert scipy.sparse.issparse(data.scalar) and data.scalar.format == "csc"
+    assert data.scalar.dtype == np.float64
+    assert np.array_equal(data.scalar.toarray(), dense.scalar)
+    assert np.array_equal(data.categorical.toarray(), dense.categorical)
+    assert len(data) == rows
+
+
+def test_sparse_converted_once():
+    """Tests that a CSR X is converted to CSC once, rather than once per data type."""
+    data = NumpyData(sparse_X, y)
+    with mock.patch.object(scipy.sparse.csr_matrix, "tocsc", autospec=True,
+                           side_effect=scipy.sparse.csr_matrix.tocsc) as tocsc:
+        data.initialize({"scalar": meta.scalar_mask, "categorical": meta.categorical_mask})
+    assert tocsc.call_count == 1
+
+
+def test_sparse_matches_dense():
+    """Tests that the sparse aware metric groups give the values of a compute on the dense data."""
+    for group in sparse_groups:
+        _assert_close(dense_values[group], sparse_values[group])
+
+
+def test_dense_only_groups_skipped():
+    """Tests that groups which would make X dense are not computed on sparse data."""
+    assert "group_fairness" in dense_values
+    assert "group_fairness" not in sparse_values
+    assert "basic_robustness" not in sparse_values
+
+
+def test_sparse_update():
+    """Tests that updating a sparse compute with sparse rows gives the values of a compute over all rows."""
+    ai = AISystem("Sparse_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(sparse_X[:2500], y[:2500])}), model=model,
+                  enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    ai.compute({"test": {"predict": clf.predict(X[:2500])}})
+    ai.update({"test": NumpyData(sparse_X[2500:], y[2500:])}, {"test": {"predict": clf.predict(X[2500:])}})
+    values = ai.get_metric_values()["test"]
+    for group in ["summary_stats", "stat_moment_group", "frequency_stats", "dataset_fairness"]:
+        _assert_close(sparse_values[group], values[group])
+
+
+def test_sparse_correlations():
+    """Tests that the sparse correlations match scipy, including ties among values and the implicit zeros."""
+    target = X[:, 0] * 2 + np.round(rng.normal(0, 1, rows))
+    for i in range(4):
+        column = sparse_X[:, i]
+        assert np.allclose(sparse_pearsonr(column, target), scipy.stats.pearsonr(X[:, i], target))
+        assert np.allclose(sparse_spearmanr(column, target), scipy.stats.spearmanr(X[:, i], target))
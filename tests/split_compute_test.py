@@ -0,0 +1,93 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+import json
+import os
+import sys
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+xTest, xVal, yTest, yVal = train_test_split(xTest, yTest, random_state=1, stratify=yTest)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+predictions = {"train": {"predict": clf.predict(xTrain)}, "test": {"predict": clf.predict(xTest)},
+               "val": {"predict": clf.predict(xVal)}}
+
+
+def _compute(split_workers):
+    dataset = Dataset({"train": NumpyData(xTrain, yTrain), "test": NumpyData(xTest, yTest),
+                       "val": NumpyData(xVal, yVal)})
+    ai = AISystem("SplitCompute_Test", task="binary_classification", meta_database=meta, dataset=dataset,
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config={"time_complexity": "polynomial", "scheduler": {"split_workers": split_workers}})
+    ai.compute(predictions, tag="splits")
+    return ai
+
+
+def _dump(values):
+    values = dict(values)
+    values.pop("metadata")
+    values.pop("tree_model_metadata")  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+serial_ai = _compute(1)
+concurrent_ai = _compute(3)
+
+
+def test_concurrent_splits_match_serial():
+    """Tests that computing splits concurrently gives the same values as computing them one at a time."""
+    serial_values = serial_ai.get_metric_values()
+    concurrent_values = concurrent_ai.get_metric_values()
+    assert list(concurrent_values) == list(serial_values)
+    for split in serial_values:
+        assert _dump(concurrent_values[split]) == _dump(serial_values[split])
+
+
+def test_splits_are_isolated():
+    """Tests that each concurrent split is computed on its own data."""
+    values = concurrent_ai.get_metric_values()
+    assert values["train"]["metadata"]["sample_count"] == len(xTrain)
+    assert values["test"]["metadata"]["sample_count"] == len(xTest)
+    assert values["val"]["metadata"]["sample_count"] == len(xVal)
+    assert values["train"]["metadata"]["tag"] == "splits"
+
+
+def test_metric_info_after_concurrent_compute():
+    """Tests that metric info is available after a concurrent compute, as it is after a serial one."""
+    assert concurrent_ai.get_metric_info().keys() == serial_ai.get_metric_info().keys()
@@ -0,0 +1,139 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from RAI.dataset import NumpyData, StreamData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.utils import df_to_RAI
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+all_data.loc[all_data["race"] != "White", "race"] = "Black"
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+configuration = {"fairness": {"priv_group": {"race": {"privileged": 1, "unprivileged": 0}},
+                              "protected_attributes": ["race"], "positive_label": 1},
+                 "time_complexity": "polynomial"}
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+batch_groups = ["stat_moment_group", "frequency_stats", "dataset_fairness", "performance_cl"]
+
+
+def _compute(data):
+    ai = AISystem("StreamData_Test", task="binary_classification", meta_database=meta, dataset=Dataset({"test": data}),
+                  model=model, enable_certificates=False)
+    ai.initialize(user_config=configuration)
+    ai.compute(predictions)
+    return ai.get_metric_values()["test"]
+
+
+def _assert_close(expected, actual):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual)
+        for key in expected:
+            _assert_close(expected[key], actual[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual)
+        for expected_value, actual_value in zip(expected, actual):
+            _assert_close(expected_value, actual_value)
+    elif isinstance(expected, float):
+        assert np.isclose(expected, actual, equal_nan=True)
+    else:
+        assert expected == actual
+
+
+full_values = _compute(NumpyData(xTest, yTest))
+names = [f.name for f in meta.features]
+test_frame = pd.DataFrame(xTest, columns=names).assign(label=yTest)
+
+
+def _chunks(size):
+    for start in range(0, len(xTest), size):
+        yield xTest[start:start + size], yTest[start:start + size]
+
+
+def test_batch_size():
+    """Tests that batches of the source are split and joined to batch_size rows, copying only joined batches."""
+    data = StreamData(lambda: _chunks(3000), batch_size=4000)
+    data.initialize({"scalar": meta.scalar_mask, "categorical": meta.categorical_mask})
+    for _ in range(2):
+        data.reset()
+        sizes = []
+        while data.next_batch():
+            sizes.append(len(data.y))
+        assert sizes == [4000, 4000, len(xTest) - 8000]
+
+    data = StreamData([(xTest, yTest)], batch_size=4000)
+    data.initialize({"scalar": meta.scalar_mask})
+    data.reset()
+    data.next_batch()
+    assert np.shares_memory(data.X, xTest)
+    assert np.array_equal(data.X, xTest[:4000])
+
+
+def test_numpy_compute():
+    """Tests that a generator of numpy batches gets the values of the same split held in memory."""
+    values = _compute(StreamData(lambda: _chunks(3000)))
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
+    assert values["metadata"]["sample_count"] == len(xTest)
+
+
+def test_pandas_chunks(tmp_path):
+    """Tests that the chunks of a csv read by pandas are computed with y taken from a column."""
+    test_frame.to_csv(tmp_path / "test.csv", index=False)
+    data = StreamData(lambda: pd.read_csv(tmp_path / "test.csv", chunksize=2500), y_column="label", batch_size=4000)
+    values = _compute(data)
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
+
+
+def test_arrow_sources(tmp_path):
+    """Tests that Arrow record batches and the row groups of a Parquet file give the in memory values."""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    table = pyarrow.Table.from_pandas(test_frame, preserve_index=False)
+    values = _compute(StreamData(table.to_batches(max_chunksize=3000), y_column="label"))
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
+
+    pyarrow.parquet.write_table(table, str(tmp_path / "test.parquet"), row_group_size=3000)
+    data = StreamData(pyarrow.parquet.ParquetFile(str(tmp_path / "test.parquet")), x_columns=names,
+                      y_column="label", batch_size=5000)
+    values = _compute(data)
+    for group in batch_groups:
+        _assert_close(full_values[group], values[group])
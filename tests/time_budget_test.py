@@ -0,0 +1,121 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import json
+import os
+import sys
+import time
+from RAI.dataset import NumpyData, Dataset
+from RAI.AISystem import AISystem, Model
+from RAI.metrics import RuntimeModel
+from RAI.metrics.performance.performance_cl import PerformanceClassificationMetricGroup
+from RAI.utils import df_to_RAI
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+use_dashboard = False
+np.random.seed(21)
+
+data_path = "../data/adult/"
+train_data = pd.read_csv(data_path + "train.csv", header=0,
+                         skipinitialspace=True, na_values="?")
+test_data = pd.read_csv(data_path + "test.csv", header=0,
+                        skipinitialspace=True, na_values="?")
+all_data = pd.concat([train_data, test_data], ignore_index=True)
+
+meta, X, y, output = df_to_RAI(all_data, target_column="income-per-year", normalize="Scalar", max_categorical_threshold=5)
+xTrain, xTest, yTrain, yTest = train_test_split(X, y, random_state=1, stratify=y)
+
+clf = RandomForestClassifier(n_estimators=10, criterion='entropy', random_state=0, min_samples_leaf=5, max_depth=2)
+model = Model(agent=clf, output_features=output, name="test_classifier", predict_fun=clf.predict,
+              predict_prob_fun=clf.predict_proba, model_class="Random Forest Classifier")
+clf.fit(xTrain, yTrain)
+predictions = {"test": {"predict": clf.predict(xTest)}}
+
+
+def _create_ai_system():
+    ai = AISystem("TimeBudget_Test", task="binary_classification", meta_database=meta,
+                  dataset=Dataset({"test": NumpyData(xTest, yTest)}), model=model, enable_certificates=False)
+    ai.initialize(user_config={"time_complexity": "polynomial"})
+    return ai
+
+
+def _dump(values):
+    values = dict(values)
+    values.pop("metadata")
+    values.pop("tree_model_metadata")  # Holds pickled estimators, which are not byte for byte stable
+    return json.dumps(values, sort_keys=True)
+
+
+full_ai = _create_ai_system()
+full_ai.compute(predictions)
+full_values = full_ai.get_metric_values()["test"]
+
+
+def test_runtime_model():
+    """Tests that the runtime model fits the growth of observed runtimes, and falls back to complexity classes."""
+    runtime_model = RuntimeModel()
+    runtime_model.observe("group", 1000, 0.01)
+    runtime_model.observe("group", 10000, 0.1)
+    assert np.isclose(runtime_model.estimate("group", 100000), 1.0)
+    assert runtime_model.estimate("unseen", 10000, "polynomial") > runtime_model.estimate("unseen", 10000, "linear")
+    runtime_model.observe("single", 1000, 0.5)
+    assert np.isclose(runtime_model.estimate("single", 2000, "linear"), 1.0)
+
+
+def test_budget_skips_and_fills_in():
+    """Tests that groups which do not fit the budget are skipped, and filled in by a later compute."""
+    ai = _create_ai_system()
+    ai.compute(predictions, time_budget=0)
+    status = ai.get_group_status()["test"]
+    assert set(status.values()) == {"skipped"}
+    assert all(value is None for value in ai.get_metric_values()["test"]["performance_cl"].values())
+
+    ai.compute(predictions, time_budget=600)
+    values = ai.get_metric_values()["test"]
+    assert set(ai.get_group_status()["test"].values()) == {"complete"}
+    assert list(values) == list(full_values)
+    assert _dump(values) == _dump(full_values)
+    assert values["metadata"]["group_status"]["performance_cl"] == "complete"
+
+
+def test_unfinished_group(monkeypatch):
+    """Tests that a group still running at the deadline is abandoned and marked, without delaying the compute."""
+    compute = PerformanceClassificationMetricGroup.compute
+
+    def slow_compute(self, data_dict):
+        time.sleep(3)
+        compute(self, data_dict)
+
+    ai = _create_ai_system()
+    monkeypatch.setattr(PerformanceClassificationMetricGroup, "compute", slow_compute)
+    ai.compute(predictions, metrics=["performance_cl"])  # Builds the plan, and times the slow group
+    ai.metric_manager.runtime_model = RuntimeModel()
+    start = time.perf_counter()
+    ai.compute(predictions, metrics=["performance_cl"], time_budget=0.5)
+    assert time.perf_counter() - start < 2
+    assert ai.get_group_status()["test"]["performance_cl"] == "unfinished"
+    assert ai.get_metric_values()["test"]["performance_cl"]["accuracy"] is None
+
+    monkeypatch.setattr(PerformanceClassificationMetricGroup, "compute", compute)
+    ai.compute(predictions, metrics=["performance_cl"], time_budget=600)
+    assert ai.get_group_status()["test"]["performance_cl"] == "complete"
+    assert ai.get_metric_values()["test"]["performance_cl"] == full_values["performance_cl"]
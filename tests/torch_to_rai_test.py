@@ -0,0 +1,73 @@
+# Copyright 2022 Cisco Systems, Inc. and its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset, IterableDataset
+from RAI.utils import torch_to_RAI
+
+images = torch.rand(50, 3, 4, 4)
+labels = torch.randint(0, 2, (50,))
+
+
+class _Images(Dataset):
+    transform = None
+
+    def __len__(self):
+        return len(images)
+
+    def __getitem__(self, index):
+        return images[index], labels[index]
+
+
+class _ImageStream(IterableDataset):
+    transform = None
+
+    def __iter__(self):
+        return iter(zip(images, labels))
+
+
+def test_dataloader_conversion():
+    """Tests that every batch is converted in order, with X a view of the raw tensor."""
+    x, y, raw = torch_to_RAI(DataLoader(_Images(), batch_size=16))
+    assert x.shape == (50, 1, 3, 4, 4)
+    assert np.array_equal(x[:, 0], images.numpy())
+    assert y == labels.tolist()
+    assert torch.equal(raw, images)
+    assert np.shares_memory(x, raw.numpy())
+    copied, _, raw = torch_to_RAI(DataLoader(_Images(), batch_size=16), share_memory=False)
+    assert not np.shares_memory(copied, raw.numpy())
+    assert np.array_equal(copied, x)
+
+
+def test_max_size():
+    """Tests that no more than max_size rows are kept, whether or not max_size falls on a batch boundary."""
+    for max_size in [16, 20, 49, 100]:
+        x, y, raw = torch_to_RAI(DataLoader(_Images(), batch_size=16), max_size=max_size)
+        rows = min(max_size, 50)
+        assert len(x) == len(y) == len(raw) == rows
+        assert np.array_equal(x[:, 0], images[:rows].numpy())
+
+
+def test_unknown_length():
+    """Tests that datasets without a length are converted by growing the output."""
+    x, y, raw = torch_to_RAI(DataLoader(_ImageStream(), batch_size=7))
+    assert np.array_equal(x[:, 0], images.numpy())
+    assert y == labels.tolist()
+    x, _, _ = torch_to_RAI(images)
+    assert x.shape == (50, 1, 3, 4, 4)